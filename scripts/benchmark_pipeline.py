@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with stored baselines.
+For each size, generates a synthetic DH70-shaped workbook once (cached under
+data/benchmarks/, see generate_dh_workbook.py) and runs the pipeline on it in
+a fresh process with --force --no-cache. Each run records the total wall time
+and peak RSS of that process, plus per-stage wall times taken from the run
+report: parsing DAT201, every extractor and every table write. Times are
+medians over --repeat runs; memory is the maximum.
+
+Sizes above one worksheet (1,048,575 intervals) run in batch mode over the
+generated parts; batch runs have no per-stage report.
+
+--save-baseline writes the results as JSON. --check compares them with a
+stored baseline and exits 1 when a time exceeds baseline x --tolerance (and by
+more than --min-seconds), or when peak memory exceeds baseline x
+--memory-tolerance. CI runs the 10k size against
+reports/benchmarks/pipeline_baseline.json.
+Usage:
+  python scripts/benchmark_pipeline.py --intervals 10000 100000 --save-baseline reports/benchmarks/pipeline_baseline.json
+  python scripts/benchmark_pipeline.py --intervals 10000 --check reports/benchmarks/pipeline_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_dh_workbook import GENERATOR_VERSION, MAX_SHEET_INTERVALS, generate  # noqa: E402
+
+project_root = Path(__file__).parent.parent
+REPORT_PATH = Path('data') / 'normalized_sql_server' / 'pipeline_run_report.json'
+BASELINE_FORMAT = 1
+
+
+def workbook_paths(n_intervals: int, work_dir: Path, seed: int) -> List[str]:
+    """Generated workbook(s) for a size, written on first use."""
+    out = work_dir / f"dh_{n_intervals}_s{seed}_v{GENERATOR_VERSION}.xlsx"
+    if n_intervals <= MAX_SHEET_INTERVALS:
+        paths = [str(out)]
+    else:
+        paths = sorted(str(p) for p in work_dir.glob(f"{out.stem}_part*.xlsx"))
+    if not paths or not all(os.path.exists(p) for p in paths):
+        print(f"Generating {n_intervals:,} intervals -> {out}")
+        paths = generate(n_intervals, str(out), seed)
+    return paths
+
+
+def run_once(paths: List[str], engine: str) -> dict:
+    """One pipeline run in a fresh process: wall time, peak RSS and the stage times from its run report."""
+    cmd = [sys.executable, '-m', 'pipeline.pipeline_main', '--no-cache', '--engine', engine]
+    if len(paths) == 1:
+        cmd += ['--excel', os.path.abspath(paths[0]), '--force']
+    else:
+        # <stem>_part01.xlsx -> <stem>_part*.xlsx, leaving the parts of other sizes out
+        cmd += ['--batch', re.sub(r'_part\d+(\.xlsx)$', r'_part*\1', os.path.abspath(paths[0]))]
+    env = dict(os.environ, PYTHONPATH=str(project_root / 'src'))
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=err)
+        # wait4 gives this child's own rusage; ru_maxrss is in kilobytes on Linux, bytes on macOS
+        _, status, usage = os.wait4(proc.pid, 0)
+        seconds = time.perf_counter() - start
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        if proc.returncode != 0:
+            err.seek(0)
+            raise RuntimeError(f"pipeline failed:\n{err.read().decode('utf-8', 'replace')}")
+        report_path = Path(cwd) / REPORT_PATH
+        stages = {}
+        if report_path.exists():
+            with open(report_path, encoding='utf-8') as fh:
+                stages = {s['stage']: s['wall_seconds'] for s in json.load(fh)['stages']}
+    rss = usage.ru_maxrss / (1 << 20) if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+    return {'total_seconds': seconds, 'peak_rss_mb': rss, 'stages': stages}
+
+
+def benchmark(n_intervals: int, work_dir: Path, seed: int, engine: str, repeat: int) -> dict:
+    paths = workbook_paths(n_intervals, work_dir, seed)
+    runs = [run_once(paths, engine) for _ in range(repeat)]
+    stage_names = list(runs[0]['stages'])
+    return {
+        'total_seconds': statistics.median(r['total_seconds'] for r in runs),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'stages': {name: statistics.median(r['stages'][name] for r in runs) for name in stage_names},
+    }
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float, memory_tolerance: float,
+            min_seconds: float) -> List[str]:
+    """Print current vs baseline per metric; returns the metrics that regressed."""
+    regressions = []
+    print(f"\n{'size':>10}  {'metric':<28}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for size, current in results.items():
+        base = baseline['results'].get(size)
+        if base is None:
+            print(f"{size:>10}  (no baseline)")
+            continue
+        metrics = [('total_seconds', base['total_seconds'], current['total_seconds'], False)]
+        metrics += [(f"{name} s", base['stages'][name], current['stages'][name], False)
+                    for name in current['stages'] if name in base['stages']]
+        metrics.append(('peak_rss_mb', base['peak_rss_mb'], current['peak_rss_mb'], True))
+        for name, old, new, is_memory in metrics:
+            ratio = new / old if old > 0 else float('inf')
+            if is_memory:
+                regressed = new > old * memory_tolerance
+            else:
+                regressed = new > old * tolerance and new - old > min_seconds
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{size:>10}  {name:<28}{old:>10.2f}{new:>10.2f}{ratio:>8.2f}{flag}")
+            if regressed:
+                regressions.append(f"{size} {name}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic workbooks.")
+    parser.add_argument('--intervals', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Workbook sizes in DAT201 intervals (10k to 10M)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; times are medians")
+    parser.add_argument('--engine', choices=['openpyxl', 'xlsx'], default='openpyxl', help="Worksheet reader")
+    parser.add_argument('--seed', type=int, default=70, help="Seed of the generated workbooks")
+    parser.add_argument('--work-dir', default='data/benchmarks', help="Where generated workbooks are kept")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a baseline JSON")
+    parser.add_argument('--check', metavar='PATH', help="Compare with a baseline JSON; exit 1 on regression")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="Allowed slowdown factor per time")
+    parser.add_argument('--memory-tolerance', type=float, default=1.25, help="Allowed peak memory growth factor")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this many seconds (timer noise on tiny stages)")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results: Dict[str, dict] = {}
+    for n in args.intervals:
+        res = benchmark(n, work_dir, args.seed, args.engine, args.repeat)
+        results[str(n)] = res
+        print(f"{n:>10,} intervals: {res['total_seconds']:.2f}s, peak {res['peak_rss_mb']:.0f} MB")
+        for name, seconds in res['stages'].items():
+            print(f"{'':>12}{name:<26}{seconds:>8.2f}s")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        baseline = {
+            'format': BASELINE_FORMAT,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'machine': f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+            'engine': args.engine,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.save_baseline, 'w', encoding='utf-8') as fh:
+            json.dump(baseline, fh, indent=2)
+        print(f"Baseline -> {args.save_baseline}")
+
+    if args.check:
+        with open(args.check, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        if baseline.get('engine') != args.engine or baseline.get('seed') != args.seed:
+            print(f"Note: baseline used engine={baseline.get('engine')} seed={baseline.get('seed')}")
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_seconds)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Parity check and timing for the xlsx reader engine.
+Reads every worksheet of a workbook with openpyxl (read-only, values only) and
+with src/pipeline/xlsx_reader.py, asserts that the rows are identical (same
+values and same Python types) and prints both parse times per sheet.
+Usage:
+  python scripts/check_xlsx_engine.py --excel data/raw/DH70.xlsx
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import openpyxl
+
+# Add src to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from pipeline.xlsx_reader import XlsxBook  # noqa: E402
+
+
+def same_cell(a, b) -> bool:
+    # NaN never equals itself; bool/int and int/float must not pass as equal
+    return type(a) is type(b) and (a == b or (a != a and b != b))
+
+
+def first_mismatch(expected, actual):
+    """Index of the first differing row, or None when both row lists match."""
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if len(a) != len(b) or not all(same_cell(x, y) for x, y in zip(a, b)):
+            return i
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the xlsx reader engine with openpyxl on a workbook.")
+    parser.add_argument('--excel', default='data/raw/DH70.xlsx', help="Workbook to read")
+    parser.add_argument('--sheet', action='append', help="Only this worksheet (repeatable); all by default")
+    args = parser.parse_args()
+
+    wb = openpyxl.load_workbook(args.excel, data_only=True, read_only=True)
+    sheets = args.sheet or wb.sheetnames
+    failed = False
+    with XlsxBook(args.excel) as book:
+        for sheet in sheets:
+            t0 = time.perf_counter()
+            expected = list(wb[sheet].iter_rows(values_only=True))
+            t1 = time.perf_counter()
+            actual = list(book.iter_rows(sheet))
+            t2 = time.perf_counter()
+            bad = first_mismatch(expected, actual)
+            speedup = (t1 - t0) / (t2 - t1) if t2 > t1 else float('inf')
+            status = 'OK' if bad is None else f'MISMATCH at row {bad + 1}'
+            print(f"{sheet:<20} rows={len(expected):>9} openpyxl={t1 - t0:7.2f}s xlsx={t2 - t1:7.2f}s "
+                  f"x{speedup:4.1f}  {status}")
+            if bad is not None:
+                failed = True
+                print(f"  openpyxl: {expected[bad] if bad < len(expected) else '<no row>'}")
+                print(f"  xlsx:     {actual[bad] if bad < len(actual) else '<no row>'}")
+    wb.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
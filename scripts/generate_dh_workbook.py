@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Synthetic DH70-shaped workbook generator.
+Writes DAT201 (one row per interval, collar header values on each hole's
+first row, columns A..AH as in DH70.xlsx) plus the Seam Code and Rock Code
+lookup sheets. Hole lengths, interval thickness, the lithology mix, sampling
+rate and proximate analyses follow the distributions of the real DH70 data;
+TM + Ash + VM + FC sum to 100 on the as-received basis, with IM below TM. A
+small share of cells carries the messiness seen in DH70 (blank strings, -1.0
+sentinels, 'n.d.', padded lithology codes, float rock codes).
+
+A worksheet holds at most 1,048,575 intervals; larger requests are split into
+numbered workbooks of whole holes (<out>_part01.xlsx, ...) with distinct
+hole ids, ready for `pipeline_main --batch`.
+Usage:
+  python scripts/generate_dh_workbook.py --intervals 100000 --out data/raw/synthetic_100k.xlsx
+  python scripts/generate_dh_workbook.py --intervals 10000000 --out data/raw/synthetic_10m.xlsx
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+# Add src and scripts to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_extractors import DAT201_COLUMNS  # noqa: E402
+from pipeline.xlsx_reader import package_parts  # noqa: E402
+
+# Data rows per worksheet: Excel's 1,048,576 rows minus the header
+MAX_SHEET_INTERVALS = 1_048_575
+# Bumped whenever the same seed produces different data, so cached workbooks are regenerated
+GENERATOR_VERSION = 2
+HOLES_PER_CHUNK = 250
+# Worksheet children that follow <dimension>; it goes before the first one present
+_AFTER_DIMENSION = re.compile(rb'<(?:sheetViews|sheetFormatPr|cols|sheetData)\b')
+
+# (detail, lithology, rock code) as in DH70 'Rock Code'
+ROCK_TYPES = [
+    ('Lignite', 'LI', 1), ('Clayey lignite', 'CLLI', 2), ('Lignitic clay', 'LICL', 3),
+    ('Carbonaceous clay', 'CBCL', 4), ('Clay', 'CL', 5), ('Sand', 'SA', 6), ('Shale', 'SH', 7), ('Silt', 'SI', 8),
+    ('Top soil', 'SO', 9), ('Hard band in coal seam', 'HB', 11), ('Woody coal', 'WD', 12),
+    ('Carbonaceous sand', 'CBSA', 40), ('Conglomerate', 'CGL', 41), ('Gravelly clay', 'GRCL', 45),
+    ('Gravelly sand', 'GRSA', 46), ('Gravelly silt', 'GRSI', 48), ('Burned clay', 'BC', 51),
+    ('Clayey sand', 'CLSA', 56), ('Clayey silt', 'CLSI', 58), ('Clayey siltstone', 'CLST', 59),
+    ('Sandstone', 'SS', 61), ('Sandy claystone', 'SACL', 65), ('Sandy Slit', 'SASI', 68),
+    ('Sandy Gravel', 'SAGR', 69), ('Mudstone', 'MS', 71), ('Siltstone', 'ST', 81), ('Silty claystone', 'SICL', 85),
+    ('Silty sand', 'SISA', 86),
+]
+
+# Interval share per lithology in DH70 DAT201 (the rest spread over the other rock types)
+LITHOLOGY_MIX = {
+    'CL': 0.277, 'LI': 0.268, 'CBCL': 0.155, 'LICL': 0.082, 'CLLI': 0.070, 'SICL': 0.068,
+    'ST': 0.016, 'CLSA': 0.015, 'SA': 0.010, 'SACL': 0.010, 'HB': 0.007,
+}
+# Typical ash (%) per coal-bearing lithology; other lithologies are sampled rarely and are high-ash
+COAL_ASH = {'LI': (15, 30), 'CLLI': (30, 45), 'LICL': (45, 60), 'CBCL': (55, 75), 'HB': (60, 80)}
+
+# Seam Code sheet: systems in column order with the number of seams each defines in DH70
+SEAM_SYSTEMS = [('30', 30), ('46', 46), ('57', 57), ('58', 58), ('Quality', 139), ('73', 73)]
+
+
+def seam_labels(n: int) -> List[str]:
+    """n distinct seam labels from the top of the sequence down: I3, I2, I1, H3, ..., A1, I3a, I2a, ..."""
+    labels = [f"{letter}{k}{split}" for split in ('', *'abcdefgh') for letter in 'IHGFEDCBA' for k in (3, 2, 1)]
+    return labels[:n]
+
+
+def hole_lengths(n_intervals: int, rng: np.random.Generator) -> np.ndarray:
+    """Intervals per hole (DH70: 33..467, mean about 220) summing to n_intervals."""
+    mean = 220
+    lengths = np.clip(rng.normal(mean, 100, n_intervals // mean + 2), 33, 467).astype(np.int64)
+    while lengths.sum() < n_intervals:
+        lengths = np.concatenate([lengths, lengths])
+    ends = np.cumsum(lengths)
+    n_holes = int(np.searchsorted(ends, n_intervals)) + 1
+    lengths = lengths[:n_holes]
+    lengths[-1] -= int(ends[n_holes - 1]) - n_intervals
+    return lengths
+
+
+def lithology_table():
+    other = [lit for _, lit, _ in ROCK_TYPES if lit not in LITHOLOGY_MIX]
+    rest = (1.0 - sum(LITHOLOGY_MIX.values())) / len(other)
+    names = list(LITHOLOGY_MIX) + other
+    probs = np.array(list(LITHOLOGY_MIX.values()) + [rest] * len(other))
+    codes = {lit: code for _, lit, code in ROCK_TYPES}
+    return np.array(names, dtype=object), probs / probs.sum(), np.array([codes[n] for n in names])
+
+
+def messy(values: np.ndarray, rng: np.random.Generator, sentinel: float = 0.02, blank: float = 0.005,
+          text: float = 0.002) -> np.ndarray:
+    """Replace a small share of values with -1.0 sentinels, blank strings and 'n.d.' as in DH70."""
+    roll = rng.random(len(values))
+    values[roll < sentinel] = -1.0
+    values[(roll >= sentinel) & (roll < sentinel + blank)] = ''
+    values[(roll >= sentinel + blank) & (roll < sentinel + blank + text)] = 'n.d.'
+    return values
+
+
+def dat201_chunk(lengths: np.ndarray, first_hole: int, width: int, rng: np.random.Generator) -> Iterator[list]:
+    """DAT201 rows (34 cells) for consecutive holes starting at hole number first_hole."""
+    n = int(lengths.sum())
+    hole = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    first_row = np.zeros(n, dtype=bool)
+    first_row[starts] = True
+
+    thickness = np.clip(rng.lognormal(np.log(0.65), 0.8, n), 0.04, 12.0).round(2)
+    running = np.cumsum(thickness)
+    depth_to = np.round(running - np.repeat(running[starts] - thickness[starts], lengths), 2)
+    depth_from = np.round(depth_to - thickness, 2)
+    hole_depth = np.ceil(depth_to[np.cumsum(lengths) - 1])
+
+    names, probs, codes = lithology_table()
+    pick = rng.choice(len(names), n, p=probs)
+    lithology = names[pick].copy()
+    rock = codes[pick].astype(object)
+    roll = rng.random(n)
+    rock[roll < 0.01] = None
+    as_float = (roll >= 0.01) & (roll < 0.03)
+    rock[as_float] = codes[pick][as_float].astype(float).astype(object)
+    padded = (roll >= 0.03) & (roll < 0.04)
+    lithology[padded] = [f" {x} " for x in lithology[padded]]
+
+    # Proximate analysis (as received): TM + Ash + VM + FC = 100, inherent moisture below total
+    coal = np.array([name in COAL_ASH for name in names])[pick]
+    sampled = rng.random(n) < np.where(coal, 0.9, 0.15)
+    ash_range = np.array([COAL_ASH.get(name, (70, 90)) for name in names])[pick]
+    ash = rng.uniform(ash_range[:, 0], ash_range[:, 1]).round(2)
+    im = np.clip(rng.normal(9.4, 3.5, n), 1.5, 25)
+    tm = np.clip(im + rng.normal(23.4, 5, n), im + 1, 60)
+    # High-ash rock leaves little room: moisture takes at most 60% of what ash does not
+    tm = np.minimum(tm, 0.6 * (100 - ash)).round(2)
+    im = np.minimum(im, 0.8 * tm).round(2)
+    rest = 100 - tm - ash
+    vm = (rest * rng.uniform(0.55, 0.75, n)).round(2)
+    fc = np.round(100 - tm - ash - vm, 2)
+    sulphur = np.clip(rng.lognormal(np.log(0.5), 0.4, n), 0.05, 4).round(3)
+    rd = np.where(rng.random(n) < 0.28, (1.25 + ash * 0.011 + rng.normal(0, 0.05, n)).round(2), np.nan)
+    hgi = np.where(rng.random(n) < 0.07, rng.uniform(35, 95, n).round(0), np.nan)
+
+    def assay(values: np.ndarray) -> np.ndarray:
+        out = values.astype(object)
+        out[np.isnan(values.astype(float))] = None
+        out = messy(out, rng)
+        out[~sampled] = None
+        return out
+
+    assays = [assay(v) for v in (im, tm, ash, vm, fc, sulphur, rd, hgi)]
+    remarks = np.full(n, None, dtype=object)
+    remarks[rng.random(n) < 0.002] = 're-logged'
+
+    hole_numbers = np.arange(first_hole, first_hole + len(lengths)) + 1
+    hole_ids = np.array([f"BC{h:0{width}d}C" for h in hole_numbers], dtype=object)
+    easting = rng.uniform(740000, 742500, len(lengths)).round(3)
+    northing = rng.uniform(2180500, 2182100, len(lengths)).round(3)
+    elevation = rng.uniform(470, 605, len(lengths)).round(3)
+    year = rng.choice([2015, 2016, 2017, 2018], len(lengths))
+    geologist = rng.choice(['AUN', 'STB', 'VVI', 'KPT', 'SNP', None], len(lengths))
+    block = np.char.add(rng.choice(['30', '31', '32', '33'], len(lengths)), rng.choice(list('GHIJK'), len(lengths)))
+
+    cols = (hole_ids[hole].tolist(), depth_from.tolist(), depth_to.tolist(), rock.tolist(), lithology.tolist(),
+            *(a.tolist() for a in assays), remarks.tolist(), hole.tolist(), first_row.tolist())
+    for (dhid, frm, to, rock_code, lith, v_im, v_tm, v_ash, v_vm, v_fc, v_s, v_rd, v_hgi, remark,
+         h, is_first) in zip(*cols):
+        row: List[Optional[object]] = [None] * len(DAT201_COLUMNS)
+        row[0], row[4], row[5], row[7], row[8] = dhid, frm, to, rock_code, lith
+        row[9:17] = [v_im, v_tm, v_ash, v_vm, v_fc, v_s, v_rd, v_hgi]
+        row[17] = remark
+        if is_first:
+            row[1], row[2], row[3] = float(easting[h]), float(northing[h]), float(elevation[h])
+            row[6] = float(hole_depth[h])
+            row[25], row[26] = int(year[h]), geologist[h]
+            row[32], row[33] = str(block[h]), 0
+        yield row
+
+
+def add_dimensions(path: str, dimensions: Dict[str, str]) -> None:
+    """Insert <dimension ref=...> into the named worksheets, as Excel writes it.
+    openpyxl's write-only mode leaves it out, and without it openpyxl read-only mode
+    scans every sheet in full when the workbook is opened.
+    """
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as dst:
+        parts = {part: dimensions[name] for name, part in package_parts(src)[0].items() if name in dimensions}
+        for info in src.infolist():
+            with src.open(info) as fin, dst.open(info.filename, 'w', force_zip64=True) as fout:
+                if info.filename in parts:
+                    head = fin.read(1 << 16)
+                    at = _AFTER_DIMENSION.search(head).start()
+                    fout.write(head[:at] + f'<dimension ref="{parts[info.filename]}"/>'.encode('ascii') + head[at:])
+                shutil.copyfileobj(fin, fout, 1 << 20)
+    os.replace(tmp, path)
+
+
+def write_workbook(path: str, lengths: np.ndarray, first_hole: int, width: int, rng: np.random.Generator) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('DAT201')
+    ws.append(DAT201_COLUMNS)
+    # Generate a few hundred holes at a time so memory stays flat at any size
+    for k in range(0, len(lengths), HOLES_PER_CHUNK):
+        for row in dat201_chunk(lengths[k:k + HOLES_PER_CHUNK], first_hole + k, width, rng):
+            ws.append(row)
+
+    sc = wb.create_sheet('Seam Code')
+    header = []
+    for system_id, _ in SEAM_SYSTEMS:
+        header += [int(system_id) if system_id.isdigit() else system_id, 'Seam Label', 'Seam Code']
+    sc.append(header)
+    columns = [seam_labels(count) for _, count in SEAM_SYSTEMS]
+    for i in range(max(len(c) for c in columns)):
+        row: List[Optional[object]] = []
+        for labels in columns:
+            row += [None, labels[i], i + 1] if i < len(labels) else [None, None, None]
+        sc.append(row)
+
+    rc = wb.create_sheet('Rock Code')
+    rc.append(['Detail', 'Lithology', 'Code'])
+    for detail, lithology, code in ROCK_TYPES:
+        rc.append([detail, lithology, code])
+    wb.save(path)
+    add_dimensions(path, {
+        'DAT201': f"A1:{get_column_letter(len(DAT201_COLUMNS))}{int(lengths.sum()) + 1}",
+        'Seam Code': f"A1:{get_column_letter(len(header))}{max(len(c) for c in columns) + 1}",
+        'Rock Code': f"A1:C{len(ROCK_TYPES) + 1}",
+    })
+
+
+def generate(n_intervals: int, out: str, seed: int = 70) -> List[str]:
+    """Write the workbook(s) for n_intervals DAT201 rows; returns the paths written."""
+    rng = np.random.default_rng(seed)
+    lengths = hole_lengths(n_intervals, rng)
+    width = max(2, len(str(len(lengths))))
+    # Whole holes per workbook, each workbook below the worksheet row limit
+    parts, part, total = [], [], 0
+    for i, n in enumerate(lengths.tolist()):
+        if total + n > MAX_SHEET_INTERVALS:
+            parts.append(part)
+            part, total = [], 0
+        part.append(i)
+        total += n
+    parts.append(part)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    stem, ext = os.path.splitext(out)
+    paths = [out] if len(parts) == 1 else [f"{stem}_part{k + 1:02d}{ext or '.xlsx'}" for k in range(len(parts))]
+    for path, holes in zip(paths, parts):
+        write_workbook(path, lengths[holes[0]:holes[-1] + 1], holes[0], width, rng)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic DH70-shaped drillhole workbook.")
+    parser.add_argument('--intervals', type=int, default=100_000, help="DAT201 rows (10k to 10M)")
+    parser.add_argument('--out', default='data/raw/synthetic_dh.xlsx', help="Workbook path (stem of the parts when split)")
+    parser.add_argument('--seed', type=int, default=70, help="Random seed; the same seed writes the same data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = generate(args.intervals, args.out, args.seed)
+    for path in paths:
+        print(f"✓ {path} ({os.path.getsize(path) / (1 << 20):.1f} MB)")
+    print(f"{args.intervals:,} intervals in {time.perf_counter() - start:.1f}s")
+    if len(paths) > 1:
+        print(f"Run all parts with: python -m pipeline.pipeline_main --batch '{os.path.splitext(args.out)[0]}_part*.xlsx'")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,135 +4,147 @@
 Load normalized CSVs into SQL Server using pymssql (no sqlcmd/bcp required).
 - Runs schema from sql/create_sql_server_schema.sql (splits on GO)
 - Inserts CSVs for: seam_codes_lookup, rock_types, collars, lithology_logs, sample_analyses
-- Uses IDENTITY_INSERT where needed
+- Keeps the ids of the CSVs (IDENTITY_INSERT where needed)
+- Reads the typed Parquet outputs instead of the CSVs when present (--format auto)
+- Maps columns by header name (src/pipeline/table_loader.py LOAD_TABLES): CSV values are
+  converted once to native types by the schema in src/pipeline/schema.py, and columns
+  the target table does not have are left out
+- --target picks the backend (src/pipeline/load_backends.py): sqlserver bulk-copies
+  through pymssql; sqlite loads a local file with the same tables and constraints
+  (sql/create_sqlite_schema.sql), to run and time the loader without a server
+- Tables are loaded in row-range partitions over --workers connections, each table
+  once the tables its foreign keys reference are in (src/pipeline/table_loader.py);
+  a failed partition is retried up to --retries times
+- --delta applies only the rows whose content changed since the last load (matched on
+  natural keys by the row hashes stored in load_row_hashes) with staged MERGEs, and
+  prints what changed (src/pipeline/delta_loader.py)
+- Full loads are checkpointed per partition in the target's load_log table and a local
+  progress file; --resume continues an interrupted load after its last committed
+  partition instead of re-creating the schema and starting over
 Usage:
   python scripts/load_to_sqlserver.py --server 35.247.159.73 --db HongsaDB --user hongsa --password 'Pa55w.rd'
+  python scripts/load_to_sqlserver.py --target sqlite --sqlite-path data/normalized.sqlite
+  python scripts/load_to_sqlserver.py --server ... --workers 4 --partition-rows 200000
+  python scripts/load_to_sqlserver.py --server ... --delta
+  python scripts/load_to_sqlserver.py --server ... --resume
 """
 
 import argparse
-import csv
 import os
-import pymssql
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from pipeline.delta_loader import load_delta, row_hasher  # noqa: E402
+from pipeline.load_backends import BACKENDS, open_backend  # noqa: E402
+from pipeline.schema import table_filename, table_format  # noqa: E402
+from pipeline.table_loader import (  # noqa: E402
+    DEFAULT_PARTITION_ROWS, LOAD_TABLES, ConnectionPool, LoadCheckpoint, load_tables, table_source,
+)
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
-SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data', 'normalized_sql_server')
+PROGRESS_FILE = 'load_progress.json'
 
 
-def run_sql_file(conn, path):
-	with open(path, 'r', encoding='utf-8') as f:
-		text = f.read()
-	# Split on lines that are exactly GO
-	batches = []
-	batch = []
-	for line in text.splitlines():
-		if line.strip().upper() == 'GO':
-			batches.append('\n'.join(batch))
-			batch = []
-		else:
-			batch.append(line)
-	if batch:
-		batches.append('\n'.join(batch))
-
-	with conn.cursor() as cur:
-		for b in batches:
-			stmt = b.strip()
-			if not stmt:
-				continue
-			cur.execute(stmt)
-		conn.commit()
-
-
-def insert_csv(conn, table, columns, csv_path, keep_identity=False, batch_size: int = 5000):
-    total_inserted = 0
-    placeholders = ','.join(['%s'] * len(columns))
-    col_list = ','.join(columns)
-    with conn.cursor() as cur, open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        next(reader, None)  # skip header
-        if keep_identity:
-            cur.execute(f"SET IDENTITY_INSERT {table} ON;")
-        batch = []
-        for row in reader:
-            batch.append(tuple((None if v == '' else v) for v in row))
-            if len(batch) >= batch_size:
-                cur.executemany(
-                    f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})",
-                    batch,
-                )
-                total_inserted += len(batch)
-                batch.clear()
-        if batch:
-            cur.executemany(
-                f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})",
-                batch,
-            )
-            total_inserted += len(batch)
-        if keep_identity:
-            cur.execute(f"SET IDENTITY_INSERT {table} OFF;")
-    conn.commit()
-    return total_inserted
+def load_fingerprint(args, fmt):
+    """What a full load reads and where it writes; a load only resumes while this is unchanged."""
+    if args.target == 'sqlserver':
+        target = f"sqlserver://{args.server}/{args.db}"
+    else:
+        target = f"sqlite://{os.path.abspath(args.sqlite_path)}"
+    sources = {}
+    for spec in LOAD_TABLES:
+        st = os.stat(os.path.join(args.data_dir, table_filename(spec.source, fmt)))
+        sources[spec.source] = [st.st_size, st.st_mtime_ns]
+    return {'target': target, 'partition_rows': args.partition_rows, 'sources': sources}
 
 
 def main():
 	ap = argparse.ArgumentParser()
-	ap.add_argument('--server', required=True)
-	ap.add_argument('--db', required=True)
-	ap.add_argument('--user', required=True)
-	ap.add_argument('--password', required=True)
+	ap.add_argument('--target', choices=sorted(BACKENDS), default='sqlserver',
+					help="Load target: SQL Server (bulk copy) or a local SQLite file")
+	ap.add_argument('--server')
+	ap.add_argument('--db')
+	ap.add_argument('--user')
+	ap.add_argument('--password')
+	ap.add_argument('--sqlite-path', default=os.path.join(PROJECT_ROOT, 'data', 'normalized.sqlite'),
+					help="Database file for --target sqlite (recreated on every load)")
+	ap.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk-copy or insert batch")
+	ap.add_argument('--workers', type=int, default=1, help="Partitions loaded at once, one connection each")
+	ap.add_argument('--partition-rows', type=int, default=DEFAULT_PARTITION_ROWS,
+					help="Rows per partition; each partition is loaded and committed as a unit")
+	ap.add_argument('--retries', type=int, default=2, help="Attempts to repeat a failed partition")
+	mode = ap.add_mutually_exclusive_group()
+	mode.add_argument('--delta', action='store_true',
+					  help="Keep the schema and apply only inserted, updated and deleted rows (one connection)")
+	mode.add_argument('--resume', action='store_true',
+					  help="Continue the interrupted full load recorded in --progress-file")
+	ap.add_argument('--progress-file', default=None,
+					help=f"Progress file of full loads (default: {PROGRESS_FILE} in --data-dir)")
+	ap.add_argument('--data-dir', default=DATA_DIR)
+	ap.add_argument('--format', choices=['auto', 'csv', 'parquet'], default='auto',
+					help="Input format; auto uses Parquet when every table has a .parquet file")
 	args = ap.parse_args()
+	if args.target == 'sqlserver':
+		missing = [f"--{a}" for a in ('server', 'db', 'user', 'password') if getattr(args, a) is None]
+		if missing:
+			ap.error(f"--target sqlserver needs {', '.join(missing)}")
+		options = dict(server=args.server, user=args.user, password=args.password, database=args.db)
+	else:
+		options = dict(path=args.sqlite_path)
+	fmt = table_format(args.data_dir, args.format)
+
+	text_timestamps = not BACKENDS[args.target].native_timestamps
+	sources = {spec.table: table_source(spec, args.data_dir, fmt, text_timestamps) for spec in LOAD_TABLES}
 
-	conn = pymssql.connect(server=args.server, user=args.user, password=args.password, database=args.db)
+	pool = ConnectionPool(lambda: open_backend(args.target, **options), size=args.workers)
 	try:
-		# 1) Run schema
-		run_sql_file(conn, os.path.join(SQL_DIR, 'create_sql_server_schema.sql'))
-
-		# 2) Load data
-		loaded = {}
-		loaded['seam_codes_lookup'] = insert_csv(
-			conn,
-			'tdbo.seam_codes_lookup'.replace('tdbo.', 'dbo.'),
-			['seam_id','system_id','system_name','seam_label','seam_code','priority','description','created_at'],
-			os.path.join(DATA_DIR, 'seam_codes_lookup.csv'),
-			keep_identity=True,
-		)
-		loaded['rock_types'] = insert_csv(
-			conn,
-			'dbo.rock_types',
-			['rock_code','lithology','detail','created_at'],
-			os.path.join(DATA_DIR, 'rock_types.csv'),
-			keep_identity=False,
-		)
-		loaded['collars'] = insert_csv(
-			conn,
-			'dbo.collars',
-			['collar_id','hole_id','easting','northing','elevation','final_depth','dip','drilling_date','azimuth','contractor','remarks','created_at','updated_at'],
-			os.path.join(DATA_DIR, 'collars.csv'),
-			keep_identity=True,
-		)
-		loaded['lithology_logs'] = insert_csv(
-			conn,
-			'dbo.lithology_logs',
-			['log_id','hole_id','depth_from','depth_to','rock_code','description','created_at'],
-			os.path.join(DATA_DIR, 'lithology_logs.csv'),
-			keep_identity=True,
-		)
-		loaded['sample_analyses'] = insert_csv(
-			conn,
-			'dbo.sample_analyses',
-			['sample_id','hole_id','depth_from','depth_to','sample_no','im','tm','ash','vm','fc','sulphur','gross_cv','net_cv','sg','rd','hgi','seam_quality_id','seam_73_id','seam_code_quality_original','analysis_date','lab_name','remarks','created_at','updated_at'],
-			os.path.join(DATA_DIR, 'sample_analyses.csv'),
-			keep_identity=True,
-		)
+		if args.delta:
+			with pool.connection() as backend:
+				summaries = load_delta(LOAD_TABLES, sources, backend, partition_rows=args.partition_rows,
+									   batch_size=args.batch_size)
+			for summary in summaries:
+				print(f"{summary.table}: {summary.inserted} inserted, {summary.updated} updated, "
+					  f"{summary.deleted} deleted, {summary.unchanged} unchanged")
+			changed = sum(summary.inserted + summary.updated + summary.deleted for summary in summaries)
+			print(f"Delta load: {changed} row(s) changed" if changed else "Delta load: target already up to date")
+		else:
+			progress_file = args.progress_file or os.path.join(args.data_dir, PROGRESS_FILE)
+			fingerprint = load_fingerprint(args, fmt)
+			if args.resume:
+				try:
+					checkpoint = LoadCheckpoint.resume(progress_file, fingerprint)
+				except (OSError, ValueError) as exc:
+					sys.exit(f"Cannot resume: {exc}")
+				with pool.connection() as backend:
+					checkpoint.add_committed(backend.load_log(checkpoint.load_id))
+				if checkpoint.complete:
+					print(f"Load {checkpoint.load_id} already completed; nothing to resume")
+				else:
+					print(f"Resuming load {checkpoint.load_id}: {len(checkpoint.done)} partition(s) already committed")
+			else:
+				checkpoint = LoadCheckpoint.start(progress_file, fingerprint)
+
+			# 1) Run schema
+			if not checkpoint.schema_created:
+				with pool.connection() as backend:
+					backend.create_schema()
+				checkpoint.update(schema_created=True)
+
+			# 2) Load data, with the row hashes later delta loads compare against
+			if not checkpoint.complete:
+				load_tables(LOAD_TABLES, sources, pool, workers=args.workers, partition_rows=args.partition_rows,
+							retries=args.retries, batch_size=args.batch_size, checkpoint=checkpoint,
+							row_hasher=row_hasher)
+				checkpoint.update(complete=True)
 
 		# 3) Report counts
-		with conn.cursor(as_dict=True) as cur:
-			cur.execute("SELECT 'seam_codes' t, COUNT(*) c FROM seam_codes_lookup UNION ALL SELECT 'rock_types', COUNT(*) FROM rock_types UNION ALL SELECT 'collars', COUNT(*) FROM collars UNION ALL SELECT 'lithology_logs', COUNT(*) FROM lithology_logs UNION ALL SELECT 'sample_analyses', COUNT(*) FROM sample_analyses;")
-			rows = cur.fetchall()
-		for r in rows:
-			print(f"{r['t']}: {r['c']}")
+		with pool.connection() as backend:
+			for spec in LOAD_TABLES:
+				print(f"{spec.source}: {backend.count(spec.table)}")
 	finally:
-		conn.close()
+		pool.close()
 
 
 if __name__ == '__main__':
@@ -1,10 +1,42 @@
 import argparse
+import hashlib
+import json
 import os
+import re
+import shutil
+import sys
+import tempfile
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from pipeline.qa_rules import DEFAULT_RULES, evaluate_rules, rule_columns  # noqa: E402
+from pipeline.scheduler import Task, TaskGraphError, run_tasks  # noqa: E402
+from pipeline.streaming import ChunkedCsvWriter  # noqa: E402
+from pipeline.schema import (  # noqa: E402
+    COMPACT_DTYPES, align_float32, compact_table, read_table, table_format, widen_float32,
+)
+
+
+# Depths closer than this are treated as equal
+DEPTH_TOLERANCE = 1e-9
+
+# Chunked mode: rows per read of lithology/samples, and CSV bytes per hole partition
+DEFAULT_CHUNK_ROWS = 100_000
+PARTITION_BYTES = 64 << 20
+
+# Incremental mode: per-hole hashes and per-bucket results kept in out_dir/validation_state/
+STATE_DIR = "validation_state"
+STATE_NAME = "state.json"
+STATE_FORMAT = 1
+# Bump whenever a check reports differently for the same tables; the next incremental run re-checks everything
+VALIDATOR_VERSION = 2
+HOLE_BUCKETS = 64
+
 
 @dataclass
 class CheckResult:
@@ -14,11 +46,20 @@ class CheckResult:
     issues: Optional[pd.DataFrame] = None
 
 
-def read_csv_safe(path: str, dtype=None) -> pd.DataFrame:
-    return pd.read_csv(path, dtype=dtype, keep_default_na=True, na_values=["", " ", "NA", "NaN", "nan"])
+def read_csv_safe(path: str, dtype=None, table: Optional[str] = None) -> pd.DataFrame:
+    """Read a CSV; with a table name, into the compact dtypes the extractors produce (pipeline.schema.COMPACT_DTYPES)."""
+    if table is not None and dtype is None:
+        # Categorical while parsing, so the text columns are never held as one object per row
+        dtype = {c: "category" for c, d in COMPACT_DTYPES.get(table, {}).items() if d == "category"}
+    df = pd.read_csv(path, dtype=dtype, keep_default_na=True, na_values=["", " ", "NA", "NaN", "nan"])
+    return compact_table(table, df) if table is not None else df
 
 
 def check_hole_referential_integrity(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame) -> List[CheckResult]:
+    return check_collar_hole_ids(collars) + check_hole_references(collars, lith, samples)
+
+
+def check_collar_hole_ids(collars: pd.DataFrame) -> List[CheckResult]:
     results: List[CheckResult] = []
 
     # collars.hole_id must be unique and not null
@@ -41,6 +82,11 @@ def check_hole_referential_integrity(collars: pd.DataFrame, lith: pd.DataFrame,
             issues=dup_holes if len(dup_holes) else None,
         )
     )
+    return results
+
+
+def check_hole_references(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame) -> List[CheckResult]:
+    results: List[CheckResult] = []
 
     # lithology_logs.hole_id must exist in collars
     lith_bad = lith[~lith["hole_id"].isin(collars["hole_id"])][["log_id", "hole_id", "depth_from", "depth_to"]]
@@ -104,6 +150,146 @@ def check_rock_codes(lith: pd.DataFrame, rock_types: pd.DataFrame) -> List[Check
     return results
 
 
+def _sort_order(*keys: np.ndarray) -> np.ndarray:
+    """np.lexsort(keys) (last key primary, NaN last), without sorting when the rows are already in that order."""
+    if not any(k.dtype.kind == "f" and np.isnan(k).any() for k in keys):
+        ordered = np.zeros(max(len(keys[0]) - 1, 0), dtype=bool)
+        tied = np.ones_like(ordered)
+        for key in reversed(keys):
+            step = np.diff(key)
+            ordered |= tied & (step > 0)
+            tied &= step == 0
+        if (ordered | tied).all():
+            return np.arange(len(keys[0]))
+    return np.lexsort(keys)
+
+
+def find_overlaps_and_gaps(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Overlapping and gapped consecutive intervals per hole, over all holes at once.
+    Intervals are ordered by (hole_id, depth_from, depth_to); each one is compared with the interval
+    before it in the same hole. Rows without a hole_id are skipped.
+    """
+    holes = df["hole_id"]
+    if isinstance(holes.dtype, pd.CategoricalDtype):
+        # Category order is the order sort_values uses for a categorical
+        codes = holes.cat.codes.to_numpy().astype(np.int64)
+    else:
+        codes, _ = pd.factorize(holes, sort=True)
+    all_from = df["depth_from"].to_numpy(dtype="float64", na_value=np.nan)
+    all_to = df["depth_to"].to_numpy(dtype="float64", na_value=np.nan)
+    # Stable sort by (hole, depth_from, depth_to), NaN depths last; same order as DataFrame.sort_values
+    present = np.flatnonzero(codes >= 0)
+    # Logs written by the pipeline are already in this order, which saves the sort
+    order = present[_sort_order(all_to[present], all_from[present], codes[present])]
+    codes, depth_from, depth_to = codes[order], all_from[order], all_to[order]
+
+    # Row i against row i - 1 of the same hole; NaN depths compare False and are never flagged
+    same_hole = np.zeros(len(order), dtype=bool)
+    same_hole[1:] = codes[1:] == codes[:-1]
+    prev_to = np.empty(len(order))
+    prev_to[0:1] = np.nan
+    prev_to[1:] = depth_to[:-1]
+    with np.errstate(invalid="ignore"):
+        overlap = same_hole & (depth_from < prev_to - DEPTH_TOLERANCE)
+        gap = same_hole & (depth_from > prev_to + DEPTH_TOLERANCE)
+
+    def issues(mask: np.ndarray, extra: Optional[str] = None) -> pd.DataFrame:
+        # Values taken in their own dtype, so float32 depths keep their decimal text in the issue files
+        rows = np.flatnonzero(mask)
+        at, before = order[rows], order[rows - 1]
+        out = pd.DataFrame({
+            "hole_id": df["hole_id"].iloc[at].to_numpy(),
+            "prev_log_id": df["log_id"].iloc[before].to_numpy(),
+            "prev_to": df["depth_to"].iloc[before].to_numpy(),
+            "log_id": df["log_id"].iloc[at].to_numpy(),
+            "depth_from": df["depth_from"].iloc[at].to_numpy(),
+            "depth_to": df["depth_to"].iloc[at].to_numpy(),
+        })
+        if extra is not None:
+            out[extra] = np.round(depth_from[rows] - prev_to[rows], 6)
+        return out
+
+    return issues(overlap), issues(gap, "gap")
+
+
+def _hole_codes(*columns: pd.Series) -> List[np.ndarray]:
+    """Integer codes of hole_id columns over one shared, sorted set of categories (-1 for a null hole_id)."""
+    cats = [c if isinstance(c.dtype, pd.CategoricalDtype) else c.astype("category") for c in columns]
+    union = cats[0].cat.categories
+    for c in cats[1:]:
+        union = union.union(c.cat.categories)
+    return [c.cat.set_categories(union).cat.codes.to_numpy().astype(np.int64) for c in cats]
+
+
+def _pair_keys(codes: np.ndarray, depths: np.ndarray) -> np.ndarray:
+    """(hole code, depth) pairs as complex numbers, which NumPy sorts and searches lexicographically."""
+    keys = np.empty(len(codes), dtype=np.complex128)
+    keys.real = codes
+    keys.imag = depths
+    return keys
+
+
+def find_uncovered_samples(samples: pd.DataFrame, lith: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """Samples not covered by their hole's lithology, and the number covered only by several adjacent intervals.
+    One searchsorted over (hole, depth) pairs finds, for all samples at once, the last lithology interval
+    of the same hole starting no deeper than the sample's depth_from. The sample is covered when an interval from there reaches its depth_to, or when
+    consecutive intervals without a gap do. Issue rows carry matched_log_id (the interval the sample starts
+    in, if any), coverage ('none' or 'partial') and covered_to (how far lithology reaches without a gap).
+    Samples without a hole_id are skipped.
+    """
+    lith_codes, samp_codes = _hole_codes(lith["hole_id"], samples["hole_id"])
+    # float32 depths widened to their decimals, so covered_to reads like the input
+    lith_from = widen_float32(lith["depth_from"]).to_numpy(dtype="float64", na_value=np.nan)
+    lith_to = widen_float32(lith["depth_to"]).to_numpy(dtype="float64", na_value=np.nan)
+
+    # Lithology by (hole, depth_from, depth_to): running max depth_to per hole, the interval reaching it,
+    # and runs of intervals without a gap with the depth each run reaches
+    keep = np.flatnonzero((lith_codes >= 0) & ~np.isnan(lith_from))
+    keep = keep[_sort_order(lith_to[keep], lith_from[keep], lith_codes[keep])]
+    codes, starts = lith_codes[keep], lith_from[keep]
+    ends = np.nan_to_num(lith_to[keep], nan=-np.inf)
+    reach = pd.Series(ends).groupby(codes).cummax().to_numpy()
+    reached_by = pd.Series(np.where(ends == reach, np.arange(len(keep)), -1)).groupby(codes).cummax().to_numpy()
+    new_run = np.ones(len(keep), dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (starts[1:] > reach[:-1] + DEPTH_TOLERANCE)
+    run = np.cumsum(new_run) - 1
+    run_last = np.append(np.flatnonzero(new_run)[1:] - 1, len(keep) - 1)
+    run_reach = reach[run_last][run] if len(keep) else reach
+    # Sentinel entry at len(keep) for samples without a matching interval
+    reach, run_reach = np.append(reach, -np.inf), np.append(run_reach, -np.inf)
+    reached_by = np.append(reached_by, len(keep))
+    log_ids = np.append(lith["log_id"].to_numpy()[keep], 0)
+
+    # Each sample against the last interval of its hole starting no deeper; samples and lithology are both
+    # in (hole, depth) order, which keeps the search fast
+    samp_from = widen_float32(samples["depth_from"]).to_numpy(dtype="float64", na_value=np.nan)
+    samp_to = widen_float32(samples["depth_to"]).to_numpy(dtype="float64", na_value=np.nan)
+    rows = np.flatnonzero(samp_codes >= 0)
+    rows = rows[_sort_order(samp_from[rows], samp_codes[rows])]
+    matched = np.full(len(samples), -1, dtype=np.int64)
+    valid = rows[~np.isnan(samp_from[rows])]
+    at = np.searchsorted(_pair_keys(codes, starts), _pair_keys(samp_codes[valid], samp_from[valid]), side="right") - 1
+    found = at >= 0
+    found[found] = codes[at[found]] == samp_codes[valid][found]
+    matched[valid[found]] = at[found]
+
+    j = np.where(matched[rows] >= 0, matched[rows], len(keep))
+    with np.errstate(invalid="ignore"):
+        single = samp_to[rows] <= reach[j] + DEPTH_TOLERANCE
+        # Lithology continues below the sample's depth_from, so at least part of the sample is logged
+        starts_inside = ~single & ~np.isnan(samp_to[rows]) & (samp_from[rows] < reach[j] - DEPTH_TOLERANCE)
+        adjacent = starts_inside & (samp_to[rows] <= run_reach[j] + DEPTH_TOLERANCE)
+    bad = ~(single | adjacent)
+
+    issue_rows = rows[bad]
+    inside = starts_inside[bad]
+    uncovered = samples.iloc[issue_rows][["sample_id", "hole_id", "depth_from", "depth_to", "sample_no"]].reset_index(drop=True)
+    uncovered["matched_log_id"] = pd.Series(log_ids[reached_by[j[bad]]], dtype="Int64").where(inside)
+    uncovered["coverage"] = np.where(inside, "partial", "none")
+    uncovered["covered_to"] = np.where(inside, run_reach[j[bad]], np.nan)
+    return uncovered, int(adjacent.sum())
+
+
 def check_depth_intervals(lith: pd.DataFrame, samples: pd.DataFrame) -> List[CheckResult]:
     results: List[CheckResult] = []
 
@@ -132,27 +318,7 @@ def check_depth_intervals(lith: pd.DataFrame, samples: pd.DataFrame) -> List[Che
         )
     )
 
-    # Overlaps in lithology per hole
-    def find_overlaps(df: pd.DataFrame) -> pd.DataFrame:
-        overlaps: List[pd.DataFrame] = []
-        for hole_id, g in df.sort_values(["hole_id", "depth_from", "depth_to"]).groupby("hole_id"):
-            prev_to = None
-            prev_row = None
-            for _, row in g.iterrows():
-                if prev_to is not None and row["depth_from"] < prev_to - 1e-9:
-                    overlaps.append(pd.DataFrame({
-                        "hole_id": [hole_id],
-                        "prev_log_id": [prev_row["log_id"]],
-                        "prev_to": [prev_to],
-                        "log_id": [row["log_id"]],
-                        "depth_from": [row["depth_from"]],
-                        "depth_to": [row["depth_to"]],
-                    }))
-                prev_to = row["depth_to"]
-                prev_row = row
-        return pd.concat(overlaps, ignore_index=True) if overlaps else pd.DataFrame(columns=["hole_id", "prev_log_id", "prev_to", "log_id", "depth_from", "depth_to"])
-
-    overlaps = find_overlaps(lith)
+    overlaps, gaps = find_overlaps_and_gaps(lith)
     results.append(
         CheckResult(
             name="lithology_logs have no overlapping intervals per hole",
@@ -161,54 +327,39 @@ def check_depth_intervals(lith: pd.DataFrame, samples: pd.DataFrame) -> List[Che
             issues=overlaps if len(overlaps) else None,
         )
     )
+    results.append(
+        CheckResult(
+            name="lithology_logs have no gaps between intervals per hole",
+            passed=len(gaps) == 0,
+            details=f"gap count={len(gaps)}" if len(gaps) else None,
+            issues=gaps if len(gaps) else None,
+        )
+    )
 
-    # Samples should fall within at least one lith interval for the same hole
-    # Fast-ish check via merge-asof style: for each sample, find lith with depth_from <= sample_from then test depth_to >= sample_to
-    samp = samples.sort_values(["hole_id", "depth_from"]).copy()
-    lith_sorted = lith.sort_values(["hole_id", "depth_from"]).copy()
+    zero = lith[(lith["depth_to"] - lith["depth_from"]).abs() <= DEPTH_TOLERANCE][["log_id", "hole_id", "depth_from", "depth_to"]]
+    results.append(
+        CheckResult(
+            name="lithology_logs have no zero-thickness intervals",
+            passed=len(zero) == 0,
+            details=f"zero-thickness intervals={len(zero)}" if len(zero) else None,
+            issues=zero if len(zero) else None,
+        )
+    )
 
-    unmatched_rows: List[pd.DataFrame] = []
-    for hole_id, g_samp in samp.groupby("hole_id"):
-        g_lith = lith_sorted[lith_sorted["hole_id"] == hole_id]
-        if g_lith.empty:
-            unmatched_rows.append(g_samp[["sample_id", "hole_id", "depth_from", "depth_to", "sample_no"]])
-            continue
-        # For each sample interval, check coverage
-        # Use a left-merge on depth_from less-equal via searchsorted
-        lith_starts = g_lith["depth_from"].to_numpy()
-        lith_ends = g_lith["depth_to"].to_numpy()
-        lith_ids = g_lith["log_id"].to_numpy()
-        idxs = lith_starts.searchsorted(g_samp["depth_from"].to_numpy(), side="right") - 1
-        idxs[idxs < 0] = -1
-
-        rows: List[pd.DataFrame] = []
-        for (i, (_, sr)) in enumerate(g_samp.iterrows()):
-            j = int(idxs[i])
-            ok = False
-            matched_log = None
-            if j >= 0:
-                if sr["depth_to"] <= lith_ends[j] + 1e-9:
-                    ok = True
-                    matched_log = int(lith_ids[j])
-            if not ok:
-                rows.append(pd.DataFrame({
-                    "sample_id": [sr["sample_id"]],
-                    "hole_id": [sr["hole_id"]],
-                    "depth_from": [sr["depth_from"]],
-                    "depth_to": [sr["depth_to"]],
-                    "sample_no": [sr["sample_no"]],
-                    "matched_log_id": [matched_log],
-                }))
-        if rows:
-            unmatched_rows.append(pd.concat(rows, ignore_index=True))
-
-    unmatched = pd.concat(unmatched_rows, ignore_index=True) if unmatched_rows else pd.DataFrame(columns=["sample_id", "hole_id", "depth_from", "depth_to", "sample_no", "matched_log_id"])
+    # Samples should fall within the lithology logged for the same hole, in one interval or several adjacent ones
+    uncovered, spanning = find_uncovered_samples(samples, lith)
+    details = None
+    if len(uncovered):
+        partial = int((uncovered["coverage"] == "partial").sum())
+        details = f"uncovered samples={len(uncovered)} (partially covered={partial})"
+    elif spanning:
+        details = f"covered across adjacent intervals={spanning}"
     results.append(
         CheckResult(
             name="sample_analyses intervals covered by lithology intervals",
-            passed=len(unmatched) == 0,
-            details=f"uncovered samples={len(unmatched)}" if len(unmatched) else None,
-            issues=unmatched if len(unmatched) else None,
+            passed=len(uncovered) == 0,
+            details=details,
+            issues=uncovered if len(uncovered) else None,
         )
     )
 
@@ -240,16 +391,125 @@ def check_seam_codes(samples: pd.DataFrame, seam_lookup: pd.DataFrame) -> List[C
     return results
 
 
-def main(data_dir: str, out_dir: str) -> None:
-    os.makedirs(out_dir, exist_ok=True)
+def check_rules(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame,
+                seam_lookup: pd.DataFrame) -> List[CheckResult]:
+    """The declarative range, cross-field and lookup rules of pipeline.qa_rules, one pass per table."""
+    tables = {"collars": collars, "lithology_logs": lith, "sample_analyses": samples, "seam_codes": seam_lookup}
+    return [
+        CheckResult(
+            name=res.rule.name,
+            passed=res.violations == 0,
+            details=res.skipped or (f"violations={res.violations}" if res.violations else None),
+            issues=res.issues,
+        )
+        for res in evaluate_rules(tables, DEFAULT_RULES)
+    ]
+
+
+def _rule_slice(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    return df[[c for c in rule_columns(DEFAULT_RULES, table) if c in df.columns]]
+
+
+def shard_holes(lith: pd.DataFrame, samples: pd.DataFrame, shards: int) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Split lithology and samples into hole shards: ranges of sorted hole ids with about equal row counts.
+    Every hole is in exactly one shard; rows without a hole_id go to the first.
+    """
+    lith_codes, samp_codes = _hole_codes(lith["hole_id"], samples["hole_id"])
+    n_holes = int(max(lith_codes.max(initial=-1), samp_codes.max(initial=-1))) + 1
+    if n_holes == 0:
+        return [(lith, samples)]
+    rows = np.bincount(lith_codes[lith_codes >= 0], minlength=n_holes) + np.bincount(samp_codes[samp_codes >= 0], minlength=n_holes)
+    cumulative = np.cumsum(rows)
+    total = cumulative[-1]
+    # First hole of shards 1..n-1, then the shard of each hole
+    starts = np.searchsorted(cumulative, np.arange(1, shards) * total / shards, side="right")
+    shard_of = np.searchsorted(starts, np.arange(n_holes), side="right")
+    lith_shard = np.where(lith_codes >= 0, shard_of[np.maximum(lith_codes, 0)], 0)
+    samp_shard = np.where(samp_codes >= 0, shard_of[np.maximum(samp_codes, 0)], 0)
+    return [
+        (lith[lith_shard == i], samples[samp_shard == i])
+        for i in range(shards)
+        if i == 0 or (lith_shard == i).any() or (samp_shard == i).any()
+    ]
 
-    collars = read_csv_safe(os.path.join(data_dir, "collars.csv"))
-    lith = read_csv_safe(os.path.join(data_dir, "lithology_logs.csv"))
-    samples = read_csv_safe(os.path.join(data_dir, "sample_analyses.csv"))
-    rock_types = read_csv_safe(os.path.join(data_dir, "rock_types.csv"))
-    seam_lookup = read_csv_safe(os.path.join(data_dir, "seam_codes_lookup.csv"))
 
-    # Normalize numeric columns
+def _sum_details(details: List[str]) -> Optional[str]:
+    # "overlap count=3" and "overlap count=4" -> "overlap count=7"; differently worded details are joined
+    if not details:
+        return None
+    if len({re.sub(r"\d+", "#", d) for d in details}) > 1:
+        return "; ".join(details)
+    totals = iter([sum(counts) for counts in zip(*(map(int, re.findall(r"\d+", d)) for d in details))])
+    return re.sub(r"\d+", lambda _: str(next(totals)), details[0])
+
+
+def merge_shard_results(shards: List[List[CheckResult]]) -> List[CheckResult]:
+    """One result per check from its per-shard results: passed when every shard passed, issues in shard
+    order (shards are hole ranges, so per-hole ordering is kept), counts in details summed.
+    """
+    merged: List[CheckResult] = []
+    for parts in zip(*shards):
+        failed = [p for p in parts if not p.passed]
+        issues = [p.issues for p in parts if p.issues is not None]
+        merged.append(
+            CheckResult(
+                name=parts[0].name,
+                passed=not failed,
+                details=_sum_details([p.details for p in (failed or parts) if p.details]),
+                issues=pd.concat(issues, ignore_index=True) if issues else None,
+            )
+        )
+    return merged
+
+
+SEAM_CHECK_COLUMNS = ["sample_id", "hole_id", "sample_no", "seam_code_quality_original"]
+
+
+def run_checks(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame, rock_types: pd.DataFrame,
+               seam_lookup: pd.DataFrame, workers: int = 1, collar_checks: bool = True) -> List[CheckResult]:
+    """Every check, as tasks of pipeline.scheduler. With workers > 1 independent checks run in a process pool
+    and the per-hole depth checks are split into one hole shard per worker. collar_checks=False leaves out
+    the checks that read collars alone (chunked mode runs them once, not per partition).
+    """
+    if workers > 1:
+        # Each task gets only the columns its check reads; the pool pickles every argument
+        lith_depths = lith[["log_id", "hole_id", "depth_from", "depth_to"]]
+        samp_depths = samples[["sample_id", "hole_id", "depth_from", "depth_to", "sample_no"]]
+        lith_rocks = lith[["log_id", "hole_id", "rock_code", "description"]]
+        samp_seams = samples[[c for c in SEAM_CHECK_COLUMNS if c in samples.columns]]
+        rule_tables = (_rule_slice(collars, "collars"), _rule_slice(lith, "lithology_logs"),
+                       _rule_slice(samples, "sample_analyses"), seam_lookup)
+        collars = collars[["collar_id", "hole_id"]]
+        shards = shard_holes(lith_depths, samp_depths, workers)
+    else:
+        lith_depths = lith_rocks = lith
+        samp_depths = samp_seams = samples
+        rule_tables = (collars, lith, samples, seam_lookup)
+        shards = [(lith, samples)]
+    depth_tasks = [Task(f"depth_intervals.{i}", check_depth_intervals, shard) for i, shard in enumerate(shards)]
+    tasks = [Task("collar_hole_ids", check_collar_hole_ids, (collars,))] if collar_checks else []
+    tasks += [
+        Task("hole_references", check_hole_references, (collars, lith_depths, samp_depths)),
+        Task("rock_codes", check_rock_codes, (lith_rocks, rock_types)),
+        *depth_tasks,
+        Task("seam_codes", check_seam_codes, (samp_seams, seam_lookup)),
+        Task("rules", check_rules, rule_tables),
+    ]
+    results = {r.name: r for r in run_tasks(tasks, workers=workers)}
+    if not all(r.ok for r in results.values()):
+        raise TaskGraphError(list(results.values()))
+    return (
+        (results["collar_hole_ids"].value if collar_checks else [])
+        + results["hole_references"].value
+        + results["rock_codes"].value
+        + merge_shard_results([results[t.name].value for t in depth_tasks])
+        + results["seam_codes"].value
+        + results["rules"].value
+    )
+
+
+def normalize_depth_tables(lith: pd.DataFrame, samples: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Numeric depth and code columns of CSV-read tables, with sample and lithology depths in one float dtype."""
     for df, cols in (
         (lith, ["depth_from", "depth_to", "rock_code"]),
         (samples, ["depth_from", "depth_to"]),
@@ -257,27 +517,293 @@ def main(data_dir: str, out_dir: str) -> None:
         for c in cols:
             if c in df.columns:
                 df[c] = pd.to_numeric(df[c], errors="coerce")
+    # Sample depths are compared with lithology depths: float32 on one side only is widened to float64
+    lith, samples = align_float32([lith, samples], ["depth_from", "depth_to"])
+    return lith, samples
 
-    all_results: List[CheckResult] = []
-    all_results += check_hole_referential_integrity(collars, lith, samples)
-    all_results += check_rock_codes(lith, rock_types)
-    all_results += check_depth_intervals(lith, samples)
-    all_results += check_seam_codes(samples, seam_lookup)
 
-    # Write issues to CSVs and print summary
+def partition_by_hole(path: str, out_dir: str, partitions: int, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[str]:
+    """Copy a CSV into partition files by hash of hole_id, reading chunk_rows rows at a time.
+    All rows of one hole land in the same partition, whatever the order of the input; values are copied as
+    text, so reading a partition gives the same types as reading the whole file.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    writers = [ChunkedCsvWriter(os.path.join(out_dir, f"part{i:04d}.csv"), columns) for i in range(partitions)]
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        part = pd.util.hash_pandas_object(chunk["hole_id"], index=False).to_numpy() % partitions
+        for i, rows in chunk.groupby(part, sort=False):
+            writers[i].write(rows)
+    for writer in writers:
+        writer.close()
+    return [w.path for w in writers]
+
+
+def validate_chunked(data_dir: str, out_dir: str, workers: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                     partitions: Optional[int] = None) -> List[CheckResult]:
+    """Out-of-core validation of the CSV tables.
+    Only collars, rock types and seam codes are held whole. Lithology and samples are streamed into hole
+    partitions (PARTITION_BYTES of CSV each unless partitions is given) in a temporary directory under
+    out_dir; the checks then run on one partition pair at a time and append their issues to the issue files
+    as they go. Returns the merged results without issue frames.
+    """
+    collars = read_csv_safe(os.path.join(data_dir, "collars.csv"), table="collars")
+    rock_types = read_csv_safe(os.path.join(data_dir, "rock_types.csv"), table="rock_types")
+    seam_lookup = read_csv_safe(os.path.join(data_dir, "seam_codes_lookup.csv"), table="seam_codes")
+    lith_path = os.path.join(data_dir, "lithology_logs.csv")
+    samp_path = os.path.join(data_dir, "sample_analyses.csv")
+    if partitions is None:
+        partitions = max(1, -(-(os.path.getsize(lith_path) + os.path.getsize(samp_path)) // PARTITION_BYTES))
+
+    writers: Dict[str, ChunkedCsvWriter] = {}
+
+    def stream_issues(results: List[CheckResult]) -> List[CheckResult]:
+        for res in results:
+            if res.issues is not None and not res.issues.empty:
+                if res.name not in writers:
+                    writers[res.name] = ChunkedCsvWriter(issue_path(out_dir, res.name), list(res.issues.columns))
+                writers[res.name].write(res.issues)
+        return [CheckResult(res.name, res.passed, res.details) for res in results]
+
+    collar_results = stream_issues(check_collar_hole_ids(collars))
+    per_partition: List[List[CheckResult]] = []
+    with tempfile.TemporaryDirectory(prefix="partitions_", dir=out_dir) as spill:
+        lith_parts = partition_by_hole(lith_path, os.path.join(spill, "lithology_logs"), partitions, chunk_rows)
+        samp_parts = partition_by_hole(samp_path, os.path.join(spill, "sample_analyses"), partitions, chunk_rows)
+        for lith_part, samp_part in zip(lith_parts, samp_parts):
+            lith, samples = normalize_depth_tables(
+                read_csv_safe(lith_part, table="lithology_logs"), read_csv_safe(samp_part, table="sample_analyses")
+            )
+            results = run_checks(collars, lith, samples, rock_types, seam_lookup, workers=workers, collar_checks=False)
+            per_partition.append(stream_issues(results))
+            del lith, samples, results
+    return collar_results + merge_shard_results(per_partition)
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """uint64 hash per row over every column but the *_at timestamps, which change on every extraction.
+    Numbers are hashed in one width (float32 as its float64 decimals), so a dtype change alone changes nothing.
+    """
+    h = np.zeros(len(df), dtype=np.uint64)
+    for c in df.columns:
+        if c.endswith("_at"):
+            continue
+        col = df[c]
+        if col.dtype == np.float32:
+            col = widen_float32(col)
+        elif pd.api.types.is_integer_dtype(col.dtype):
+            col = col.astype("Int64")
+        h = h * np.uint64(1_000_003) + pd.util.hash_pandas_object(col, index=False).to_numpy()
+    return h
+
+
+def hole_hashes(df: pd.DataFrame) -> Dict[str, int]:
+    """Order-sensitive content hash of each hole's rows; rows without a hole_id count as hole ''."""
+    holes = df["hole_id"].astype("category")
+    codes = holes.cat.codes.to_numpy().astype(np.int64)
+    if not len(codes):
+        return {}
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    position = np.arange(len(codes)) - np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    mixed = pd.util.hash_array(_row_hashes(df)[order] ^ position.astype(np.uint64))
+    sums = np.add.reduceat(mixed, starts)
+    names = ["" if code < 0 else str(holes.cat.categories[code]) for code in sorted_codes[starts]]
+    return dict(zip(names, sums.tolist()))
+
+
+def _hole_buckets(hole_ids: pd.Series) -> np.ndarray:
+    """Bucket per row, hashing each distinct hole id once; stable across runs (hash_array uses a fixed key)."""
+    holes = hole_ids.astype("category")
+    keys = np.append(holes.cat.categories.astype(str).to_numpy(dtype=object), "")
+    buckets = (pd.util.hash_array(keys) % np.uint64(HOLE_BUCKETS)).astype(np.int64)
+    # Code -1 (no hole_id) picks the trailing "" key
+    return buckets[holes.cat.codes.to_numpy()]
+
+
+def _check_bucket(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame, rock_types: pd.DataFrame,
+                  seam_lookup: pd.DataFrame) -> List[CheckResult]:
+    return run_checks(collars, lith, samples, rock_types, seam_lookup, collar_checks=False)
+
+
+def load_state(state_dir: str) -> dict:
+    """The previous incremental run's state, or an empty one when it is missing or of another format."""
+    try:
+        with open(os.path.join(state_dir, STATE_NAME), encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("format") == STATE_FORMAT else {}
+
+
+def validate_incremental(collars: pd.DataFrame, lith: pd.DataFrame, samples: pd.DataFrame, rock_types: pd.DataFrame,
+                         seam_lookup: pd.DataFrame, out_dir: str, workers: int = 1) -> List[CheckResult]:
+    """Re-check only the holes whose content changed since the last incremental run.
+    Holes fall into HOLE_BUCKETS buckets by hash of hole_id. Each bucket's results (details per check, issue
+    rows without header) are kept under out_dir/validation_state/ with a digest of its holes' content hashes;
+    a bucket is re-checked when its digest changed, which happens for every bucket when the lookup tables, the
+    table columns, the QA rules or VALIDATOR_VERSION change. A hole's hash covers its lithology and sample rows
+    (surrogate ids included, so renumbered holes count as changed) and the collar columns its checks read. The report is the merge
+    of all buckets, with issue rows in bucket order. Returns the merged results without issue frames.
+    """
+    state_dir = os.path.join(out_dir, STATE_DIR)
+    previous = load_state(state_dir)
+
+    lith_hashes, samp_hashes = hole_hashes(lith), hole_hashes(samples)
+    # The collar columns a hole's checks read: hole_id for the references, those the rules look up
+    collar_hashes = hole_hashes(collars[["hole_id"] + [
+        c for c in rule_columns(DEFAULT_RULES, "collars") if c != "hole_id" and c in collars.columns
+    ]])
+    holes = {
+        h: f"{lith_hashes.get(h, 0):016x}{samp_hashes.get(h, 0):016x}{collar_hashes.get(h, 0):016x}"
+        for h in sorted(set(lith_hashes) | set(samp_hashes))
+    }
+    lookups = hashlib.sha256(
+        f"{VALIDATOR_VERSION}|{list(lith.columns)}|{list(samples.columns)}|{DEFAULT_RULES!r}".encode()
+    )
+    for table in (rock_types, seam_lookup):
+        lookups.update(_row_hashes(table).tobytes())
+    fingerprint = lookups.hexdigest()
+
+    bucket_holes: Dict[int, List[str]] = {}
+    for h, b in zip(holes, _hole_buckets(pd.Series(list(holes), dtype=object)).tolist()):
+        bucket_holes.setdefault(b, []).append(h)
+    digests = {}
+    for b in sorted(bucket_holes):
+        digest = hashlib.sha256(fingerprint.encode())
+        for h in bucket_holes[b]:
+            digest.update(f"{h}\t{holes[h]}\n".encode())
+        digests[b] = digest.hexdigest()[:16]
+
+    def bucket_dir(b: int) -> str:
+        return os.path.join(state_dir, f"bucket{b:02d}_{digests[b]}")
+
+    kept = {int(b): entry for b, entry in previous.get("buckets", {}).items()}
+    stale = [
+        b for b in digests
+        if b not in kept or kept[b]["digest"] != digests[b]
+        or not all(os.path.exists(os.path.join(bucket_dir(b), f)) for f in kept[b]["files"].values())
+    ]
+    old_holes = previous.get("holes", {})
+    changed = sum(old_holes.get(h) != v for h, v in holes.items()) + len(set(old_holes) - set(holes))
+    print(f"Incremental validation: {changed} of {len(holes)} holes changed, "
+          f"re-checking {len(stale)} of {len(digests)} hole buckets")
+
+    if not digests:
+        # No lithology or sample rows at all: nothing to keep
+        return run_checks(collars, lith, samples, rock_types, seam_lookup)
+    if stale:
+        lith_bucket, samp_bucket = _hole_buckets(lith["hole_id"]), _hole_buckets(samples["hole_id"])
+    tasks = [
+        Task(f"bucket.{b}", _check_bucket,
+             (collars, lith[lith_bucket == b], samples[samp_bucket == b], rock_types, seam_lookup))
+        for b in stale
+    ]
+    checked = run_tasks(tasks, workers=workers)
+    if not all(r.ok for r in checked):
+        raise TaskGraphError(checked)
+
+    columns = dict(previous.get("columns", {})) if previous.get("fingerprint") == fingerprint else {}
+    buckets = {b: kept[b] for b in digests if b not in stale}
+    for b, result in zip(stale, checked):
+        os.makedirs(bucket_dir(b), exist_ok=True)
+        files = {}
+        for res in result.value:
+            if res.issues is not None and not res.issues.empty:
+                files[res.name] = os.path.basename(issue_path(bucket_dir(b), res.name))
+                res.issues.to_csv(os.path.join(bucket_dir(b), files[res.name]), header=False, index=False)
+                columns[res.name] = list(res.issues.columns)
+        buckets[b] = {
+            "digest": digests[b],
+            "results": [[res.name, res.passed, res.details] for res in result.value],
+            "files": files,
+        }
+
+    # Issue files: header, then each bucket's rows in bucket order
+    merged = merge_shard_results([[CheckResult(*r) for r in buckets[b]["results"]] for b in sorted(buckets)])
+    for res in merged:
+        parts = [os.path.join(bucket_dir(b), buckets[b]["files"][res.name])
+                 for b in sorted(buckets) if res.name in buckets[b]["files"]]
+        if parts:
+            pd.DataFrame(columns=columns[res.name]).to_csv(issue_path(out_dir, res.name), index=False)
+            with open(issue_path(out_dir, res.name), "ab") as out:
+                for part in parts:
+                    with open(part, "rb") as fh:
+                        shutil.copyfileobj(fh, out)
+
+    state = {
+        "format": STATE_FORMAT,
+        "fingerprint": fingerprint,
+        "holes": holes,
+        "columns": columns,
+        "buckets": {str(b): buckets[b] for b in sorted(buckets)},
+    }
+    tmp = os.path.join(state_dir, STATE_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, os.path.join(state_dir, STATE_NAME))
+    # Results of replaced buckets are only dropped once the new state points past them
+    current = {os.path.basename(bucket_dir(b)) for b in buckets}
+    for name in os.listdir(state_dir):
+        if name.startswith("bucket") and name not in current:
+            shutil.rmtree(os.path.join(state_dir, name), ignore_errors=True)
+
+    return check_collar_hole_ids(collars) + merged
+
+
+def issue_path(out_dir: str, check_name: str) -> str:
+    safe_name = (
+        check_name.lower()
+        .replace(" ", "_")
+        .replace("/", "_")
+        .replace("(", "")
+        .replace(")", "")
+    )
+    return os.path.join(out_dir, f"{safe_name}.csv")
+
+
+def load_tables(data_dir: str, fmt: str) -> Tuple[pd.DataFrame, ...]:
+    """(collars, lithology_logs, sample_analyses, rock_types, seam_codes) in the compact dtypes."""
+    if fmt == "parquet":
+        # Typed columns straight from the files, no re-parsing or coercion
+        collars = compact_table("collars", read_table(data_dir, "collars", fmt))
+        lith = compact_table("lithology_logs", read_table(data_dir, "lithology_logs", fmt))
+        samples = compact_table("sample_analyses", read_table(data_dir, "sample_analyses", fmt))
+        rock_types = compact_table("rock_types", read_table(data_dir, "rock_types", fmt))
+        seam_lookup = compact_table("seam_codes", read_table(data_dir, "seam_codes", fmt))
+        lith, samples = align_float32([lith, samples], ["depth_from", "depth_to"])
+    else:
+        collars = read_csv_safe(os.path.join(data_dir, "collars.csv"), table="collars")
+        rock_types = read_csv_safe(os.path.join(data_dir, "rock_types.csv"), table="rock_types")
+        seam_lookup = read_csv_safe(os.path.join(data_dir, "seam_codes_lookup.csv"), table="seam_codes")
+        lith, samples = normalize_depth_tables(
+            read_csv_safe(os.path.join(data_dir, "lithology_logs.csv"), table="lithology_logs"),
+            read_csv_safe(os.path.join(data_dir, "sample_analyses.csv"), table="sample_analyses"),
+        )
+    return collars, lith, samples, rock_types, seam_lookup
+
+
+def main(data_dir: str, out_dir: str, fmt: str = "auto", workers: int = 1, chunked: bool = False,
+         chunk_rows: int = DEFAULT_CHUNK_ROWS, partitions: Optional[int] = None, incremental: bool = False) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+
+    fmt = table_format(data_dir, fmt)
+    if chunked:
+        if fmt != "csv":
+            raise ValueError("chunked validation reads CSV tables only")
+        all_results = validate_chunked(data_dir, out_dir, workers, chunk_rows, partitions)
+    elif incremental:
+        all_results = validate_incremental(*load_tables(data_dir, fmt), out_dir, workers)
+    else:
+        all_results = run_checks(*load_tables(data_dir, fmt), workers=workers)
+
+    # Write issues to CSVs and print summary (chunked and incremental modes have written theirs already)
     summary_rows = []
     for res in all_results:
         summary_rows.append({"check": res.name, "passed": res.passed, "details": res.details or ""})
         if res.issues is not None and not res.issues.empty:
-            safe_name = (
-                res.name.lower()
-                .replace(" ", "_")
-                .replace("/", "_")
-                .replace("(", "")
-                .replace(")", "")
-            )
-            out_path = os.path.join(out_dir, f"{safe_name}.csv")
-            res.issues.to_csv(out_path, index=False)
+            res.issues.to_csv(issue_path(out_dir, res.name), index=False)
 
     summary = pd.DataFrame(summary_rows, columns=["check", "passed", "details"]).sort_values("check")
     summary_path = os.path.join(out_dir, "summary.csv")
@@ -300,7 +826,42 @@ if __name__ == "__main__":
         default=os.path.join(os.path.dirname(__file__), "..", "reports", "normalized_sql_server_validation"),
         help="Directory to write validation reports",
     )
+    parser.add_argument(
+        "--format",
+        choices=["auto", "csv", "parquet"],
+        default="auto",
+        help="Input format; auto uses Parquet when every table has a .parquet file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for running checks concurrently; per-hole depth checks are split into this many hole shards",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--chunked",
+        action="store_true",
+        help="Out-of-core mode for very large CSVs: stream lithology/samples into hole partitions and check one at a time",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="Chunked mode: rows read from lithology/samples at a time",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        help=f"Chunked mode: number of hole partitions (default: one per {PARTITION_BYTES >> 20} MB of CSV)",
+    )
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Re-check only holes changed since the last incremental run (state in <out-dir>/{STATE_DIR})",
+    )
     args = parser.parse_args()
-    main(os.path.abspath(args.data_dir), os.path.abspath(args.out_dir))
+    main(os.path.abspath(args.data_dir), os.path.abspath(args.out_dir), args.format, args.workers, args.chunked,
+         args.chunk_rows, args.partitions, args.incremental)
 
 
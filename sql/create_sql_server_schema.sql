@@ -12,6 +12,8 @@ IF OBJECT_ID('lithology_logs', 'U') IS NOT NULL DROP TABLE lithology_logs;
 IF OBJECT_ID('collars', 'U') IS NOT NULL DROP TABLE collars;
 IF OBJECT_ID('seam_codes_lookup', 'U') IS NOT NULL DROP TABLE seam_codes_lookup;
 IF OBJECT_ID('rock_types', 'U') IS NOT NULL DROP TABLE rock_types;
+IF OBJECT_ID('load_row_hashes', 'U') IS NOT NULL DROP TABLE load_row_hashes;
+IF OBJECT_ID('load_log', 'U') IS NOT NULL DROP TABLE load_log;
 
 -- =====================================================
 -- 1. LOOKUP TABLES
@@ -128,6 +130,27 @@ CREATE TABLE sample_analyses (
     CONSTRAINT CK_sample_analyses_tm CHECK (tm >= 0 AND tm <= 100)
 );
 
+-- Row hashes for delta loads (scripts/load_to_sqlserver.py --delta):
+-- one content hash per loaded row, keyed by table and natural key
+CREATE TABLE load_row_hashes (
+    table_name VARCHAR(64) NOT NULL,
+    row_key NVARCHAR(400) NOT NULL,
+    row_hash CHAR(16) NOT NULL,
+    CONSTRAINT PK_load_row_hashes PRIMARY KEY (table_name, row_key)
+);
+
+-- Partitions committed by each full load, for resuming an interrupted one
+-- (scripts/load_to_sqlserver.py --resume)
+CREATE TABLE load_log (
+    load_id VARCHAR(32) NOT NULL,
+    table_name VARCHAR(64) NOT NULL,
+    part_start BIGINT NOT NULL,
+    part_stop BIGINT NOT NULL,
+    rows_loaded BIGINT NOT NULL,
+    loaded_at DATETIME2 DEFAULT GETDATE(),
+    CONSTRAINT PK_load_log PRIMARY KEY (load_id, table_name, part_start)
+);
+
 -- =====================================================
 -- 3. INDEXES FOR PERFORMANCE
 -- =====================================================
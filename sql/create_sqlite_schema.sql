@@ -0,0 +1,152 @@
+-- =====================================================
+-- Coal Drilling Database Schema for SQLite
+-- Local stand-in for create_sql_server_schema.sql, used by
+-- scripts/load_to_sqlserver.py --target sqlite
+-- =====================================================
+-- Same tables, columns, keys, CHECK constraints and indexes as the SQL Server
+-- schema; the views are not included.
+-- INTEGER PRIMARY KEY takes the place of INT IDENTITY and accepts explicit ids.
+-- =====================================================
+
+DROP TABLE IF EXISTS sample_analyses;
+DROP TABLE IF EXISTS lithology_logs;
+DROP TABLE IF EXISTS collars;
+DROP TABLE IF EXISTS seam_codes_lookup;
+DROP TABLE IF EXISTS rock_types;
+DROP TABLE IF EXISTS load_row_hashes;
+DROP TABLE IF EXISTS load_log;
+
+-- =====================================================
+-- 1. LOOKUP TABLES
+-- =====================================================
+
+CREATE TABLE seam_codes_lookup (
+    seam_id INTEGER PRIMARY KEY,
+    system_id TEXT NOT NULL,
+    system_name TEXT NOT NULL,
+    seam_label TEXT NOT NULL,
+    seam_code INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    description TEXT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT UQ_seam_codes_system_label_code UNIQUE(system_id, seam_label, seam_code)
+);
+
+CREATE TABLE rock_types (
+    rock_code INTEGER PRIMARY KEY,
+    lithology TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =====================================================
+-- 2. CORE DRILLING TABLES
+-- =====================================================
+
+CREATE TABLE collars (
+    collar_id INTEGER PRIMARY KEY,
+    hole_id TEXT UNIQUE NOT NULL,
+    easting REAL NULL,
+    northing REAL NULL,
+    elevation REAL NULL,
+    azimuth REAL NULL,
+    dip REAL NULL,
+    final_depth REAL NULL,
+    drilling_date TEXT NULL,
+    contractor TEXT NULL,
+    remarks TEXT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE lithology_logs (
+    log_id INTEGER PRIMARY KEY,
+    hole_id TEXT NOT NULL,
+    depth_from REAL NOT NULL,
+    depth_to REAL NOT NULL,
+    rock_code INTEGER NULL,
+    description TEXT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT FK_lithology_logs_hole_id FOREIGN KEY (hole_id) REFERENCES collars(hole_id),
+    CONSTRAINT FK_lithology_logs_rock_code FOREIGN KEY (rock_code) REFERENCES rock_types(rock_code),
+    CONSTRAINT CK_lithology_logs_depth CHECK (depth_to > depth_from)
+);
+
+CREATE TABLE sample_analyses (
+    sample_id INTEGER PRIMARY KEY,
+    hole_id TEXT NOT NULL,
+    depth_from REAL NOT NULL,
+    depth_to REAL NOT NULL,
+    sample_no TEXT NOT NULL,
+    im REAL NULL,
+    tm REAL NULL,
+    ash REAL NULL,
+    vm REAL NULL,
+    fc REAL NULL,
+    sulphur REAL NULL,
+    gross_cv REAL NULL,
+    net_cv REAL NULL,
+    sg REAL NULL,
+    rd REAL NULL,
+    hgi REAL NULL,
+    seam_quality_id INTEGER NULL,
+    seam_73_id INTEGER NULL,
+    seam_code_quality_original REAL NULL,
+    analysis_date TEXT NULL,
+    lab_name TEXT NULL,
+    remarks TEXT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT FK_sample_analyses_hole_id FOREIGN KEY (hole_id) REFERENCES collars(hole_id),
+    CONSTRAINT FK_sample_analyses_seam_quality FOREIGN KEY (seam_quality_id) REFERENCES seam_codes_lookup(seam_id),
+    CONSTRAINT FK_sample_analyses_seam_73 FOREIGN KEY (seam_73_id) REFERENCES seam_codes_lookup(seam_id),
+    CONSTRAINT CK_sample_analyses_depth CHECK (depth_to > depth_from),
+    CONSTRAINT CK_sample_analyses_ash CHECK (ash >= 0 AND ash <= 100),
+    CONSTRAINT CK_sample_analyses_vm CHECK (vm >= 0 AND vm <= 100),
+    CONSTRAINT CK_sample_analyses_fc CHECK (fc >= 0 AND fc <= 100),
+    CONSTRAINT CK_sample_analyses_im CHECK (im >= 0 AND im <= 100),
+    CONSTRAINT CK_sample_analyses_tm CHECK (tm >= 0 AND tm <= 100)
+);
+
+-- Row hashes for delta loads (scripts/load_to_sqlserver.py --delta):
+-- one content hash per loaded row, keyed by table and natural key
+CREATE TABLE load_row_hashes (
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    row_hash TEXT NOT NULL,
+    CONSTRAINT PK_load_row_hashes PRIMARY KEY (table_name, row_key)
+);
+
+-- Partitions committed by each full load, for resuming an interrupted one
+-- (scripts/load_to_sqlserver.py --resume)
+CREATE TABLE load_log (
+    load_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    part_start INTEGER NOT NULL,
+    part_stop INTEGER NOT NULL,
+    rows_loaded INTEGER NOT NULL,
+    loaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT PK_load_log PRIMARY KEY (load_id, table_name, part_start)
+);
+
+-- =====================================================
+-- 3. INDEXES FOR PERFORMANCE
+-- =====================================================
+
+CREATE INDEX idx_collars_location ON collars(easting, northing);
+
+CREATE INDEX idx_lithology_hole_id ON lithology_logs(hole_id);
+CREATE INDEX idx_lithology_depth ON lithology_logs(hole_id, depth_from, depth_to);
+CREATE INDEX idx_lithology_rock_code ON lithology_logs(rock_code);
+
+CREATE INDEX idx_sample_analyses_hole_id ON sample_analyses(hole_id);
+CREATE INDEX idx_sample_analyses_depth ON sample_analyses(hole_id, depth_from, depth_to);
+CREATE INDEX idx_sample_analyses_seam_quality ON sample_analyses(seam_quality_id);
+CREATE INDEX idx_sample_analyses_seam_73 ON sample_analyses(seam_73_id);
+CREATE INDEX idx_sample_analyses_sample_no ON sample_analyses(hole_id, sample_no);
+
+CREATE INDEX idx_seam_codes_system ON seam_codes_lookup(system_id);
+CREATE INDEX idx_seam_codes_code ON seam_codes_lookup(seam_code);
+CREATE INDEX idx_seam_codes_label ON seam_codes_lookup(seam_label);
+CREATE INDEX idx_seam_codes_priority ON seam_codes_lookup(priority);
+CREATE INDEX idx_rock_types_lithology ON rock_types(lithology);
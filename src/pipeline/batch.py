@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch ingestion: many drillhole workbooks into one set of normalized CSVs.
+Each workbook is extracted in its own task (one process per workbook with
+workers > 1), then the per-file tables are merged in sorted file order:
+- collar_id, log_id and sample_id are renumbered so they are unique across files,
+  and sample_no (<DHID>_<sample_id>) is rebuilt from the new sample_id
+- seam codes and rock types are de-duplicated; a rock_code described differently
+  in two files is reported
+- a hole_id found in more than one workbook is dropped from the later files when
+  its collar, lithology and sample rows are identical, and is a conflict otherwise
+Conflicts stop the run unless on_conflict='first', which keeps the hole from the
+first workbook that has it. Every duplicate or conflict goes to batch_conflicts.csv
+and every kept hole's source to batch_sources.csv.
+"""
+
+import glob
+import os
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .extract_lithology_logs import sort_lithology_logs
+from .scheduler import Task, TaskGraphError, run_tasks
+from .schema import compact_table, widen_table, write_table
+from .sheet_cache import SheetCache
+from .tasks import EXTRACTOR_TASKS
+from .workbook import WorkbookSession
+
+CONFLICTS_FILE = 'batch_conflicts.csv'
+SOURCES_FILE = 'batch_sources.csv'
+CONFLICT_COLUMNS = ['table', 'key', 'kept_from', 'dropped_from', 'kind']
+
+# Per-table columns that differ between otherwise identical extractions; sample_no is built from sample_id
+_VOLATILE_COLUMNS = ['collar_id', 'log_id', 'sample_id', 'sample_no', 'created_at', 'updated_at']
+
+
+class BatchConflictError(RuntimeError):
+	"""Raised when the same hole_id carries different data in two workbooks."""
+
+	def __init__(self, conflicts: pd.DataFrame):
+		self.conflicts = conflicts
+		holes = conflicts.loc[(conflicts['table'] == 'holes') & (conflicts['kind'] == 'conflict'), 'key'].tolist()
+		shown = ', '.join(holes[:10]) + (' ...' if len(holes) > 10 else '')
+		super().__init__(f"{len(holes)} hole_id(s) differ between workbooks: {shown}")
+
+
+def resolve_workbooks(source: str) -> List[str]:
+	"""Workbooks named by a directory (its *.xlsx files) or a glob pattern, sorted; Excel lock files are skipped."""
+	pattern = os.path.join(source, '*.xlsx') if os.path.isdir(source) else source
+	paths = sorted(p for p in glob.glob(pattern) if os.path.isfile(p) and not os.path.basename(p).startswith('~$'))
+	if not paths:
+		raise FileNotFoundError(f"no workbooks match {source!r}")
+	return paths
+
+
+def extract_workbook(excel_path: str, cache: Optional[SheetCache] = None, engine: str = 'openpyxl',
+					 created_at: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+	"""All normalized tables of one workbook, keyed by output name."""
+	with WorkbookSession(excel_path, read_only=True, cache=cache, engine=engine) as session:
+		return {
+			name: extractor(excel_path, session=session, created_at=created_at)
+			for name, _, extractor, _, _, _ in EXTRACTOR_TASKS
+		}
+
+
+def _hole_fingerprints(tables: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[int, ...]]:
+	"""Per hole_id, row hashes of its collar, lithology and sample rows without ids and timestamps."""
+	parts: Dict[str, List[int]] = {}
+	for name in ('collars', 'lithology_logs', 'sample_analyses'):
+		df = tables[name]
+		if df.empty:
+			continue
+		content = df.drop(columns=[c for c in _VOLATILE_COLUMNS if c in df.columns])
+		hashes = pd.util.hash_pandas_object(content.astype(str), index=False)
+		for hole_id, h in zip(df['hole_id'], hashes):
+			if hole_id is not None:
+				parts.setdefault(hole_id, []).append(int(h))
+	return {hole_id: tuple(h) for hole_id, h in parts.items()}
+
+
+def _renumber_sample_no(sample_no: pd.Series, sample_id: pd.Series) -> pd.Series:
+	# Keep the <DHID>_ prefix as extracted and swap in the renumbered id; missing numbers stay missing
+	named = sample_no.notna()
+	out = pd.Series(None, index=sample_no.index, dtype=object)
+	out[named] = sample_no[named].astype(str).str.rpartition('_')[0] + '_' + sample_id[named].astype(str)
+	return out
+
+
+def _merge_lookups(name: str, frames: List[Tuple[str, pd.DataFrame]], conflicts: List[dict]) -> pd.DataFrame:
+	frames = [(path, df) for path, df in frames if not df.empty]
+	if not frames:
+		return pd.DataFrame()
+	merged = pd.concat([df.assign(source_file=path) for path, df in frames], ignore_index=True)
+	if name == 'rock_types':
+		first = merged.drop_duplicates(subset=['rock_code'], keep='first')
+		kept = first.set_index('rock_code')
+		for row in merged[merged.duplicated(subset=['rock_code'], keep='first')].itertuples(index=False):
+			ref = kept.loc[row.rock_code]
+			same = (row.lithology, row.detail) == (ref['lithology'], ref['detail'])
+			if not same:
+				conflicts.append({'table': name, 'key': str(row.rock_code), 'kept_from': ref['source_file'],
+								  'dropped_from': row.source_file, 'kind': 'conflict'})
+		out = first.sort_values('rock_code')
+	else:
+		out = merged.drop_duplicates(subset=['system_id', 'seam_label', 'seam_code'], keep='first').copy()
+		out['seam_id'] = range(1, len(out) + 1)
+	return out.drop(columns=['source_file']).reset_index(drop=True)
+
+
+def merge_workbooks(results: List[Tuple[str, Dict[str, pd.DataFrame]]]) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame, pd.DataFrame]:
+	"""Merge per-workbook tables in the given order, a hole_id belonging to the first workbook that has it.
+	Returns (tables, conflicts, sources).
+	"""
+	# A float32 column in one workbook may be float64 in another; compare and concatenate them as float64
+	results = [(path, {name: widen_table(df) for name, df in tables.items()}) for path, tables in results]
+	conflicts: List[dict] = []
+	owner: Dict[str, Tuple[str, Tuple[int, ...]]] = {}
+	dropped: Dict[str, set] = {}
+	for path, tables in results:
+		dropped[path] = set()
+		for hole_id, fingerprint in _hole_fingerprints(tables).items():
+			if hole_id not in owner:
+				owner[hole_id] = (path, fingerprint)
+				continue
+			kept_from, kept_fingerprint = owner[hole_id]
+			kind = 'identical' if fingerprint == kept_fingerprint else 'conflict'
+			conflicts.append({'table': 'holes', 'key': hole_id, 'kept_from': kept_from, 'dropped_from': path, 'kind': kind})
+			dropped[path].add(hole_id)
+
+	merged: Dict[str, pd.DataFrame] = {}
+	for name in ('seam_codes', 'rock_types'):
+		merged[name] = _merge_lookups(name, [(path, tables[name]) for path, tables in results], conflicts)
+
+	for name, id_column in (('collars', 'collar_id'), ('lithology_logs', 'log_id'), ('sample_analyses', 'sample_id')):
+		frames = [
+			tables[name][~tables[name]['hole_id'].isin(dropped[path])] if dropped[path] else tables[name]
+			for path, tables in results
+			if not tables[name].empty
+		]
+		if not frames:
+			merged[name] = pd.DataFrame()
+			continue
+		df = pd.concat(frames, ignore_index=True)
+		if name == 'lithology_logs':
+			df = sort_lithology_logs(df)
+		else:
+			df[id_column] = range(1, len(df) + 1)
+		if name == 'sample_analyses':
+			df['sample_no'] = _renumber_sample_no(df['sample_no'], df['sample_id'])
+		merged[name] = df
+	merged = {name: compact_table(name, df) for name, df in merged.items()}
+
+	report = pd.DataFrame(conflicts, columns=CONFLICT_COLUMNS)
+	sources = pd.DataFrame(
+		[(hole_id, path) for hole_id, (path, _) in owner.items()],
+		columns=['hole_id', 'source_file'],
+	)
+	return merged, report, sources
+
+
+def run_batch(source: str, out_dir: str, workers: int = 1, on_conflict: str = 'error', fmt: str = 'csv',
+			  cache: Optional[SheetCache] = None, engine: str = 'openpyxl') -> Dict[str, int]:
+	"""Extract every workbook matched by source and write merged tables; returns row counts per output.
+	With on_conflict='error' a hole_id conflict writes only the conflict report and raises BatchConflictError.
+	"""
+	if on_conflict not in ('error', 'first'):
+		raise ValueError(f"on_conflict must be 'error' or 'first', not {on_conflict!r}")
+	paths = resolve_workbooks(source)
+	run_at = datetime.now()
+	results = run_tasks([Task(path, extract_workbook, (path, cache, engine, run_at)) for path in paths],
+						workers=workers)
+	if not all(r.ok for r in results):
+		raise TaskGraphError(results)
+
+	tables, conflicts, sources = merge_workbooks([(r.name, r.value) for r in results])
+	os.makedirs(out_dir, exist_ok=True)
+	conflicts.to_csv(os.path.join(out_dir, CONFLICTS_FILE), index=False)
+	hole_conflicts = (conflicts['table'] == 'holes') & (conflicts['kind'] == 'conflict')
+	if on_conflict == 'error' and hole_conflicts.any():
+		raise BatchConflictError(conflicts)
+	sources.to_csv(os.path.join(out_dir, SOURCES_FILE), index=False)
+	counts = {}
+	for name, _, _, _, _, _ in EXTRACTOR_TASKS:
+		write_table(tables[name], out_dir, name, fmt)
+		counts[name] = len(tables[name])
+	return counts
+
+
+__all__ = ["BatchConflictError", "resolve_workbooks", "extract_workbook", "merge_workbooks", "run_batch"]
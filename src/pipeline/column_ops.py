@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Column-wise cell conversions shared by the DAT201 extractors.
+Each helper reproduces a per-cell Python idiom of the original row-by-row
+extractors (truthiness tests, float(), int(float())) on a whole Series.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+def column(df: pd.DataFrame, name: str) -> pd.Series:
+	"""df[name], or an all-None column when the sheet has no such header (like row.get)."""
+	if name in df.columns:
+		return df[name]
+	return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def is_truthy(col: pd.Series) -> pd.Series:
+	"""Cells that are not missing, empty or zero."""
+	return col.notna() & (col != '') & (col != 0)
+
+
+def is_none(col: pd.Series) -> pd.Series:
+	"""Cells holding None itself, as opposed to a float NaN."""
+	if col.dtype != object:
+		return pd.Series(False, index=col.index)
+	# elementwise == on an object array: None == None holds, NaN == None does not
+	return pd.Series(np.equal(col.to_numpy(), None), index=col.index, dtype=bool)
+
+
+def clean_text(col: pd.Series) -> pd.Series:
+	"""str(v).strip() for truthy values, None for missing, empty or zero cells."""
+	present = is_truthy(col)
+	out = pd.Series(None, index=col.index, dtype=object)
+	out[present] = col[present].astype(str).str.strip()
+	return out
+
+
+def to_float(col: pd.Series) -> Tuple[pd.Series, pd.Series]:
+	"""Column-wise float(v); returns (values, rejected) where rejected marks cells float() raises on."""
+	values = pd.to_numeric(col, errors='coerce')
+	empty = col == ''
+	rejected = empty.copy()
+	values = values.astype(float)
+	suspect = col.notna() & values.isna() & ~empty
+	if suspect.any():
+		# float() accepts text to_numeric coerces to NaN ('1_000', non-ASCII digits): convert the rare leftovers
+		parsed = [_float_or_reject(v) for v in col[suspect]]
+		values[suspect] = [value for value, _ in parsed]
+		rejected[suspect] = [failed for _, failed in parsed]
+	return values, rejected
+
+
+def _float_or_reject(v) -> Tuple[float, bool]:
+	try:
+		return float(v), False
+	except Exception:
+		return np.nan, True
+
+
+def to_int_code(col: pd.Series) -> pd.Series:
+	"""int(float(v)) per cell as nullable Int64; unparseable or non-finite values become <NA>."""
+	values = to_float(col)[0]
+	values[~np.isfinite(values)] = np.nan
+	return np.trunc(values).astype('Int64')
+
+
+__all__ = ["column", "is_truthy", "is_none", "clean_text", "to_float", "to_int_code"]
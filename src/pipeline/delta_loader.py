@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Delta loads: apply only the rows that changed since the last load.
+Every source row has a row key, the text of its natural key (TableSpec.natural_key:
+hole_id for collars, hole_id + depth_from for lithology logs and samples, seam_id,
+rock_code), and a row hash, a 64-bit BLAKE2b digest of its content. Content is
+every column except a surrogate id outside the natural key (ids are renumbered
+whenever a row is added upstream), the columns derived from it
+(TableSpec.derived, e.g. sample_no) and the *_at timestamps (new on every run).
+
+A full load stores each partition's hashes in load_row_hashes in the same
+transaction as its rows (row_hasher), so they only ever describe committed rows.
+load_delta stages the source's hashes on the target to find the inserted,
+updated and deleted keys, then applies them one table at a time, each in one
+transaction together with its hashes: merges parents first, deletes children
+first, so foreign keys hold throughout and an interrupted run is finished by
+running it again. Inserted rows get new surrogate ids from the target; updated
+rows keep theirs and their created_at.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Sequence, Set, Tuple
+
+from .load_backends import ROW_HASH_TABLE, LoadBackend
+from .table_loader import DEFAULT_PARTITION_ROWS, TableSpec
+
+KEY_SEPARATOR = '\x1f'
+
+
+@dataclass
+class DeltaSummary:
+	table: str
+	inserted: int
+	updated: int
+	deleted: int
+	unchanged: int
+
+
+def delta_columns(spec: TableSpec) -> List[str]:
+	"""Columns a delta load writes: all but a surrogate id outside the natural key."""
+	return [c for c in spec.columns if c != spec.key or c in spec.natural_key]
+
+
+def _hashed_columns(spec: TableSpec) -> List[str]:
+	return [c for c in delta_columns(spec) if not c.endswith('_at') and c not in spec.derived]
+
+
+def row_key(values: Sequence[object]) -> str:
+	return KEY_SEPARATOR.join('' if v is None else str(v) for v in values)
+
+
+def row_hash(values: Sequence[object]) -> str:
+	text = KEY_SEPARATOR.join('\x00' if v is None else str(v) for v in values)
+	return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _keyed_rows(spec: TableSpec, source, ranges: Sequence[Tuple[int, int]]) -> Iterator[Tuple[str, tuple]]:
+	key_pos = [spec.columns.index(c) for c in spec.natural_key]
+	for start, stop in ranges:
+		for row in source.rows(start, stop):
+			yield row_key([row[i] for i in key_pos]), row
+
+
+def row_hasher(spec: TableSpec) -> Callable[[tuple], Tuple[str, str]]:
+	"""Function giving (row_key, row_hash) of a row of spec; load_tables(row_hasher=) stores them."""
+	key_pos = [spec.columns.index(c) for c in spec.natural_key]
+	hash_pos = [spec.columns.index(c) for c in _hashed_columns(spec)]
+
+	def hasher(row):
+		return row_key([row[i] for i in key_pos]), row_hash([row[i] for i in hash_pos])
+	return hasher
+
+
+def row_hashes(spec: TableSpec, source, ranges: Sequence[Tuple[int, int]]) -> Iterator[Tuple[str, str]]:
+	"""(row_key, row_hash) of every row of source in ranges."""
+	hasher = row_hasher(spec)
+	for start, stop in ranges:
+		for row in source.rows(start, stop):
+			yield hasher(row)
+
+
+def _changed_rows(spec: TableSpec, source, ranges: Sequence[Tuple[int, int]], keys: Set[str]) -> Iterator[tuple]:
+	positions = [spec.columns.index(c) for c in delta_columns(spec)]
+	for key, row in _keyed_rows(spec, source, ranges):
+		if key in keys:
+			yield tuple(row[i] for i in positions)
+
+
+def load_delta(specs: Sequence[TableSpec], sources: Dict[str, object], backend: LoadBackend,
+			   partition_rows: int = DEFAULT_PARTITION_ROWS, batch_size: int = 5000) -> List[DeltaSummary]:
+	"""Bring the target in line with sources by inserting, updating and deleting changed rows only.
+	specs must list referenced tables before the tables that reference them.
+	"""
+	if not backend.has_table(ROW_HASH_TABLE):
+		raise RuntimeError(f"the target has no {ROW_HASH_TABLE} table; run a full load first")
+	ranges: Dict[str, List[Tuple[int, int]]] = {}
+	changes: Dict[str, Dict[str, List[str]]] = {}
+	summaries = []
+	for spec in specs:
+		source = sources[spec.table]
+		ranges[spec.table] = source.split(partition_rows)
+		total = sum(stop - start for start, stop in ranges[spec.table])
+		found = backend.row_hash_changes(spec.table, row_hashes(spec, source, ranges[spec.table]), batch_size)
+		if len(found['insert']) == total > 0 and not found['delete'] and backend.count(spec.table):
+			raise RuntimeError(f"{spec.table} has rows but no stored row hashes; run a full load first")
+		changes[spec.table] = found
+		changed = len(found['insert']) + len(found['update'])
+		summaries.append(DeltaSummary(spec.table, len(found['insert']), len(found['update']), len(found['delete']),
+									  total - changed))
+
+	for spec in specs:
+		keys = set(changes[spec.table]['insert']) | set(changes[spec.table]['update'])
+		if not keys:
+			continue
+		source = sources[spec.table]
+		hashes = ((k, h) for k, h in row_hashes(spec, source, ranges[spec.table]) if k in keys)
+		backend.merge_rows(spec.table, spec.natural_key, delta_columns(spec),
+						   _changed_rows(spec, source, ranges[spec.table], keys), hashes,
+						   keep_identity=spec.keep_identity and spec.key in spec.natural_key, batch_size=batch_size)
+
+	for spec in reversed(specs):
+		deleted = changes[spec.table]['delete']
+		if deleted:
+			backend.delete_rows(spec.table, spec.natural_key, [tuple(k.split(KEY_SEPARATOR)) for k in deleted],
+								deleted, batch_size=batch_size)
+	return summaries
+
+
+__all__ = [
+	"DeltaSummary", "load_delta", "delta_columns", "row_hasher", "row_hashes", "row_key", "row_hash",
+	"KEY_SEPARATOR",
+]
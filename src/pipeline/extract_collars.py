@@ -5,220 +5,272 @@ Extractor: Collars from DH70.xlsx (DAT201 worksheet)
 Outputs a DataFrame with columns:
   collar_id, hole_id, easting, northing, elevation, final_depth,
   dip, drilling_date, azimuth, contractor, remarks, created_at, updated_at
+- extract_collars returns the compact dtypes of schema.COMPACT_DTYPES
 """
 
+import numpy as np
 import pandas as pd
-import openpyxl
 from datetime import datetime
-from typing import Dict, Tuple
-
-
-def extract_collars(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
-    ws = wb['DAT201']
-
-    # Load as DataFrame using first row as header
-    data = []
-    for row in ws.iter_rows(values_only=True):
-        if any(cell is not None for cell in row):
-            data.append(row)
-    wb.close()
-    df = pd.DataFrame(data[1:], columns=data[0])
-
-    # Map first occurrence row per hole to header cell values from that row
-    # Columns: B(1)=easting, C(2)=northing, D(3)=elevation, G(6)=total_depth, Z(25)=year_drilled,
-    #           AA(26)=Geologist, AH(33)=DH_Version, AG(32)=Block No
-    hole_first_row_info: Dict[str, dict] = {}
-    seen_holes = set()
-    for row in ws.iter_rows(values_only=True):
-        if not row or all(v is None for v in row):
-            continue
-        # Assume DHID is in a cell of the row; find it by header name or value position
-        # Try common positions by headerized DataFrame: if row aligns with data rows, 'DHID' will be in the same column index
-        # Fallback: if the first non-empty token looks like a hole id (e.g., 'BC01C'), use it
-        dhid_value = None
-        try:
-            # Find by column name if available in header
-            if 'DHID' in data[0]:
-                idx = data[0].index('DHID')
-                if idx < len(row):
-                    dhid_value = row[idx]
-        except Exception:
-            dhid_value = None
-        if dhid_value is None:
-            # Heuristic: first non-empty string token
-            for cell in row:
-                if isinstance(cell, str) and cell.strip():
-                    dhid_value = cell.strip()
+from typing import Dict, List, Optional, Tuple
+
+from .schema import compact_table
+from .workbook import WorkbookSession, open_session
+
+# Bump when the output of this extractor changes for the same input (see manifest.py)
+EXTRACTOR_VERSION = 1
+
+
+# Header names tried per collar field, in lookup order
+COLLAR_FIELD_CANDIDATES: Dict[str, List[str]] = {
+    'azimuth': ['Azimuth', 'AZIMUTH', 'Azi', 'AZI'],
+    'dip': ['Dip', 'DIP', 'Inclination', 'Incl.'],
+    'drilling_date': ['Drilling Date', 'Date', 'Drill Date'],
+    'contractor': ['Contractor', 'Drilling Contractor', 'Contr.'],
+    'remarks': ['Remarks', 'Remark', 'Comments', 'Notes'],
+    'elevation': ['Elevation', 'RL', 'Reduced Level'],
+    'geologist': ['Geologist', 'Geo', 'GEO'],
+    'block_no': ['Block', 'Block No', 'Block_no', 'BlockNo'],
+    'dh_version': ['DH Version', 'Version', 'DH_Version'],
+}
+
+# Number of leading rows per hole scanned for label/value header tokens
+HEADER_SCAN_ROWS = 6
+
+
+def extract_collars(excel_path: str = "data/raw/DH70.xlsx", session: Optional[WorkbookSession] = None,
+                    created_at: Optional[datetime] = None) -> pd.DataFrame:
+    session, owned = open_session(excel_path, session)
+
+    # Load as DataFrame using first row as header (shared parse of DAT201)
+    data = session.data_rows('DAT201')
+    df = session.frame('DAT201')
+    if owned:
+        session.close()
+    return compact_table('collars', build_collars(data, df, created_at))
+
+
+def hole_id_guess_for_row(row: Tuple, dhid_idx: Optional[int]) -> Optional[str]:
+    """Hole id a raw DAT201 row belongs to for the positional header lookup, or None."""
+    # Assume DHID is in a cell of the row; find it by header name or value position
+    # Try common positions by headerized DataFrame: if row aligns with data rows, 'DHID' will be in the same column index
+    # Fallback: if the first non-empty token looks like a hole id (e.g., 'BC01C'), use it
+    dhid_value = None
+    if dhid_idx is not None and dhid_idx < len(row):
+        dhid_value = row[dhid_idx]
+    if dhid_value is None:
+        # Heuristic: first non-empty string token
+        for cell in row:
+            if isinstance(cell, str) and cell.strip():
+                dhid_value = cell.strip()
+                break
+    if not dhid_value or not isinstance(dhid_value, str):
+        return None
+    return dhid_value.strip()
+
+
+# Raw column positions used when a hole has no matching header column:
+# B(1)=easting, C(2)=northing, D(3)=elevation, G(6)=total_depth, Z(25)=year_drilled,
+# AA(26)=Geologist, AG(32)=Block No, AH(33)=DH_Version
+POSITIONAL_FIELDS: Dict[str, int] = {
+    'easting': 1,
+    'northing': 2,
+    'elevation': 3,
+    'total_depth': 6,
+    'year_drilled': 25,
+    'geologist': 26,
+    'block_no': 32,
+    'dh_version': 33,
+}
+BLOCK_NO_POSITION = POSITIONAL_FIELDS['block_no']
+
+
+def _first_row_index(data: List[Tuple], df: pd.DataFrame) -> Dict[str, Tuple]:
+    """First raw row per hole-id guess (see hole_id_guess_for_row), header row included."""
+    header = data[0]
+    dhid_idx = header.index('DHID') if 'DHID' in header else None
+    index: Dict[str, Tuple] = {}
+    header_guess = hole_id_guess_for_row(header, dhid_idx)
+    if header_guess is not None:
+        index[header_guess] = header
+
+    if dhid_idx is None:
+        keys = pd.Series([hole_id_guess_for_row(row, dhid_idx) for row in data[1:]], dtype=object)
+    else:
+        dhid = df.iloc[:, dhid_idx].reset_index(drop=True)
+        # First row of each distinct DHID value, then the string checks on those few values only
+        distinct = dhid.dropna().drop_duplicates(keep='first')
+        distinct = distinct[(distinct.map(type) == str) & (distinct != '')]
+        keys = distinct.astype(str).str.strip()
+        # Rows without a DHID fall back to their first string token (rare, done per row)
+        missing = np.flatnonzero(dhid.isna().to_numpy())
+        if len(missing):
+            guesses = pd.Series([hole_id_guess_for_row(data[pos + 1], dhid_idx) for pos in missing], index=missing, dtype=object)
+            keys = pd.concat([keys.astype(object), guesses]).sort_index(kind='stable')
+
+    first = keys.dropna().drop_duplicates(keep='first')
+    for pos, key in zip(first.index, first.to_numpy()):
+        index.setdefault(key, data[pos + 1])
+    return index
+
+
+def _positional_info(row: Optional[Tuple]) -> Dict[str, object]:
+    if row is None:
+        return {}
+    return {field: (row[pos] if len(row) > pos else None) for field, pos in POSITIONAL_FIELDS.items()}
+
+
+def _first_values(df: pd.DataFrame, codes: np.ndarray, n_holes: int) -> Dict[str, List[object]]:
+    """First non-null value per hole for every candidate field, trying candidate columns in order."""
+    unique_cols = df.loc[:, ~df.columns.duplicated()]
+    present = [c for cols in COLLAR_FIELD_CANDIDATES.values() for c in cols if c in unique_cols.columns]
+    in_hole = codes >= 0
+    firsts = (
+        unique_cols.loc[in_hole, list(dict.fromkeys(present))]
+        .groupby(codes[in_hole], sort=True)
+        .first()
+        .reindex(range(n_holes))
+    )
+    values: Dict[str, List[object]] = {}
+    for field, cols in COLLAR_FIELD_CANDIDATES.items():
+        result = pd.Series(None, index=firsts.index, dtype=object)
+        for c in cols:
+            if c in firsts.columns:
+                result = result.where(result.notna(), firsts[c].astype(object))
+        values[field] = [None if pd.isna(v) else v for v in result.to_numpy()]
+    return values
+
+
+def _scan_header_tokens(scan_rows: List[List[object]], found: Dict[str, object]) -> None:
+    """Fill missing fields from label/value token pairs in a hole's first rows (cells already fillna'd)."""
+    for row in scan_rows:
+        cells = [str(x).strip() for x in row if str(x).strip() != ""]
+        for i, cell in enumerate(cells):
+            low = cell.lower()
+            nxt = cells[i + 1] if i + 1 < len(cells) else None
+            if found['azimuth'] is None and ('azimuth' in low or low in ('azi', 'az')):
+                found['azimuth'] = nxt
+            if found['dip'] is None and ('dip' in low or 'incl' in low):
+                found['dip'] = nxt
+            if found['drilling_date'] is None and ('date' in low):
+                found['drilling_date'] = nxt
+            if found['contractor'] is None and ('contractor' in low or 'drill' in low and 'contract' in low):
+                found['contractor'] = nxt
+            if found['remarks'] is None and ('remark' in low or 'note' in low or 'comment' in low):
+                found['remarks'] = nxt
+            if found['elevation'] is None and (low == 'rl' or 'elevation' in low or 'reduced level' in low):
+                found['elevation'] = nxt
+            if found['geologist'] is None and ('geologist' in low or low in ('geo', 'geol')):
+                found['geologist'] = nxt
+            if found['block_no'] is None and ('block' in low):
+                found['block_no'] = nxt
+            if found['dh_version'] is None and ('version' in low):
+                found['dh_version'] = nxt
+
+    # Positional fallback for Block No at AG (index 32) within the first few rows
+    if found['block_no'] is None:
+        for row in scan_rows:
+            if len(row) > BLOCK_NO_POSITION:
+                v = row[BLOCK_NO_POSITION]
+                if v is not None and str(v).strip() != "":
+                    found['block_no'] = str(v).strip()
                     break
-        if not dhid_value or not isinstance(dhid_value, str):
-            continue
-        hole_id_guess = dhid_value.strip()
-        if hole_id_guess not in seen_holes:
-            easting_bc = row[1] if len(row) > 1 else None  # B
-            northing_bc = row[2] if len(row) > 2 else None  # C
-            elevation_d = row[3] if len(row) > 3 else None  # D
-            total_depth_g = row[6] if len(row) > 6 else None  # G
-            year_drilled_z = row[25] if len(row) > 25 else None  # Z
-            geologist_aa = row[26] if len(row) > 26 else None  # AA
-            dh_version_ah = row[33] if len(row) > 33 else None  # AH
-            block_no_ag = row[32] if len(row) > 32 else None  # AG
-            hole_first_row_info[hole_id_guess] = {
-                'easting': easting_bc,
-                'northing': northing_bc,
-                'elevation': elevation_d,
-                'total_depth': total_depth_g,
-                'year_drilled': year_drilled_z,
-                'geologist': geologist_aa,
-                'dh_version': dh_version_ah,
-                'block_no': block_no_ag,
-            }
-            seen_holes.add(hole_id_guess)
-
-    # Unique holes
-    unique_holes = df['DHID'].dropna().unique()
+
+
+def _to_float(x):
+    try:
+        return float(x)
+    except Exception:
+        return None
+
+
+def build_collars(data: List[Tuple], df: Optional[pd.DataFrame] = None,
+                  created_at: Optional[datetime] = None) -> pd.DataFrame:
+    """Build collar rows from non-empty DAT201 rows (header first); df is the same rows as a frame, if already built.
+    One grouped pass: every hole's first row, first non-null candidate values and leading
+    header-scan rows are located with factorized hole codes instead of a scan per hole.
+    """
+    if df is None:
+        df = pd.DataFrame(data[1:], columns=data[0])
+    df = df.reset_index(drop=True)
+    created_at = created_at or datetime.now()
+
+    first_row_by_hole = _first_row_index(data, df)
+
+    # Unique holes in order of first appearance; codes[i] is the hole of row i (-1 for no DHID)
+    codes, unique_holes = pd.factorize(df['DHID'])
+    n_holes = len(unique_holes)
+    first_pos = pd.Series(np.arange(len(codes)))[codes >= 0].groupby(codes[codes >= 0]).first().to_numpy()
+    found_by_field = _first_values(df, codes, n_holes)
+    found_per_hole = [
+        {field: found_by_field[field][h] for field in COLLAR_FIELD_CANDIDATES}
+        for h in range(n_holes)
+    ]
+
+    # Header-token scan only for holes still missing a field, over their first rows
+    needs_scan = np.array([any(v is None for v in found.values()) for found in found_per_hole], dtype=bool)
+    if needs_scan.any():
+        row_in_hole = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        scan_mask = (codes >= 0) & (row_in_hole < HEADER_SCAN_ROWS)
+        scan_mask[scan_mask] = needs_scan[codes[scan_mask]]
+        scan_positions = np.flatnonzero(scan_mask)
+        scan_values = df.iloc[scan_positions].fillna("").to_numpy(dtype=object).tolist()
+        scan_rows: Dict[int, List[List[object]]] = {}
+        for code, values in zip(codes[scan_positions], scan_values):
+            scan_rows.setdefault(int(code), []).append(values)
+        for code, rows_for_hole in scan_rows.items():
+            _scan_header_tokens(rows_for_hole, found_per_hole[code])
+
+    first_cols = {c: df[c].to_numpy()[first_pos] for c in ('Easting', 'Northing', 'Elevation') if c in df.columns}
+
     rows = []
-    collar_id = 1
-    for hole_id in unique_holes:
-        hole_df = df[df['DHID'] == hole_id]
-        first = hole_df.iloc[0]
-        # We take total_depth from header G; we will not use max depth of intervals
-        max_depth = None
-
-        def pick_first(cols):
-            for c in cols:
-                if c in hole_df.columns:
-                    val = hole_df[c].dropna().head(1)
-                    if len(val) > 0:
-                        return val.iloc[0]
-            return None
-
-        # Try direct column names first
-        azimuth = pick_first(['Azimuth', 'AZIMUTH', 'Azi', 'AZI'])
-        dip = pick_first(['Dip', 'DIP', 'Inclination', 'Incl.'])
-        drilling_date = pick_first(['Drilling Date', 'Date', 'Drill Date'])
-        contractor = pick_first(['Contractor', 'Drilling Contractor', 'Contr.'])
-        remarks = pick_first(['Remarks', 'Remark', 'Comments', 'Notes'])
-        elevation_val = pick_first(['Elevation', 'RL', 'Reduced Level'])
-        geologist_val = pick_first(['Geologist', 'Geo', 'GEO'])
-        block_no_val = pick_first(['Block', 'Block No', 'Block_no', 'BlockNo'])
-        dh_version_val = pick_first(['DH Version', 'Version', 'DH_Version'])
-
-        # Fallback: scan first few header-like rows for key tokens (values spread across columns)
-        if any(v is None for v in [azimuth, dip, drilling_date, contractor, remarks, elevation_val, geologist_val, block_no_val, dh_version_val]):
-            scan_rows = hole_df.head(6).fillna("")
-            for _, row in scan_rows.iterrows():
-                cells = [str(x).strip() for x in row.tolist() if str(x).strip() != ""]
-                for i, cell in enumerate(cells):
-                    low = cell.lower()
-                    def next_val():
-                        return cells[i+1] if i + 1 < len(cells) else None
-                    if azimuth is None and ('azimuth' in low or low in ('azi','az')):
-                        azimuth = next_val()
-                    if dip is None and ('dip' in low or 'incl' in low):
-                        dip = next_val()
-                    if drilling_date is None and ('date' in low):
-                        drilling_date = next_val()
-                    if contractor is None and ('contractor' in low or 'drill' in low and 'contract' in low):
-                        contractor = next_val()
-                    if remarks is None and ('remark' in low or 'note' in low or 'comment' in low):
-                        remarks = next_val()
-                    if elevation_val is None and (low == 'rl' or 'elevation' in low or 'reduced level' in low):
-                        elevation_val = next_val()
-                    if geologist_val is None and ('geologist' in low or low in ('geo','geol')):
-                        geologist_val = next_val()
-                    if block_no_val is None and ('block' in low):
-                        block_no_val = next_val()
-                    if dh_version_val is None and ('version' in low):
-                        dh_version_val = next_val()
-
-            # Positional fallback for Block No at AG (index 32) within the first few rows
-            if block_no_val is None:
-                for _, r2 in scan_rows.iterrows():
-                    lst = list(r2.values.tolist())
-                    if len(lst) > 32:
-                        v = lst[32]
-                        if v is not None and str(v).strip() != "":
-                            block_no_val = str(v).strip()
-                            break
-
-        # Normalize types
-        def to_float(x):
-            try:
-                return float(x)
-            except Exception:
-                return None
-        def to_date(x):
-            if isinstance(x, datetime):
-                return x.date()
-            if isinstance(x, str):
-                for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y"):
-                    try:
-                        return datetime.strptime(x, fmt).date()
-                    except Exception:
-                        continue
-            return None
+    for h, hole_id in enumerate(unique_holes):
+        found = found_per_hole[h]
+        hole_key = str(hole_id).strip()
+        info = _positional_info(first_row_by_hole.get(hole_key))
+        first = {c: vals[h] for c, vals in first_cols.items()}
 
         # Fallback to B/C from header-mapped positions if direct columns are missing
-        if (first.get('Easting') is None or first.get('Northing') is None) and str(hole_id).strip() in hole_first_row_info:
-            info = hole_first_row_info[str(hole_id).strip()]
-            if first.get('Easting') is None:
-                e_val = to_float(info.get('easting'))
-            else:
-                e_val = to_float(first['Easting'])
-            if first.get('Northing') is None:
-                n_val = to_float(info.get('northing'))
-            else:
-                n_val = to_float(first['Northing'])
+        if (first.get('Easting') is None or first.get('Northing') is None) and info:
+            e_val = _to_float(info.get('easting')) if first.get('Easting') is None else _to_float(first['Easting'])
+            n_val = _to_float(info.get('northing')) if first.get('Northing') is None else _to_float(first['Northing'])
+        else:
+            e_val = _to_float(first['Easting']) if first.get('Easting') is not None else None
+            n_val = _to_float(first['Northing']) if first.get('Northing') is not None else None
+
+        if first.get('Elevation') is not None:
+            elevation = _to_float(first['Elevation'])
+        elif found['elevation'] is not None:
+            elevation = _to_float(found['elevation'])
         else:
-            e_val = to_float(first['Easting']) if 'Easting' in first and first['Easting'] is not None else None
-            n_val = to_float(first['Northing']) if 'Northing' in first and first['Northing'] is not None else None
+            elevation = _to_float(info['elevation']) if info.get('elevation') is not None else None
+
+        geologist = found['geologist'] if found['geologist'] is not None else info.get('geologist')
+        block_no = found['block_no'] if found['block_no'] is not None else info.get('block_no')
+        dh_version = found['dh_version'] if found['dh_version'] is not None else info.get('dh_version')
 
         rows.append({
-            'collar_id': collar_id,
-            'hole_id': str(hole_id).strip(),
+            'collar_id': h + 1,
+            'hole_id': hole_key,
             'easting': e_val,
             'northing': n_val,
-            'elevation': (
-                to_float(first['Elevation']) if 'Elevation' in first and first['Elevation'] is not None
-                else to_float(elevation_val) if elevation_val is not None
-                else (
-                    to_float(hole_first_row_info[str(hole_id).strip()]['elevation']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('elevation') is not None else None
-                )
-            ),
-            'total_depth': (
-                to_float(hole_first_row_info[str(hole_id).strip()]['total_depth']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('total_depth') is not None else None
-            ),
-            'dip': to_float(dip) if dip is not None else None,
-            'year_drilled': (
-                int(hole_first_row_info[str(hole_id).strip()]['year_drilled']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('year_drilled') not in (None, "") else None
-            ),
+            'elevation': elevation,
+            # We take total_depth from header G; we will not use max depth of intervals
+            'total_depth': _to_float(info['total_depth']) if info.get('total_depth') is not None else None,
+            'dip': _to_float(found['dip']) if found['dip'] is not None else None,
+            'year_drilled': int(info['year_drilled']) if info.get('year_drilled') not in (None, "") else None,
             # We no longer populate final_depth/drilling_date per requirement
-            'azimuth': to_float(azimuth) if azimuth is not None else None,
-            'contractor': None if contractor is None else str(contractor),
-            'geologist': (
-                str(geologist_val) if geologist_val is not None else (
-                    str(hole_first_row_info[str(hole_id).strip()]['geologist']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('geologist') is not None else None
-                )
-            ),
-            'block_no': (
-                str(block_no_val) if block_no_val is not None else (
-                    str(hole_first_row_info[str(hole_id).strip()]['block_no']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('block_no') is not None else None
-                )
-            ),
-            'dh_version': (
-                to_float(dh_version_val) if dh_version_val is not None else (
-                    to_float(hole_first_row_info[str(hole_id).strip()]['dh_version']) if str(hole_id).strip() in hole_first_row_info and hole_first_row_info[str(hole_id).strip()].get('dh_version') is not None else None
-                )
-            ),
-            'remarks': None if remarks is None else str(remarks),
-            'created_at': datetime.now(),
-            'updated_at': datetime.now(),
+            'azimuth': _to_float(found['azimuth']) if found['azimuth'] is not None else None,
+            'contractor': None if found['contractor'] is None else str(found['contractor']),
+            'geologist': None if geologist is None else str(geologist),
+            'block_no': None if block_no is None else str(block_no),
+            'dh_version': None if dh_version is None else _to_float(dh_version),
+            'remarks': None if found['remarks'] is None else str(found['remarks']),
+            'created_at': created_at,
+            'updated_at': created_at,
         })
-        collar_id += 1
 
     return pd.DataFrame(rows)
 
 
-__all__ = ["extract_collars"]
+__all__ = ["extract_collars", "build_collars", "COLLAR_FIELD_CANDIDATES", "HEADER_SCAN_ROWS", "POSITIONAL_FIELDS", "hole_id_guess_for_row"]
 
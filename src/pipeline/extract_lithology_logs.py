@@ -6,59 +6,63 @@ Outputs a DataFrame with columns:
   log_id, hole_id, depth_from, depth_to, rock_code, description, created_at
 - rock_code is taken directly from DAT201 'Rock' column to preserve relationships
 - sorted by hole_id, depth_from
+- converted column-wise; all rows of one run share a single created_at
+- extract_lithology_logs returns the compact dtypes of schema.COMPACT_DTYPES
 """
 
+import numpy as np
 import pandas as pd
-import openpyxl
 from datetime import datetime
 from typing import Optional
 
+from .column_ops import clean_text, column, to_float, to_int_code
+from .schema import compact_table
+from .workbook import WorkbookSession, open_session
 
-def extract_lithology_logs(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
-	wb = openpyxl.load_workbook(excel_path, data_only=True)
-	ws = wb['DAT201']
-	data = []
-	for row in ws.iter_rows(values_only=True):
-		if any(cell is not None for cell in row):
-			data.append(row)
-	wb.close()
-	df = pd.DataFrame(data[1:], columns=data[0])
-
-	rows = []
-	log_seq = 1
-	for _, row in df.iterrows():
-		try:
-			rock_val = row.get('Rock')
-			rock_code: Optional[int] = None
-			if rock_val is not None and str(rock_val).strip() != '':
-				try:
-					rock_code = int(float(rock_val))
-				except Exception:
-					rock_code = None
-
-			rows.append({
-				'log_id': log_seq,
-				'hole_id': str(row.get('DHID')).strip() if row.get('DHID') else None,
-				'depth_from': float(row.get('From')) if row.get('From') is not None else None,
-				'depth_to': float(row.get('To')) if row.get('To') is not None else None,
-				'rock_code': rock_code,
-				'description': str(row.get('Lithology')).strip() if row.get('Lithology') else None,
-				'created_at': datetime.now(),
-			})
-			log_seq += 1
-		except Exception:
-			pass
-
-	out = pd.DataFrame(rows)
-	# Sort by hole and depth
+# Bump when the output of this extractor changes for the same input (see manifest.py)
+EXTRACTOR_VERSION = 1
+
+
+LITHOLOGY_COLUMNS = ['log_id', 'hole_id', 'depth_from', 'depth_to', 'rock_code', 'description', 'created_at']
+
+
+def build_lithology_logs(df: pd.DataFrame, start_id: int = 1, created_at: Optional[datetime] = None) -> pd.DataFrame:
+	"""Convert DAT201 rows to lithology_logs rows in sheet order, numbering log_id from start_id.
+	Rows whose From/To cannot be read as a number are dropped.
+	"""
+	created_at = created_at or datetime.now()
+
+	depth_from, bad_from = to_float(column(df, 'From'))
+	depth_to, bad_to = to_float(column(df, 'To'))
+	keep = ~(bad_from | bad_to)
+
+	out = pd.DataFrame({
+		'hole_id': clean_text(column(df, 'DHID')),
+		'depth_from': depth_from,
+		'depth_to': depth_to,
+		'rock_code': to_int_code(column(df, 'Rock')),
+		'description': clean_text(column(df, 'Lithology')),
+	})[keep].reset_index(drop=True)
+	out.insert(0, 'log_id', np.arange(start_id, start_id + len(out), dtype=np.int64))
+	out['created_at'] = created_at
+	return out[LITHOLOGY_COLUMNS]
+
+
+def sort_lithology_logs(out: pd.DataFrame) -> pd.DataFrame:
+	"""Sort by hole and depth, then renumber log_id sequentially."""
 	out = out.sort_values(by=['hole_id', 'depth_from'], kind='stable').reset_index(drop=True)
-	# Reassign log_id sequentially after sort
 	out['log_id'] = range(1, len(out) + 1)
-	# rock_code as nullable integer to avoid floats in CSV
-	out['rock_code'] = out['rock_code'].astype('Int64')
-	# Ensure column order
-	out = out[['log_id', 'hole_id', 'depth_from', 'depth_to', 'rock_code', 'description', 'created_at']]
-	return out
+	return out[LITHOLOGY_COLUMNS]
+
+
+def extract_lithology_logs(excel_path: str = "data/raw/DH70.xlsx", session: Optional[WorkbookSession] = None,
+						   created_at: Optional[datetime] = None) -> pd.DataFrame:
+	session, owned = open_session(excel_path, session)
+	df = session.frame('DAT201')
+	if owned:
+		session.close()
+
+	return compact_table('lithology_logs', sort_lithology_logs(build_lithology_logs(df, created_at=created_at)))
 
 
-__all__ = ["extract_lithology_logs"]
+__all__ = ["extract_lithology_logs", "build_lithology_logs", "sort_lithology_logs", "LITHOLOGY_COLUMNS"]
@@ -6,23 +6,30 @@ Outputs a DataFrame with columns:
   rock_code, lithology, detail, created_at
 - Sorted by rock_code ascending
 - rock_code is the surrogate key used in relationships
+- returned with the compact dtypes of schema.COMPACT_DTYPES
 """
 
 import pandas as pd
-import openpyxl
 from datetime import datetime
 from typing import Optional
 
+from .schema import compact_table
+from .workbook import WorkbookSession, open_session, cell
 
-def extract_rock_types(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
-	wb = openpyxl.load_workbook(excel_path, data_only=True)
-	ws = wb['Rock Code']
+# Bump when the output of this extractor changes for the same input (see manifest.py)
+EXTRACTOR_VERSION = 1
+
+
+def extract_rock_types(excel_path: str = "data/raw/DH70.xlsx", session: Optional[WorkbookSession] = None,
+					   created_at: Optional[datetime] = None) -> pd.DataFrame:
+	session, owned = open_session(excel_path, session)
+	created_at = created_at or datetime.now()
 
 	rows = []
-	for r in range(2, ws.max_row + 1):
-		detail = ws.cell(r, 1).value
-		lithology = ws.cell(r, 2).value
-		rock_code = ws.cell(r, 3).value
+	for row in session.rows('Rock Code')[1:]:
+		detail = cell(row, 0)
+		lithology = cell(row, 1)
+		rock_code = cell(row, 2)
 		if rock_code is not None and lithology is not None:
 			try:
 				code_val: Optional[int] = int(rock_code) if isinstance(rock_code, (int, float)) else None
@@ -31,19 +38,20 @@ def extract_rock_types(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
 						'rock_code': code_val,
 						'lithology': str(lithology).strip(),
 						'detail': str(detail).strip() if detail else '',
-						'created_at': datetime.now(),
+						'created_at': created_at,
 					})
 			except Exception:
 				pass
 
-	wb.close()
+	if owned:
+		session.close()
 
 	df = pd.DataFrame(rows)
 	# Sort by rock_code ascending
 	df = df.sort_values(by=['rock_code'], kind='stable').reset_index(drop=True)
 	# Ensure rock_code is integer
 	df['rock_code'] = df['rock_code'].astype('Int64')
-	return df
+	return compact_table('rock_types', df)
 
 
 __all__ = ["extract_rock_types"]
@@ -3,75 +3,101 @@
 """
 Extractor: Sample Analyses from DH70.xlsx (DAT201 worksheet)
 Outputs a DataFrame with columns matching sample_analyses.csv used by SQL scripts.
+- null sentinels (-1.0, empty string) are cleaned and coerced as whole-column operations
+- extract_sample_analyses returns the compact dtypes of schema.COMPACT_DTYPES
 """
 
+import numpy as np
 import pandas as pd
-import openpyxl
 from datetime import datetime
-from typing import Optional, List
-
-
-def _clean_value(val):
-	if val is None or val == '' or val == -1.0:
-		return None
-	try:
-		return float(val)
-	except Exception:
-		return None
-
-
-def extract_sample_analyses(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
-	wb = openpyxl.load_workbook(excel_path, data_only=True)
-	ws = wb['DAT201']
-	data = []
-	for row in ws.iter_rows(values_only=True):
-		if any(cell is not None for cell in row):
-			data.append(row)
-	wb.close()
-	df = pd.DataFrame(data[1:], columns=data[0])
-
-	analysis_columns: List[str] = ['IM', 'TM', 'Ash', 'VM', 'FC', 'Sulphur', 'RD', 'HGI']
-	available: List[str] = [c for c in analysis_columns if c in df.columns]
+from typing import Dict, Optional, List, Tuple
+
+from .column_ops import clean_text, column, is_none, is_truthy, to_float
+from .schema import compact_table
+from .workbook import WorkbookSession, open_session
+
+# Bump when the output of this extractor changes for the same input (see manifest.py)
+EXTRACTOR_VERSION = 1
+
+
+ANALYSIS_COLUMNS: List[str] = ['IM', 'TM', 'Ash', 'VM', 'FC', 'Sulphur', 'RD', 'HGI']
+
+# Metric columns filled from DAT201, by output name; the rest are left null
+METRIC_SOURCES: Dict[str, str] = {
+	'im': 'IM', 'tm': 'TM', 'ash': 'Ash', 'vm': 'VM', 'fc': 'FC', 'sulphur': 'Sulphur', 'rd': 'RD', 'hgi': 'HGI',
+}
+
+SAMPLE_COLUMNS: List[str] = [
+	'sample_id', 'hole_id', 'depth_from', 'depth_to', 'sample_no', 'im', 'tm', 'ash', 'vm', 'fc', 'sulphur',
+	'gross_cv', 'net_cv', 'sg', 'rd', 'hgi', 'seam_quality_id', 'seam_73_id', 'seam_code_quality_original',
+	'analysis_date', 'lab_name', 'remarks', 'created_at', 'updated_at',
+]
+
+
+def clean_values(col: pd.Series) -> Tuple[pd.Series, pd.Series]:
+	"""Column-wise cell cleaning: None, '' and the -1.0 null sentinel become NaN, as do
+	values float() rejects. Returns (values, valid), valid marking cells that count as a
+	measurement; a float NaN counts (float(nan) succeeds), only None does not.
+	"""
+	sentinel = col == -1.0
+	empty = col == ''
+	values, rejected = to_float(col)
+	values[sentinel | empty | rejected] = np.nan
+	null = col.isna()
+	valid = (~null & ~sentinel & ~empty & ~rejected) | (null & ~is_none(col))
+	return values, valid
+
+
+def build_sample_analyses(df: pd.DataFrame, start_id: int = 1, created_at: Optional[datetime] = None) -> pd.DataFrame:
+	"""Convert DAT201 rows with at least one valid metric to sample_analyses rows, numbering sample_id from start_id."""
+	created_at = created_at or datetime.now()
+	available: List[str] = [c for c in ANALYSIS_COLUMNS if c in df.columns]
 	mask = df[available].notna().any(axis=1)
 	valid_mask = ~((df[available] == -1.0) | (df[available].isna())).all(axis=1)
-	adf = df[mask & valid_mask]
-
-	rows = []
-	sample_id = 1
-	for _, r in adf.iterrows():
-		# ensure we have at least one valid metric
-		if not any(_clean_value(r.get(c)) is not None for c in available):
-			continue
-		rows.append({
-			'sample_id': sample_id,
-			'hole_id': str(r.get('DHID')).strip() if r.get('DHID') else None,
-			'depth_from': _clean_value(r.get('From')),
-			'depth_to': _clean_value(r.get('To')),
-			'sample_no': f"{r.get('DHID')}_{sample_id}" if r.get('DHID') else None,
-			'im': _clean_value(r.get('IM')),
-			'tm': _clean_value(r.get('TM')),
-			'ash': _clean_value(r.get('Ash')),
-			'vm': _clean_value(r.get('VM')),
-			'fc': _clean_value(r.get('FC')),
-			'sulphur': _clean_value(r.get('Sulphur')),
-			'gross_cv': None,
-			'net_cv': None,
-			'sg': None,
-			'rd': _clean_value(r.get('RD')),
-			'hgi': _clean_value(r.get('HGI')),
-			'seam_quality_id': None,
-			'seam_73_id': None,
-			'seam_code_quality_original': None,
-			'analysis_date': None,
-			'lab_name': None,
-			'remarks': None,
-			'created_at': datetime.now(),
-			'updated_at': datetime.now(),
-		})
-		sample_id += 1
-
-	return pd.DataFrame(rows)
-
-
-__all__ = ["extract_sample_analyses"]
+	keep = mask & valid_mask
+
+	metrics: Dict[str, pd.Series] = {}
+	has_metric = pd.Series(False, index=df.index)
+	for name in available:
+		values, valid = clean_values(df[name])
+		metrics[name] = values
+		has_metric |= valid
+	keep &= has_metric
+
+	adf = df[keep]
+	n = len(adf)
+	sample_id = pd.Series(np.arange(start_id, start_id + n, dtype=np.int64), index=adf.index)
+	dhid = column(adf, 'DHID')
+	sample_no = pd.Series(None, index=adf.index, dtype=object)
+	named = is_truthy(dhid)
+	sample_no[named] = dhid[named].astype(str) + '_' + sample_id[named].astype(str)
+
+	out = pd.DataFrame({
+		'sample_id': sample_id,
+		'hole_id': clean_text(dhid),
+		'depth_from': clean_values(column(adf, 'From'))[0],
+		'depth_to': clean_values(column(adf, 'To'))[0],
+		'sample_no': sample_no,
+	}, index=adf.index)
+	for out_col in SAMPLE_COLUMNS[5:-2]:
+		source = METRIC_SOURCES.get(out_col)
+		if source in metrics:
+			out[out_col] = metrics[source][keep]
+		else:
+			out[out_col] = pd.Series(None, index=adf.index, dtype=object)
+	out['created_at'] = created_at
+	out['updated_at'] = created_at
+	return out.reset_index(drop=True)[SAMPLE_COLUMNS]
+
+
+def extract_sample_analyses(excel_path: str = "data/raw/DH70.xlsx", session: Optional[WorkbookSession] = None,
+							created_at: Optional[datetime] = None) -> pd.DataFrame:
+	session, owned = open_session(excel_path, session)
+	df = session.frame('DAT201')
+	if owned:
+		session.close()
+	return compact_table('sample_analyses', build_sample_analyses(df, created_at=created_at))
+
+
+__all__ = ["extract_sample_analyses", "build_sample_analyses", "clean_values", "SAMPLE_COLUMNS", "ANALYSIS_COLUMNS"]
 
@@ -4,17 +4,25 @@
 Extractor: Seam Codes from DH70.xlsx (all systems available in worksheet)
 Outputs a DataFrame with columns:
   seam_id, system_id, system_name, seam_label, seam_code, priority, description, created_at
+- returned with the compact dtypes of schema.COMPACT_DTYPES
 """
 
 import pandas as pd
-import openpyxl
 from datetime import datetime
 from typing import Optional
 
+from .schema import compact_table
+from .workbook import WorkbookSession, open_session, cell
 
-def extract_seam_codes(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
-	wb = openpyxl.load_workbook(excel_path, data_only=True)
-	ws = wb['Seam Code']
+# Bump when the output of this extractor changes for the same input (see manifest.py)
+EXTRACTOR_VERSION = 1
+
+
+def extract_seam_codes(excel_path: str = "data/raw/DH70.xlsx", session: Optional[WorkbookSession] = None,
+					   created_at: Optional[datetime] = None) -> pd.DataFrame:
+	session, owned = open_session(excel_path, session)
+	created_at = created_at or datetime.now()
+	sheet_rows = session.rows('Seam Code')
 
 	# Column positions based on actual worksheet structure (1-based displayed here):
 	# [30, 'Seam Label', 'Seam Code', 46, 'Seam Label', 'Seam Code', ...]
@@ -30,9 +38,9 @@ def extract_seam_codes(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
 	rows = []
 	seam_id = 1
 	for system in systems:
-		for r in range(2, ws.max_row + 1):
-			label = ws.cell(r, system['label_col']).value
-			code = ws.cell(r, system['code_col']).value
+		for row in sheet_rows[1:]:
+			label = cell(row, system['label_col'] - 1)
+			code = cell(row, system['code_col'] - 1)
 			if label and code is not None:
 				try:
 					code_val: Optional[int] = int(code) if isinstance(code, (int, float)) else None
@@ -45,14 +53,15 @@ def extract_seam_codes(excel_path: str = "data/raw/DH70.xlsx") -> pd.DataFrame:
 							'seam_code': code_val,
 							'priority': system['priority'],
 							'description': f"{system['name']} - {str(label).strip()}",
-							'created_at': datetime.now(),
+							'created_at': created_at,
 						})
 						seam_id += 1
 				except Exception:
 					pass
 
-	wb.close()
-	return pd.DataFrame(rows)
+	if owned:
+		session.close()
+	return compact_table('seam_codes', pd.DataFrame(rows))
 
 
 __all__ = ["extract_seam_codes"]
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load targets for scripts/load_to_sqlserver.py.
+A LoadBackend creates the schema, bulk-inserts rows into one table and counts
+rows; the loader reads the normalized tables and hands every backend the same
+row tuples of native values (None for missing values), keeping the source's ids.
+
+bulk_insert is all-or-nothing, so a failed call can simply be repeated. Given a
+checkpoint it also logs the partition to load_log in the same transaction, so
+load_log lists exactly the partitions that are in the target (load_log()), and
+given row hashes it stores them in load_row_hashes with their rows.
+
+Delta loads (pipeline.delta_loader) use three more calls, each staged through a
+temporary table and applied in one transaction: row_hash_changes compares the
+source's row hashes with those stored in load_row_hashes, merge_rows upserts
+rows on their natural key and delete_rows removes rows, each keeping
+load_row_hashes in step with the table.
+
+- SqlServerBackend: pymssql. Rows go through the TDS bulk-copy API
+  (Connection.bulk_copy, pymssql >= 2.2.8) into a session #stage table without
+  the identity property, then move over with one INSERT ... SELECT: bulk copy
+  ignores IDENTITY_INSERT and commits per batch, the INSERT does neither, and
+  CHECKs and foreign keys hold as for any INSERT. Older pymssql falls back to
+  batched executemany INSERTs in one transaction. Upserts are a MERGE.
+- SqliteBackend: the standard library's sqlite3 with sql/create_sqlite_schema.sql,
+  the same tables and constraints. It loads each call in one transaction and
+  needs no server, so the loader can be run and timed offline. Connections may
+  be used from any thread and wait for each other's write locks. Upserts are an
+  UPDATE of the matched rows and an INSERT of the others.
+
+open_backend(target, **options) picks one by name (BACKENDS).
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+
+Row = Sequence[object]
+
+# Content hash of every loaded row by natural key, kept by full and delta loads alike
+ROW_HASH_TABLE = 'load_row_hashes'
+ROW_HASH_COLUMNS = ('table_name', 'row_key', 'row_hash')
+
+# One row per partition committed by a full load, written in the partition's own transaction
+LOAD_LOG_TABLE = 'load_log'
+LOAD_LOG_COLUMNS = ('load_id', 'table_name', 'part_start', 'part_stop', 'rows_loaded')
+
+_DUPLICATE_KEYS_SQL = "SELECT {limit}row_key FROM {stage} GROUP BY row_key HAVING COUNT(*) > 1{tail}"
+
+_HASH_CHANGES_SQL = """
+SELECT s.row_key, CASE WHEN h.row_key IS NULL THEN 'insert' ELSE 'update' END
+FROM {stage} AS s LEFT JOIN {hashes} AS h ON h.table_name = s.table_name AND h.row_key = s.row_key
+WHERE h.row_key IS NULL OR h.row_hash <> s.row_hash
+UNION ALL
+SELECT h.row_key, 'delete' FROM {hashes} AS h
+WHERE h.table_name = {p} AND NOT EXISTS (SELECT 1 FROM {stage} AS s WHERE s.row_key = h.row_key)
+"""
+
+
+def split_go_batches(text: str) -> List[str]:
+	"""Non-empty batches of a SQL Server script, split on lines that are exactly GO."""
+	batches = []
+	batch: List[str] = []
+	for line in text.splitlines():
+		if line.strip().upper() == 'GO':
+			batches.append('\n'.join(batch))
+			batch = []
+		else:
+			batch.append(line)
+	if batch:
+		batches.append('\n'.join(batch))
+	return [b.strip() for b in batches if b.strip()]
+
+
+def _counted(rows: Iterable[Row], counter: List[int]) -> Iterator[tuple]:
+	for row in rows:
+		counter[0] += 1
+		yield tuple(row)
+
+
+def _match(left: str, right: str, columns: Sequence[str]) -> str:
+	return ' AND '.join(f"{left}.{c} = {right}.{c}" for c in columns)
+
+
+def _update_columns(key_columns: Sequence[str], columns: Sequence[str]) -> List[str]:
+	# An updated row keeps its key and its first load time
+	return [c for c in columns if c not in key_columns and c != 'created_at']
+
+
+def _merge_sql(target: str, stage: str, key_columns: Sequence[str], columns: Sequence[str]) -> str:
+	update = ', '.join(f"t.{c} = s.{c}" for c in _update_columns(key_columns, columns))
+	return (
+		f"MERGE {target} AS t USING {stage} AS s ON {_match('t', 's', key_columns)} "
+		+ (f"WHEN MATCHED THEN UPDATE SET {update} " if update else '')
+		+ f"WHEN NOT MATCHED BY TARGET THEN INSERT ({','.join(columns)}) VALUES ({','.join('s.' + c for c in columns)});"
+	)
+
+
+def _raise_on_duplicates(table: str, rows: Sequence[Row]) -> None:
+	if rows:
+		shown = ', '.join(repr(r[0]) for r in rows)
+		raise ValueError(f"{table}: natural key is not unique in the source, e.g. {shown}")
+
+
+def _changes_by_kind(rows: Sequence[Row]) -> Dict[str, List[str]]:
+	changes: Dict[str, List[str]] = {'insert': [], 'update': [], 'delete': []}
+	for key, kind in rows:
+		changes[kind].append(key)
+	return changes
+
+
+def _batches(rows: Iterable[Row], batch_size: int) -> Iterator[List[tuple]]:
+	batch: List[tuple] = []
+	for row in rows:
+		batch.append(tuple(row))
+		if len(batch) >= batch_size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+class LoadBackend:
+	"""One load target. Tables are named without a schema prefix (collars, not dbo.collars)."""
+
+	name = ''
+	# Takes datetime values; otherwise timestamps are passed as ISO text
+	native_timestamps = True
+	# DB-API parameter marker and the load_log table as SQL refers to it
+	_param = '?'
+	_log_table = LOAD_LOG_TABLE
+
+	def create_schema(self) -> None:
+		raise NotImplementedError
+
+	def bulk_insert(self, table: str, columns: List[str], rows: Iterable[Row], keep_identity: bool = False,
+					batch_size: int = 5000, checkpoint: Optional[Tuple[str, str, int, int]] = None,
+					row_hashes: Optional[Iterable[Tuple[str, str]]] = None) -> int:
+		"""Insert rows (one value per column, None for NULL) and commit, all or none; returns the number of rows.
+		checkpoint (load_id, table_name, part_start, part_stop) is logged to load_log and row_hashes
+		(row_key, row_hash) go to load_row_hashes in the same transaction. row_hashes is read after rows,
+		so it may be filled while rows are consumed.
+		"""
+		raise NotImplementedError
+
+	def load_log(self, load_id: str) -> List[Tuple[str, int, int, int]]:
+		"""(table_name, part_start, part_stop, rows_loaded) of the partitions load_id committed; [] without load_log."""
+		if not self.has_table(LOAD_LOG_TABLE):
+			return []
+		sql = (f"SELECT table_name, part_start, part_stop, rows_loaded FROM {self._log_table} "
+			   f"WHERE load_id = {self._param}")
+		cur = self.conn.cursor()
+		try:
+			cur.execute(sql, (load_id,))
+			return [(str(t), int(a), int(b), int(n)) for t, a, b, n in cur.fetchall()]
+		finally:
+			cur.close()
+
+	def _log_insert(self) -> str:
+		return (f"INSERT INTO {self._log_table} ({','.join(LOAD_LOG_COLUMNS)}) "
+				f"VALUES ({','.join([self._param] * len(LOAD_LOG_COLUMNS))})")
+
+	def count(self, table: str) -> int:
+		raise NotImplementedError
+
+	def has_table(self, table: str) -> bool:
+		raise NotImplementedError
+
+	def row_hash_changes(self, table: str, hashes: Iterable[Tuple[str, str]],
+						 batch_size: int = 5000) -> Dict[str, List[str]]:
+		"""Compare (row_key, row_hash) pairs of the source with the hashes stored for table.
+		Returns the row keys to 'insert' (not stored), 'update' (stored hash differs) and 'delete' (stored,
+		not in hashes). Raises ValueError when a row key repeats.
+		"""
+		raise NotImplementedError
+
+	def merge_rows(self, table: str, key_columns: Sequence[str], columns: List[str], rows: Iterable[Row],
+				   hashes: Iterable[Tuple[str, str]], keep_identity: bool = False, batch_size: int = 5000) -> int:
+		"""Stage rows and merge them on key_columns: matched rows are updated (except created_at), the rest inserted.
+		Their (row_key, row_hash) pairs replace the stored ones in the same transaction; returns the number of rows.
+		"""
+		raise NotImplementedError
+
+	def delete_rows(self, table: str, key_columns: Sequence[str], keys: Iterable[Row], row_keys: Iterable[str],
+					batch_size: int = 5000) -> int:
+		"""Delete the rows whose key_columns match keys, and their stored hashes, in one transaction."""
+		raise NotImplementedError
+
+	def close(self) -> None:
+		self.conn.close()
+
+	def __enter__(self) -> "LoadBackend":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
+
+
+class SqlServerBackend(LoadBackend):
+	name = 'sqlserver'
+	_param = '%s'
+
+	def __init__(self, server: str, user: str, password: str, database: str, schema: str = 'dbo'):
+		import pymssql
+
+		self.conn = pymssql.connect(server=server, user=user, password=password, database=database)
+		self.schema = schema
+		self._log_table = f"{schema}.{LOAD_LOG_TABLE}"
+
+	def create_schema(self, path: Optional[str] = None) -> None:
+		with open(path or os.path.join(SQL_DIR, 'create_sql_server_schema.sql'), 'r', encoding='utf-8') as f:
+			batches = split_go_batches(f.read())
+		with self.conn.cursor() as cur:
+			for stmt in batches:
+				cur.execute(stmt)
+		self.conn.commit()
+
+	def _stage(self, cur, table: str, columns: List[str], rows: Iterable[Row], batch_size: int) -> Tuple[str, int]:
+		"""Copy rows into a fresh session #stage table with table's column types; (stage name, rows copied)."""
+		target = f"{self.schema}.{table}"
+		col_list = ','.join(columns)
+		stage = f"#stage_{table}"
+		# Left over when an earlier call on this connection failed
+		cur.execute(f"IF OBJECT_ID('tempdb..{stage}') IS NOT NULL DROP TABLE {stage}")
+		# UNION ALL drops the IDENTITY property, so the stage table takes the given ids as plain values
+		cur.execute(
+			f"SELECT TOP 0 {col_list} INTO {stage} FROM {target} UNION ALL SELECT TOP 0 {col_list} FROM {target}"
+		)
+		if hasattr(self.conn, 'bulk_copy'):
+			counter = [0]
+			self.conn.bulk_copy(stage, _counted(rows, counter), column_ids=list(range(1, len(columns) + 1)),
+								batch_size=batch_size, tablock=True)
+			return stage, counter[0]
+		total = 0
+		for batch in _batches(rows, batch_size):
+			cur.executemany(f"INSERT INTO {stage} ({col_list}) VALUES ({','.join(['%s'] * len(columns))})", batch)
+			total += len(batch)
+		return stage, total
+
+	def bulk_insert(self, table, columns, rows, keep_identity=False, batch_size=5000, checkpoint=None,
+					row_hashes=None):
+		target = f"{self.schema}.{table}"
+		col_list = ','.join(columns)
+		if not hasattr(self.conn, 'bulk_copy'):
+			return self._insert_batches(target, columns, rows, keep_identity, batch_size, checkpoint, row_hashes)
+		with self.conn.cursor() as cur:
+			stage, total = self._stage(cur, table, columns, rows, batch_size)
+			hash_stage = None
+			if row_hashes is not None:
+				# Staged before any DML, like the rows: bulk copy commits its batches
+				hash_stage, _ = self._stage(cur, ROW_HASH_TABLE, list(ROW_HASH_COLUMNS),
+											((table, k, h) for k, h in row_hashes), batch_size)
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} ON;")
+			cur.execute(f"INSERT INTO {target} ({col_list}) SELECT {col_list} FROM {stage}")
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} OFF;")
+			cur.execute(f"DROP TABLE {stage}")
+			if hash_stage is not None:
+				hash_list = ','.join(ROW_HASH_COLUMNS)
+				cur.execute(f"INSERT INTO {self.schema}.{ROW_HASH_TABLE} ({hash_list}) SELECT {hash_list} FROM {hash_stage}")
+				cur.execute(f"DROP TABLE {hash_stage}")
+			if checkpoint is not None:
+				cur.execute(self._log_insert(), (*checkpoint, total))
+		self.conn.commit()
+		return total
+
+	def _insert_batches(self, target, columns, rows, keep_identity, batch_size, checkpoint=None, row_hashes=None):
+		placeholders = ','.join(['%s'] * len(columns))
+		total = 0
+		with self.conn.cursor() as cur:
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} ON;")
+			for batch in _batches(rows, batch_size):
+				cur.executemany(f"INSERT INTO {target} ({','.join(columns)}) VALUES ({placeholders})", batch)
+				total += len(batch)
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} OFF;")
+			if row_hashes is not None:
+				sql = f"INSERT INTO {self.schema}.{ROW_HASH_TABLE} ({','.join(ROW_HASH_COLUMNS)}) VALUES (%s,%s,%s)"
+				for batch in _batches(((target.split('.')[-1], k, h) for k, h in row_hashes), batch_size):
+					cur.executemany(sql, batch)
+			if checkpoint is not None:
+				cur.execute(self._log_insert(), (*checkpoint, total))
+		self.conn.commit()
+		return total
+
+	def count(self, table: str) -> int:
+		with self.conn.cursor() as cur:
+			cur.execute(f"SELECT COUNT(*) FROM {self.schema}.{table}")
+			return int(cur.fetchone()[0])
+
+	def has_table(self, table: str) -> bool:
+		with self.conn.cursor() as cur:
+			cur.execute("SELECT OBJECT_ID(%s, 'U')", (f"{self.schema}.{table}",))
+			return cur.fetchone()[0] is not None
+
+	def row_hash_changes(self, table, hashes, batch_size=5000):
+		with self.conn.cursor() as cur:
+			stage, _ = self._stage(cur, ROW_HASH_TABLE, list(ROW_HASH_COLUMNS), ((table, k, h) for k, h in hashes),
+								   batch_size)
+			cur.execute(_DUPLICATE_KEYS_SQL.format(stage=stage, limit='TOP 10 ', tail=''))
+			_raise_on_duplicates(table, cur.fetchall())
+			cur.execute(_HASH_CHANGES_SQL.format(stage=stage, hashes=f"{self.schema}.{ROW_HASH_TABLE}", p='%s'),
+						(table,))
+			changes = _changes_by_kind(cur.fetchall())
+			cur.execute(f"DROP TABLE {stage}")
+		self.conn.commit()
+		return changes
+
+	def merge_rows(self, table, key_columns, columns, rows, hashes, keep_identity=False, batch_size=5000):
+		target = f"{self.schema}.{table}"
+		hash_table = f"{self.schema}.{ROW_HASH_TABLE}"
+		with self.conn.cursor() as cur:
+			stage, total = self._stage(cur, table, columns, rows, batch_size)
+			hash_stage, _ = self._stage(cur, ROW_HASH_TABLE, list(ROW_HASH_COLUMNS),
+										((table, k, h) for k, h in hashes), batch_size)
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} ON;")
+			cur.execute(_merge_sql(target, stage, key_columns, columns))
+			if keep_identity:
+				cur.execute(f"SET IDENTITY_INSERT {target} OFF;")
+			cur.execute(_merge_sql(hash_table, hash_stage, ROW_HASH_COLUMNS[:2], ROW_HASH_COLUMNS))
+			cur.execute(f"DROP TABLE {stage}")
+			cur.execute(f"DROP TABLE {hash_stage}")
+		self.conn.commit()
+		return total
+
+	def delete_rows(self, table, key_columns, keys, row_keys, batch_size=5000):
+		target = f"{self.schema}.{table}"
+		hash_table = f"{self.schema}.{ROW_HASH_TABLE}"
+		with self.conn.cursor() as cur:
+			stage, total = self._stage(cur, table, list(key_columns), keys, batch_size)
+			hash_stage, _ = self._stage(cur, ROW_HASH_TABLE, list(ROW_HASH_COLUMNS),
+										((table, k, '') for k in row_keys), batch_size)
+			cur.execute(f"DELETE t FROM {target} AS t WHERE EXISTS (SELECT 1 FROM {stage} AS s WHERE "
+						f"{_match('t', 's', key_columns)})")
+			cur.execute(f"DELETE t FROM {hash_table} AS t WHERE EXISTS (SELECT 1 FROM {hash_stage} AS s WHERE "
+						f"{_match('t', 's', ROW_HASH_COLUMNS[:2])})")
+			cur.execute(f"DROP TABLE {stage}")
+			cur.execute(f"DROP TABLE {hash_stage}")
+		self.conn.commit()
+		return total
+
+
+class SqliteBackend(LoadBackend):
+	name = 'sqlite'
+	# SQLite stores timestamps as text, and sqlite3's datetime adapter is deprecated (Python 3.12)
+	native_timestamps = False
+
+	def __init__(self, path: str, timeout: float = 600.0):
+		if os.path.dirname(os.path.abspath(path)):
+			os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		self.path = path
+		# One writer at a time: other connections wait up to timeout seconds for the lock
+		self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+		self.conn.execute("PRAGMA foreign_keys = ON")
+
+	def create_schema(self, path: Optional[str] = None) -> None:
+		with open(path or os.path.join(SQL_DIR, 'create_sqlite_schema.sql'), 'r', encoding='utf-8') as f:
+			self.conn.executescript(f.read())
+		self.conn.commit()
+
+	def bulk_insert(self, table, columns, rows, keep_identity=False, batch_size=5000, checkpoint=None,
+					row_hashes=None):
+		# INTEGER PRIMARY KEY takes explicit ids as they are, so keep_identity needs nothing here
+		sql = f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join(['?'] * len(columns))})"
+		total = 0
+		with self.conn:
+			for batch in _batches(rows, batch_size):
+				self.conn.executemany(sql, batch)
+				total += len(batch)
+			if row_hashes is not None:
+				hash_sql = f"INSERT INTO {ROW_HASH_TABLE} ({','.join(ROW_HASH_COLUMNS)}) VALUES (?,?,?)"
+				for batch in _batches(((table, k, h) for k, h in row_hashes), batch_size):
+					self.conn.executemany(hash_sql, batch)
+			if checkpoint is not None:
+				self.conn.execute(self._log_insert(), (*checkpoint, total))
+		return total
+
+	def count(self, table: str) -> int:
+		return int(self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+
+	def has_table(self, table: str) -> bool:
+		sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+		return self.conn.execute(sql, (table,)).fetchone() is not None
+
+	def _stage(self, table: str, columns: Sequence[str], rows: Iterable[Row], batch_size: int,
+			   index: Sequence[str] = ()) -> Tuple[str, int]:
+		"""Copy rows into a fresh temp stage table with table's column affinities; (stage name, rows copied)."""
+		stage = f"stage_{table}"
+		col_list = ','.join(columns)
+		self.conn.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+		# CREATE TABLE ... AS keeps each column's affinity, so staged text converts as it does in the table
+		self.conn.execute(f"CREATE TEMP TABLE {stage} AS SELECT {col_list} FROM main.{table} WHERE 0")
+		total = 0
+		for batch in _batches(rows, batch_size):
+			self.conn.executemany(f"INSERT INTO {stage} ({col_list}) VALUES ({','.join(['?'] * len(columns))})", batch)
+			total += len(batch)
+		if index:
+			self.conn.execute(f"CREATE INDEX temp.{stage}_key ON {stage} ({','.join(index)})")
+		return stage, total
+
+	def _upsert(self, table: str, stage: str, key_columns: Sequence[str], columns: Sequence[str]) -> None:
+		# No MERGE in SQLite: update the matched rows, then insert the others
+		match = _match(table, 's', key_columns)
+		update = _update_columns(key_columns, columns)
+		if update:
+			self.conn.execute(
+				f"UPDATE {table} SET ({','.join(update)}) = (SELECT {','.join('s.' + c for c in update)} "
+				f"FROM {stage} AS s WHERE {match}) WHERE EXISTS (SELECT 1 FROM {stage} AS s WHERE {match})"
+			)
+		self.conn.execute(
+			f"INSERT INTO {table} ({','.join(columns)}) SELECT {','.join('s.' + c for c in columns)} FROM {stage} AS s "
+			f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {match})"
+		)
+
+	def row_hash_changes(self, table, hashes, batch_size=5000):
+		with self.conn:
+			stage, _ = self._stage(ROW_HASH_TABLE, ROW_HASH_COLUMNS, ((table, k, h) for k, h in hashes), batch_size,
+								   index=('row_key',))
+			_raise_on_duplicates(table, self.conn.execute(
+				_DUPLICATE_KEYS_SQL.format(stage=stage, limit='', tail=' LIMIT 10')).fetchall())
+			changes = _changes_by_kind(self.conn.execute(
+				_HASH_CHANGES_SQL.format(stage=stage, hashes=ROW_HASH_TABLE, p='?'), (table,)).fetchall())
+			self.conn.execute(f"DROP TABLE temp.{stage}")
+		return changes
+
+	def merge_rows(self, table, key_columns, columns, rows, hashes, keep_identity=False, batch_size=5000):
+		with self.conn:
+			stage, total = self._stage(table, columns, rows, batch_size, index=key_columns)
+			hash_stage, _ = self._stage(ROW_HASH_TABLE, ROW_HASH_COLUMNS, ((table, k, h) for k, h in hashes),
+										batch_size, index=ROW_HASH_COLUMNS[:2])
+			self._upsert(table, stage, key_columns, columns)
+			self._upsert(ROW_HASH_TABLE, hash_stage, ROW_HASH_COLUMNS[:2], ROW_HASH_COLUMNS)
+			self.conn.execute(f"DROP TABLE temp.{stage}")
+			self.conn.execute(f"DROP TABLE temp.{hash_stage}")
+		return total
+
+	def delete_rows(self, table, key_columns, keys, row_keys, batch_size=5000):
+		with self.conn:
+			stage, total = self._stage(table, key_columns, keys, batch_size, index=key_columns)
+			hash_stage, _ = self._stage(ROW_HASH_TABLE, ROW_HASH_COLUMNS, ((table, k, '') for k in row_keys),
+										batch_size, index=ROW_HASH_COLUMNS[:2])
+			self.conn.execute(f"DELETE FROM {table} WHERE EXISTS (SELECT 1 FROM {stage} AS s WHERE "
+							  f"{_match(table, 's', key_columns)})")
+			self.conn.execute(f"DELETE FROM {ROW_HASH_TABLE} WHERE EXISTS (SELECT 1 FROM {hash_stage} AS s WHERE "
+							  f"{_match(ROW_HASH_TABLE, 's', ROW_HASH_COLUMNS[:2])})")
+			self.conn.execute(f"DROP TABLE temp.{stage}")
+			self.conn.execute(f"DROP TABLE temp.{hash_stage}")
+		return total
+
+
+BACKENDS = {b.name: b for b in (SqlServerBackend, SqliteBackend)}
+
+
+def open_backend(target: str, **options) -> LoadBackend:
+	"""Connect to a load target by name ('sqlserver' or 'sqlite') with that backend's options."""
+	if target not in BACKENDS:
+		raise ValueError(f"unknown load target {target!r}; expected one of {sorted(BACKENDS)}")
+	return BACKENDS[target](**options)
+
+
+__all__ = [
+	"LoadBackend", "SqlServerBackend", "SqliteBackend", "BACKENDS", "open_backend", "split_go_batches", "SQL_DIR",
+	"ROW_HASH_TABLE", "ROW_HASH_COLUMNS", "LOAD_LOG_TABLE", "LOAD_LOG_COLUMNS",
+]
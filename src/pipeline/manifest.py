@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build manifest for incremental pipeline runs.
+The manifest (pipeline_manifest.json next to the CSVs) records, per output, the
+content hash of the worksheet it was built from, the extractor version and the
+size/mtime of the written CSV. An output whose sheet hash, extractor version and
+file are unchanged is reused instead of rebuilt.
+
+Sheet hashes are taken from the xlsx package without openpyxl: the worksheet XML
+with its shared-string indices replaced by the strings themselves, plus the style
+table (number formats decide which cells read back as dates). Editing one sheet
+therefore leaves the hashes of the other sheets alone, even when the editor
+renumbers the shared string table. When the workbook file itself is byte-identical
+to the last run the stored sheet hashes are reused without unzipping anything.
+"""
+
+import hashlib
+import json
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .xlsx_reader import package_parts
+
+MANIFEST_NAME = 'pipeline_manifest.json'
+MANIFEST_FORMAT = 1
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+# <c r="A1" t="s"><v>12</v></c>: a cell holding shared string 12
+_SHARED_CELL = re.compile(rb'(<c\b[^>]*\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+	h = hashlib.sha256()
+	with open(path, 'rb') as fh:
+		for block in iter(lambda: fh.read(block_size), b''):
+			h.update(block)
+	return h.hexdigest()
+
+
+def _shared_strings(zf: zipfile.ZipFile, part: Optional[str]) -> List[str]:
+	if part is None or part not in zf.namelist():
+		return []
+	strings = []
+	with zf.open(part) as fh:
+		for _, elem in ET.iterparse(fh):
+			if elem.tag == _NS_MAIN + 'si':
+				strings.append(''.join(t.text or '' for t in elem.iter(_NS_MAIN + 't')))
+				elem.clear()
+	return strings
+
+
+def sheet_fingerprints(excel_path: str, sheets: Iterable[str]) -> Dict[str, Optional[str]]:
+	"""Content hash per worksheet name; None for a sheet the workbook does not have.
+	Falls back to the whole-file hash when the file is not an xlsx package.
+	"""
+	sheets = list(sheets)
+	if not zipfile.is_zipfile(excel_path):
+		digest = file_sha256(excel_path)
+		return {s: digest for s in sheets}
+
+	with zipfile.ZipFile(excel_path) as zf:
+		parts, shared_part, styles_part = package_parts(zf)
+		styles = zf.read(styles_part) if styles_part in zf.namelist() else b''
+		strings = None
+
+		out: Dict[str, Optional[str]] = {}
+		for sheet in sheets:
+			part = parts.get(sheet)
+			if part is None or part not in zf.namelist():
+				out[sheet] = None
+				continue
+			xml = zf.read(part)
+			if strings is None:
+				strings = _shared_strings(zf, shared_part)
+			indices = [int(m[1]) for m in _SHARED_CELL.findall(xml)]
+			h = hashlib.sha256(_SHARED_CELL.sub(rb'\1\3', xml))
+			h.update(hashlib.sha256(styles).digest())
+			h.update('\0'.join(strings[i] if i < len(strings) else '' for i in indices).encode('utf-8'))
+			out[sheet] = h.hexdigest()
+	return out
+
+
+def load_manifest(out_dir: str) -> dict:
+	"""Previous manifest, or an empty one when missing, unreadable or of another format."""
+	path = os.path.join(out_dir, MANIFEST_NAME)
+	try:
+		with open(path, encoding='utf-8') as fh:
+			data = json.load(fh)
+	except (OSError, ValueError):
+		return {'format': MANIFEST_FORMAT, 'outputs': {}}
+	if data.get('format') != MANIFEST_FORMAT:
+		return {'format': MANIFEST_FORMAT, 'outputs': {}}
+	data.setdefault('outputs', {})
+	return data
+
+
+def save_manifest(out_dir: str, manifest: dict) -> str:
+	path = os.path.join(out_dir, MANIFEST_NAME)
+	tmp = path + '.tmp'
+	with open(tmp, 'w', encoding='utf-8') as fh:
+		json.dump(manifest, fh, indent=2, sort_keys=True)
+	os.replace(tmp, path)
+	return path
+
+
+def _file_stamp(path: str) -> Optional[Dict[str, int]]:
+	try:
+		st = os.stat(path)
+	except OSError:
+		return None
+	return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+@dataclass
+class BuildPlan:
+	"""Which outputs to rebuild (with the reason) and which previous outputs to reuse."""
+	workbook_sha256: str
+	sheet_hashes: Dict[str, Optional[str]]
+	rebuild: Dict[str, str] = field(default_factory=dict)
+	reuse: Dict[str, dict] = field(default_factory=dict)
+
+
+def plan_build(excel_path: str, out_dir: str, outputs: Dict[str, dict], manifest: dict, force: bool = False) -> BuildPlan:
+	"""Compare each output against the manifest.
+	outputs maps an output name to {'sheet', 'version', 'file'}.
+	"""
+	workbook_sha256 = file_sha256(excel_path)
+	sheets = sorted({spec['sheet'] for spec in outputs.values()})
+	previous = manifest.get('workbook', {})
+	if previous.get('sha256') == workbook_sha256 and all(s in previous.get('sheets', {}) for s in sheets):
+		sheet_hashes = {s: previous['sheets'][s] for s in sheets}
+	else:
+		sheet_hashes = sheet_fingerprints(excel_path, sheets)
+
+	plan = BuildPlan(workbook_sha256, sheet_hashes)
+	for name, spec in outputs.items():
+		entry = manifest['outputs'].get(name)
+		if force:
+			reason = 'forced rebuild'
+		elif entry is None:
+			reason = 'no previous build'
+		elif sheet_hashes[spec['sheet']] is None or entry.get('sheet_hash') != sheet_hashes[spec['sheet']]:
+			reason = f"sheet '{spec['sheet']}' changed"
+		elif entry.get('version') != spec['version']:
+			reason = f"extractor version {entry.get('version')} -> {spec['version']}"
+		elif entry.get('output') != _file_stamp(os.path.join(out_dir, spec['file'])):
+			reason = f"{spec['file']} missing or modified"
+		else:
+			plan.reuse[name] = entry
+			continue
+		plan.rebuild[name] = reason
+	return plan
+
+
+def record_build(manifest: dict, out_dir: str, excel_path: str, plan: BuildPlan, outputs: Dict[str, dict],
+				 rows: Dict[str, Optional[int]]) -> dict:
+	"""Update the manifest after a run; rows[name] is None for an output whose build failed."""
+	manifest['workbook'] = {
+		'path': os.path.abspath(excel_path),
+		'sha256': plan.workbook_sha256,
+		'sheets': plan.sheet_hashes,
+	}
+	built_at = datetime.now().isoformat(timespec='seconds')
+	for name, n in rows.items():
+		spec = outputs[name]
+		if n is None:
+			# A failed build may have left a partial file behind
+			manifest['outputs'].pop(name, None)
+			continue
+		manifest['outputs'][name] = {
+			'file': spec['file'],
+			'sheet': spec['sheet'],
+			'sheet_hash': plan.sheet_hashes[spec['sheet']],
+			'version': spec['version'],
+			'rows': n,
+			'output': _file_stamp(os.path.join(out_dir, spec['file'])),
+			'built_at': built_at,
+		}
+	manifest['last_run'] = {
+		'at': built_at,
+		'reused': sorted(plan.reuse),
+		'rebuilt': plan.rebuild,
+	}
+	return manifest
+
+
+__all__ = [
+	"MANIFEST_NAME", "BuildPlan", "file_sha256", "sheet_fingerprints",
+	"load_manifest", "save_manifest", "plan_build", "record_build",
+]
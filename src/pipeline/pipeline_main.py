@@ -5,53 +5,149 @@ Pipeline Orchestrator: Build normalized CSVs from DH70.xlsx using modular extrac
 Outputs CSVs to data/normalized_sql_server/ matching the SQL load scripts.
 """
 
+import argparse
 import os
+import time
 from datetime import datetime
+from typing import Optional
 
 from .extract_seam_codes import extract_seam_codes
 from .extract_rock_types import extract_rock_types
-from .extract_collars import extract_collars
-from .extract_lithology_logs import extract_lithology_logs
-from .extract_sample_analyses import extract_sample_analyses
+from .batch import run_batch
+from .profiler import peak_rss_mb, write_run_report
+from .manifest import load_manifest, plan_build, record_build, save_manifest
+from .scheduler import TaskGraphError, run_tasks
+from .sheet_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, SheetCache
+from .schema import OUTPUT_FORMATS, table_filename
+from .streaming import DEFAULT_CHUNK_SIZE, stream_dat201
+from .tasks import EXTRACTOR_TASKS, pipeline_outputs, pipeline_tasks, task_results
+from .workbook import ENGINES, WorkbookSession
 
+OUTPUT_DIR = 'data/normalized_sql_server'
 
-def run_pipeline(excel_path: str = "data/raw/DH70.xlsx") -> None:
-	os.makedirs('data/normalized_sql_server', exist_ok=True)
 
-	# 1) Seam Codes (standard name)
-	seam_df = extract_seam_codes(excel_path)
-	seam_path = 'data/normalized_sql_server/seam_codes_lookup.csv'
+def run_pipeline(excel_path: str = "data/raw/DH70.xlsx", streaming: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+				 workers: int = 1, force: bool = False, fmt: str = 'csv', cache: Optional[SheetCache] = None,
+				 engine: str = 'openpyxl', profile_dir: Optional[str] = None) -> None:
+	os.makedirs(OUTPUT_DIR, exist_ok=True)
+	if streaming:
+		_run_streaming(excel_path, chunk_size, cache, engine)
+		return
+
+	started_at, start = datetime.now(), time.perf_counter()
+	# Outputs whose source sheet and extractor version match the manifest are reused as they are
+	outputs = pipeline_outputs(fmt)
+	manifest = load_manifest(OUTPUT_DIR)
+	plan = plan_build(excel_path, OUTPUT_DIR, outputs, manifest, force=force)
+
+	# DAT201 is parsed once, in the task that extracts from it, and only when an output that reads it is rebuilt
+	tasks = pipeline_tasks(excel_path, OUTPUT_DIR, plan.rebuild, fmt=fmt, cache=cache, engine=engine,
+						   profile_dir=profile_dir, created_at=started_at)
+	results = task_results(tasks, run_tasks(tasks, workers=workers)) if plan.rebuild else []
+	by_name = {r.name: r for r in results}
+	for name, label, _, _, _, _ in EXTRACTOR_TASKS:
+		out_path = os.path.join(OUTPUT_DIR, table_filename(name, fmt))
+		if name in plan.reuse:
+			print(f"↺ {label}: {plan.reuse[name]['rows']} -> {out_path} (reused, inputs unchanged)")
+			continue
+		res = by_name[name]
+		if res.ok:
+			print(f"✓ {label}: {res.value[0].rows} -> {out_path} ({res.seconds:.1f}s; {plan.rebuild[name]})")
+		else:
+			print(f"✗ {label}: {res.error.strip().splitlines()[-1]}")
+
+	rows = {name: (by_name[name].value[0].rows if by_name[name].ok else None) for name in plan.rebuild}
+	save_manifest(OUTPUT_DIR, record_build(manifest, OUTPUT_DIR, excel_path, plan, outputs, rows))
+	print(f"Reused {len(plan.reuse)} of {len(outputs)} outputs, rebuilt {len(plan.rebuild)}")
+
+	# The dat201 parse returns its load stage; extractor tasks return their extract and write stages
+	stages = []
+	for res in results:
+		if res.ok:
+			stages.extend(res.value)
+	report_path = write_run_report(
+		OUTPUT_DIR, stages, started_at=started_at.isoformat(timespec='seconds'), workbook=excel_path, engine=engine,
+		workers=workers, format=fmt, cache=cache is not None, wall_seconds=time.perf_counter() - start,
+		peak_rss_mb=peak_rss_mb(), reused=sorted(plan.reuse), rebuilt=plan.rebuild,
+		failed=[r.name for r in results if not r.ok],
+	)
+	_print_stages(stages)
+	print(f"Run report -> {report_path}")
+	if not all(r.ok for r in results):
+		raise TaskGraphError(results)
+
+
+def _print_stages(stages) -> None:
+	if not stages:
+		return
+	print(f"{'stage':<24}{'wall s':>9}{'cpu s':>9}{'read s':>9}{'pandas s':>10}{'rows/s':>12}{'peak MB':>9}")
+	for s in stages:
+		rate = f"{s.rows_per_second:,.0f}" if s.rows_per_second is not None else '-'
+		rss = f"{s.peak_rss_mb:.0f}" if s.peak_rss_mb is not None else '-'
+		print(f"{s.stage:<24}{s.wall_seconds:>9.2f}{s.cpu_seconds:>9.2f}{s.read_seconds:>9.2f}{s.pandas_seconds:>10.2f}"
+			  f"{rate:>12}{rss:>9}")
+
+
+def run_batch_pipeline(source: str, workers: int = 1, on_conflict: str = 'error', fmt: str = 'csv',
+					   cache: Optional[SheetCache] = None, engine: str = 'openpyxl') -> None:
+	# One task per workbook; merged outputs are not tracked by the build manifest
+	counts = run_batch(source, OUTPUT_DIR, workers=workers, on_conflict=on_conflict, fmt=fmt, cache=cache,
+					   engine=engine)
+	for name, label, _, _, _, _ in EXTRACTOR_TASKS:
+		print(f"✓ {label}: {counts[name]} -> {os.path.join(OUTPUT_DIR, table_filename(name, fmt))}")
+
+
+def _run_streaming(excel_path: str, chunk_size: int, cache: Optional[SheetCache] = None, engine: str = 'openpyxl') -> None:
+	# Small lookup sheets through a read-only session; DAT201 is never materialized (nor cached)
+	run_at = datetime.now()
+	with WorkbookSession(excel_path, read_only=True, cache=cache, engine=engine) as session:
+		seam_df = extract_seam_codes(excel_path, session=session, created_at=run_at)
+		rock_df = extract_rock_types(excel_path, session=session, created_at=run_at)
+	seam_path = os.path.join(OUTPUT_DIR, 'seam_codes_lookup.csv')
 	seam_df.to_csv(seam_path, index=False)
 	print(f"✓ Seam codes: {len(seam_df)} -> {seam_path}")
-
-	# 2) Rock Types
-	rock_df = extract_rock_types(excel_path)
-	rock_path = 'data/normalized_sql_server/rock_types.csv'
+	rock_path = os.path.join(OUTPUT_DIR, 'rock_types.csv')
 	rock_df.to_csv(rock_path, index=False)
 	print(f"✓ Rock types: {len(rock_df)} -> {rock_path}")
 
-	# 3) Collars
-	collars_df = extract_collars(excel_path)
-	collars_path = 'data/normalized_sql_server/collars.csv'
-	collars_df.to_csv(collars_path, index=False)
-	print(f"✓ Collars: {len(collars_df)} -> {collars_path}")
-
-	# 4) Lithology Logs
-	lith_df = extract_lithology_logs(excel_path)
-	lith_path = 'data/normalized_sql_server/lithology_logs.csv'
-	lith_df.to_csv(lith_path, index=False)
-	print(f"✓ Lithology logs: {len(lith_df)} -> {lith_path}")
-
-	# 5) Sample Analyses
-	samples_df = extract_sample_analyses(excel_path)
-	samples_path = 'data/normalized_sql_server/sample_analyses.csv'
-	samples_df.to_csv(samples_path, index=False)
-	print(f"✓ Sample analyses: {len(samples_df)} -> {samples_path}")
+	counts = stream_dat201(excel_path, OUTPUT_DIR, chunk_size, engine, created_at=run_at)
+	print(f"✓ Collars: {counts['collars']} -> {os.path.join(OUTPUT_DIR, 'collars.csv')}")
+	print(f"✓ Lithology logs: {counts['lithology_logs']} -> {os.path.join(OUTPUT_DIR, 'lithology_logs.csv')} (chunks of {chunk_size})")
+	print(f"✓ Sample analyses: {counts['sample_analyses']} -> {os.path.join(OUTPUT_DIR, 'sample_analyses.csv')} (chunks of {chunk_size})")
 
 
 if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description="Build normalized CSVs from a drillhole workbook.")
+	parser.add_argument('--excel', default="data/raw/DH70.xlsx", help="Path to the source workbook")
+	parser.add_argument('--streaming', action='store_true', help="Read DAT201 in read-only mode and write lithology/sample CSVs in chunks")
+	parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode")
+	parser.add_argument('--workers', type=int, default=1,
+						help="Processes for independent tasks: workbooks with --batch, otherwise only the lookup sheets")
+	parser.add_argument('--batch', metavar='DIR_OR_GLOB', help="Extract and merge every workbook in a directory or matching a glob")
+	parser.add_argument('--on-conflict', choices=['error', 'first'], default='error',
+						help="Batch mode: stop on a hole_id with different data in two workbooks, or keep the first")
+	parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+						help="Output format; parquet writes typed columns (needs pyarrow, not with --streaming)")
+	parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed-sheet cache")
+	parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES >> 20, help="Size limit of the parsed-sheet cache")
+	parser.add_argument('--no-cache', action='store_true', help="Parse every sheet from the workbook, bypassing the cache")
+	parser.add_argument('--engine', choices=ENGINES, default='openpyxl',
+						help="Worksheet reader; xlsx scans the sheet XML directly and is faster on large DAT201 sheets")
+	parser.add_argument('--profile-dir', metavar='DIR',
+						help="Run every stage under cProfile and dump <stage>.prof files into DIR")
+	parser.add_argument('--force', action='store_true', help="Rebuild every output even if the manifest says it is current")
+	args = parser.parse_args()
+	if args.streaming and args.format != 'csv':
+		parser.error("--streaming writes CSV only")
+
 	print("=" * 80)
 	print("RUNNING DATA PIPELINE - DH70.xlsx → normalized CSVs")
 	print("=" * 80)
-	run_pipeline()
+	cache = None if args.no_cache else SheetCache(args.cache_dir, args.cache_max_mb << 20)
+	if args.batch:
+		run_batch_pipeline(args.batch, workers=args.workers, on_conflict=args.on_conflict, fmt=args.format, cache=cache,
+						   engine=args.engine)
+	else:
+		run_pipeline(args.excel, streaming=args.streaming, chunk_size=args.chunk_size, workers=args.workers, force=args.force,
+					 fmt=args.format, cache=cache, engine=args.engine, profile_dir=args.profile_dir)
 	print("\nAll outputs ready under data/normalized_sql_server/")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stage metrics for pipeline runs.
+measure() wraps one stage (parsing DAT201, running an extractor, writing a
+table) and records wall and CPU time, rows and rows/s, the peak RSS of the
+process that ran it, and how the wall time splits between the worksheet reader
+(openpyxl, the xlsx engine or the sheet cache) and the rest, which is pandas
+building, transforming and writing frames. With a profile directory the stage
+also runs under cProfile and its stats are dumped to <dir>/<stage>.prof.
+run_pipeline writes every stage to a JSON run report next to the outputs.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional
+
+try:
+	import resource
+except ImportError:  # Windows
+	resource = None
+
+REPORT_NAME = 'pipeline_run_report.json'
+REPORT_FORMAT = 1
+
+
+@dataclass
+class StageMetrics:
+	stage: str
+	wall_seconds: float = 0.0
+	cpu_seconds: float = 0.0
+	rows: Optional[int] = None
+	rows_per_second: Optional[float] = None
+	# High-water mark of the process that ran the stage (a pool worker with --workers > 1)
+	peak_rss_mb: Optional[float] = None
+	read_seconds: float = 0.0
+	pandas_seconds: float = 0.0
+	pid: int = 0
+	profile: Optional[str] = None
+
+
+def peak_rss_mb() -> Optional[float]:
+	"""Peak resident set size of this process so far, or None where the platform does not report it."""
+	if resource is None:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Kilobytes on Linux, bytes on macOS
+	return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+@contextmanager
+def measure(stage: str, profile_dir: Optional[str] = None) -> Iterator[StageMetrics]:
+	"""Time the body as one stage; the body sets rows and read_seconds on the yielded metrics."""
+	metrics = StageMetrics(stage, pid=os.getpid())
+	profiler = cProfile.Profile() if profile_dir else None
+	wall, cpu = time.perf_counter(), time.process_time()
+	if profiler is not None:
+		profiler.enable()
+	try:
+		yield metrics
+	finally:
+		if profiler is not None:
+			profiler.disable()
+		metrics.wall_seconds = time.perf_counter() - wall
+		metrics.cpu_seconds = time.process_time() - cpu
+		metrics.pandas_seconds = max(metrics.wall_seconds - metrics.read_seconds, 0.0)
+		if metrics.rows is not None and metrics.wall_seconds > 0:
+			metrics.rows_per_second = metrics.rows / metrics.wall_seconds
+		metrics.peak_rss_mb = peak_rss_mb()
+		if profiler is not None:
+			os.makedirs(profile_dir, exist_ok=True)
+			metrics.profile = os.path.join(profile_dir, f"{stage}.prof")
+			profiler.dump_stats(metrics.profile)
+
+
+def write_run_report(out_dir: str, stages: List[StageMetrics], **run) -> str:
+	"""Write the run report (run-level fields plus one entry per stage); returns its path."""
+	report = {'report_format': REPORT_FORMAT, **run, 'stages': [asdict(s) for s in stages]}
+	path = os.path.join(out_dir, REPORT_NAME)
+	with open(path, 'w', encoding='utf-8') as fh:
+		json.dump(report, fh, indent=2, default=str)
+	return path
+
+
+__all__ = ["StageMetrics", "measure", "peak_rss_mb", "write_run_report", "REPORT_NAME"]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Declarative QA rules for the normalized tables.
+A Rule is plain data: the table it applies to, the columns it reads and one of
+four kinds. Each rule states what a valid row looks like:
+- range:      every present value of each column lies within [low, high]
+- sum:        when all columns are present, their sum lies within [low, high]
+- at_most:    column <= ref + tolerance, where ref is a column of the same table
+              ('im') or a collar column looked up by hole_id ('collars.total_depth')
+- references: every present value of the column is in ref ('seam_codes.seam_id')
+
+evaluate_rules runs all rules of a table in one pass over it: every column the
+rules read is converted to a float64 array once, every lookup is resolved once,
+and each rule is a vectorized numpy expression over those arrays. Adding a rule
+adds an expression, not another scan of the frame. Missing values never violate
+a rule; the validator checks presence separately.
+
+DEFAULT_RULES holds the assay bounds of the SQL Server CHECK constraints, the
+proximate closure (TM + Ash + VM + FC), RD/HGI plausibility, the seam foreign
+keys and depths against the collar's total depth.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .schema import widen_float32
+
+RULE_KINDS = ('range', 'sum', 'at_most', 'references')
+
+# First columns of every rule's issue rows, where the table has them
+ID_COLUMNS = {
+	'collars': ['collar_id', 'hole_id'],
+	'lithology_logs': ['log_id', 'hole_id'],
+	'sample_analyses': ['sample_id', 'hole_id', 'sample_no'],
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+	name: str
+	table: str
+	kind: str
+	columns: Tuple[str, ...]
+	low: Optional[float] = None
+	high: Optional[float] = None
+	ref: Optional[str] = None
+	tolerance: float = 0.0
+
+
+@dataclass
+class RuleResult:
+	rule: Rule
+	violations: int
+	# Offending rows: id columns, the columns read and the looked-up or summed value; None when there are none
+	issues: Optional[pd.DataFrame] = None
+	# Set when the table lacks a column the rule reads; the rule is then not evaluated
+	skipped: Optional[str] = None
+
+
+def _ref(rule: Rule) -> Tuple[Optional[str], str]:
+	"""(lookup table or None for the rule's own table, column) of rule.ref."""
+	table, _, column = rule.ref.rpartition('.')
+	return (table or None), column
+
+
+def _assays_within(low: float, high: float, *columns: str) -> List[Rule]:
+	return [
+		Rule(f"sample_analyses.{c} between {low:g} and {high:g}", 'sample_analyses', 'range', (c,), low, high)
+		for c in columns
+	]
+
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+	# Percent assays: the CK_sample_analyses_* constraints of the SQL Server schema
+	*_assays_within(0, 100, 'im', 'tm', 'ash', 'vm', 'fc'),
+	*_assays_within(0, 15, 'sulphur'),
+	# Proximate analysis closes to 100% on the as-received (total moisture) basis
+	Rule("sample_analyses tm+ash+vm+fc between 99 and 101", 'sample_analyses', 'sum',
+	     ('tm', 'ash', 'vm', 'fc'), 99.0, 101.0),
+	# Total moisture includes inherent moisture
+	Rule("sample_analyses.im <= tm", 'sample_analyses', 'at_most', ('im',), ref='tm'),
+	*_assays_within(1.0, 3.0, 'rd'),
+	*_assays_within(20, 120, 'hgi'),
+	Rule("sample_analyses.seam_quality_id references seam_codes_lookup.seam_id", 'sample_analyses',
+	     'references', ('seam_quality_id',), ref='seam_codes.seam_id'),
+	Rule("sample_analyses.seam_73_id references seam_codes_lookup.seam_id", 'sample_analyses',
+	     'references', ('seam_73_id',), ref='seam_codes.seam_id'),
+	Rule("lithology_logs.depth_to <= collars.total_depth", 'lithology_logs', 'at_most',
+	     ('depth_to',), ref='collars.total_depth', tolerance=1e-9),
+	Rule("sample_analyses.depth_to <= collars.total_depth", 'sample_analyses', 'at_most',
+	     ('depth_to',), ref='collars.total_depth', tolerance=1e-9),
+)
+
+
+def rule_columns(rules: Sequence[Rule], table: str) -> List[str]:
+	"""Columns of table that the rules read, own rules and lookups into it, in first-use order."""
+	out: List[str] = []
+	for rule in rules:
+		used: List[str] = []
+		if rule.table == table:
+			used += ID_COLUMNS.get(table, []) + list(rule.columns)
+			if rule.ref is not None and _ref(rule)[0] is None:
+				used.append(_ref(rule)[1])
+		if rule.ref is not None and _ref(rule)[0] == table:
+			used += ['hole_id', _ref(rule)[1]] if rule.kind == 'at_most' else [_ref(rule)[1]]
+		out += [c for c in used if c not in out]
+	return out
+
+
+def _floats(col: pd.Series) -> np.ndarray:
+	if col.dtype == np.float32:
+		# Decimal float64 values, so sums and comparisons match the text
+		col = widen_float32(col)
+	elif not pd.api.types.is_numeric_dtype(col.dtype):
+		col = pd.to_numeric(col.astype(object), errors='coerce')
+	return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _by_hole(hole_ids: pd.Series, ref: pd.DataFrame, column: str) -> np.ndarray:
+	"""ref[column] of each row's hole (first ref row per hole); NaN for holes ref does not have."""
+	keyed = ref.dropna(subset=['hole_id']).drop_duplicates('hole_id')
+	index = pd.Index(keyed['hole_id'].astype(str))
+	values = _floats(keyed[column])
+	holes = hole_ids.astype('category')
+	pos = index.get_indexer(holes.cat.categories.astype(str))
+	# Code -1 (no hole_id) picks the trailing NaN
+	per_hole = np.append(np.where(pos >= 0, values[np.maximum(pos, 0)], np.nan), np.nan)
+	return per_hole[holes.cat.codes.to_numpy()]
+
+
+def _missing(rule: Rule, tables: Dict[str, pd.DataFrame]) -> Optional[str]:
+	need = [(rule.table, c) for c in rule.columns]
+	if rule.ref is not None:
+		table, column = _ref(rule)
+		need.append((table or rule.table, column))
+		if table is not None and rule.kind == 'at_most':
+			need.append((rule.table, 'hole_id'))
+			need.append((table, 'hole_id'))
+	for table, column in need:
+		if table not in tables or column not in tables[table].columns:
+			return f"{table}.{column}"
+	return None
+
+
+def evaluate_rules(tables: Dict[str, pd.DataFrame], rules: Sequence[Rule] = DEFAULT_RULES) -> List[RuleResult]:
+	"""Evaluate the rules whose table is in tables; results in rule order."""
+	for rule in rules:
+		if rule.kind not in RULE_KINDS:
+			raise ValueError(f"Rule {rule.name!r}: unknown kind {rule.kind!r}")
+	results: Dict[int, RuleResult] = {}
+	for table in dict.fromkeys(r.table for r in rules):
+		if table not in tables:
+			continue
+		df = tables[table]
+		values: Dict[str, np.ndarray] = {}
+		lookups: Dict[str, np.ndarray] = {}
+
+		def column(name: str) -> np.ndarray:
+			if name not in values:
+				values[name] = _floats(df[name])
+			return values[name]
+
+		def reference(rule: Rule) -> np.ndarray:
+			ref_table, ref_column = _ref(rule)
+			if ref_table is None:
+				return column(ref_column)
+			if rule.ref not in lookups:
+				lookups[rule.ref] = _by_hole(df['hole_id'], tables[ref_table], ref_column)
+			return lookups[rule.ref]
+
+		for i, rule in enumerate(rules):
+			if rule.table != table:
+				continue
+			missing = _missing(rule, tables)
+			if missing is not None:
+				results[i] = RuleResult(rule, 0, skipped=f"skipped: no column {missing}")
+				continue
+			extra: Dict[str, np.ndarray] = {}
+			if rule.kind == 'range':
+				bad = np.zeros(len(df), dtype=bool)
+				for c in rule.columns:
+					v = column(c)
+					bad |= (v < rule.low) | (v > rule.high)
+			elif rule.kind == 'sum':
+				total = np.sum([column(c) for c in rule.columns], axis=0) if len(df) else np.zeros(0)
+				# NaN when any part is missing, and NaN never compares as a violation
+				bad = (total < rule.low) | (total > rule.high)
+				extra['total'] = total.round(6)
+			elif rule.kind == 'at_most':
+				ref = reference(rule)
+				bad = column(rule.columns[0]) > ref + rule.tolerance
+				if _ref(rule)[0] is not None:
+					extra[rule.ref] = ref
+			else:
+				ref_table, ref_column = _ref(rule)
+				col = df[rule.columns[0]]
+				allowed = tables[ref_table][ref_column].dropna().unique()
+				bad = (col.notna() & ~col.isin(allowed)).to_numpy(dtype=bool)
+			rows = np.flatnonzero(bad)
+			issues = None
+			if len(rows):
+				own = [c for c in ID_COLUMNS.get(table, []) if c in df.columns]
+				own += [c for c in rule.columns if c not in own]
+				if rule.kind == 'at_most' and _ref(rule)[0] is None and _ref(rule)[1] not in own:
+					own.append(_ref(rule)[1])
+				issues = df[own].iloc[rows].reset_index(drop=True)
+				for name, arr in extra.items():
+					issues[name] = arr[rows]
+			results[i] = RuleResult(rule, len(rows), issues)
+	return [results[i] for i in sorted(results)]
+
+
+__all__ = ["Rule", "RuleResult", "DEFAULT_RULES", "RULE_KINDS", "evaluate_rules", "rule_columns"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Small task-graph executor for the pipeline.
+Each Task names the tasks it depends on; their return values are passed to it
+as keyword arguments. With workers > 1 independent tasks run concurrently in a
+process pool, so task functions and their arguments must be picklable
+(module-level functions); executor='thread' uses a thread pool instead, for
+I/O-bound tasks that share objects such as database connections. Results always
+come back in declaration order.
+"""
+
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Task:
+	name: str
+	fn: Callable[..., Any]
+	args: Tuple[Any, ...] = ()
+	deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class TaskResult:
+	name: str
+	ok: bool
+	value: Any = None
+	error: Optional[str] = None
+	seconds: float = 0.0
+
+
+class TaskGraphError(RuntimeError):
+	"""Raised after a run in which at least one task failed or was skipped."""
+
+	def __init__(self, results: List[TaskResult]):
+		self.results = results
+		failed = [r for r in results if not r.ok]
+		lines = [f"{r.name}: {(r.error or '').strip().splitlines()[-1] if r.error else 'failed'}" for r in failed]
+		super().__init__(f"{len(failed)} task(s) failed:\n  " + "\n  ".join(lines))
+
+
+@dataclass
+class _Outcome:
+	ok: bool
+	value: Any = None
+	error: Optional[str] = None
+	seconds: float = 0.0
+
+
+def _call(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> _Outcome:
+	start = time.perf_counter()
+	try:
+		value = fn(*args, **kwargs)
+	except Exception:
+		return _Outcome(False, error=traceback.format_exc(), seconds=time.perf_counter() - start)
+	return _Outcome(True, value=value, seconds=time.perf_counter() - start)
+
+
+def _check_graph(tasks: List[Task]) -> None:
+	names = [t.name for t in tasks]
+	if len(set(names)) != len(names):
+		raise ValueError(f"duplicate task names in {names}")
+	known = set(names)
+	for t in tasks:
+		missing = [d for d in t.deps if d not in known]
+		if missing:
+			raise ValueError(f"task {t.name!r} depends on unknown task(s) {missing}")
+	# Kahn's algorithm only to reject cycles; execution order is decided at run time
+	remaining = {t.name: set(t.deps) for t in tasks}
+	while remaining:
+		ready = [n for n, deps in remaining.items() if not deps]
+		if not ready:
+			raise ValueError(f"dependency cycle among {sorted(remaining)}")
+		for n in ready:
+			del remaining[n]
+		for deps in remaining.values():
+			deps.difference_update(ready)
+
+
+EXECUTORS = {'process': ProcessPoolExecutor, 'thread': ThreadPoolExecutor}
+
+
+def run_tasks(tasks: List[Task], workers: int = 1, executor: str = 'process') -> List[TaskResult]:
+	"""Run tasks respecting deps; a task whose dependency failed is skipped and reported as failed."""
+	if executor not in EXECUTORS:
+		raise ValueError(f"unknown executor {executor!r}; expected one of {sorted(EXECUTORS)}")
+	_check_graph(tasks)
+	by_name = {t.name: t for t in tasks}
+	outcomes: Dict[str, _Outcome] = {}
+	pending = [t.name for t in tasks]
+
+	def ready_tasks() -> List[Task]:
+		return [by_name[n] for n in pending if all(d in outcomes for d in by_name[n].deps)]
+
+	def skip_if_blocked(task: Task) -> bool:
+		failed = [d for d in task.deps if not outcomes[d].ok]
+		if failed:
+			outcomes[task.name] = _Outcome(False, error=f"skipped: dependency {', '.join(failed)} failed")
+			pending.remove(task.name)
+		return bool(failed)
+
+	if workers <= 1:
+		while pending:
+			for task in ready_tasks():
+				if skip_if_blocked(task):
+					continue
+				outcomes[task.name] = _call(task.fn, task.args, {d: outcomes[d].value for d in task.deps})
+				pending.remove(task.name)
+	else:
+		with EXECUTORS[executor](max_workers=workers) as pool:
+			running: Dict[Future, str] = {}
+			while pending or running:
+				for task in ready_tasks():
+					if task.name in running.values() or skip_if_blocked(task):
+						continue
+					kwargs = {d: outcomes[d].value for d in task.deps}
+					running[pool.submit(_call, task.fn, task.args, kwargs)] = task.name
+				if not running:
+					continue
+				done, _ = wait(running, return_when=FIRST_COMPLETED)
+				for future in done:
+					name = running.pop(future)
+					try:
+						outcomes[name] = future.result()
+					except Exception:
+						# The worker itself died or the result could not be pickled
+						outcomes[name] = _Outcome(False, error=traceback.format_exc())
+					pending.remove(name)
+
+	return [
+		TaskResult(name, outcomes[name].ok, outcomes[name].value, outcomes[name].error, outcomes[name].seconds)
+		for name in (t.name for t in tasks)
+	]
+
+
+__all__ = ["Task", "TaskResult", "TaskGraphError", "run_tasks"]
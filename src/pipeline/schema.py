@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Typed schema of the normalized tables and CSV/Parquet table I/O.
+CSV stays the default output. With fmt='parquet' each table is cast to the
+dtypes below before writing (nullable Int64 keys and codes, float64 depths and
+assays, categorical hole_id/system_id, datetime64 timestamps), so readers get
+the types back without re-parsing text. Parquet needs pyarrow.
+
+COMPACT_DTYPES is the smaller in-memory profile the extractors return and the
+validator reads into: categorical ids and codes, float32 depths and assays,
+small nullable ints. A column only becomes float32 when every value has at most
+6 significant digits, which float32 holds exactly at the decimal level, so CSV
+output does not change; widen_float32 gets the float64 decimals back.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+_TEXT = 'string'
+_TIMESTAMP = 'datetime64[ns]'
+
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+	'seam_codes': {
+		'seam_id': 'Int64', 'system_id': 'category', 'system_name': _TEXT, 'seam_label': _TEXT,
+		'seam_code': 'Int64', 'priority': 'Int64', 'description': _TEXT, 'created_at': _TIMESTAMP,
+	},
+	'rock_types': {
+		'rock_code': 'Int64', 'lithology': _TEXT, 'detail': _TEXT, 'created_at': _TIMESTAMP,
+	},
+	'collars': {
+		'collar_id': 'Int64', 'hole_id': 'category', 'easting': 'float64', 'northing': 'float64',
+		'elevation': 'float64', 'total_depth': 'float64', 'dip': 'float64', 'year_drilled': 'Int64',
+		'azimuth': 'float64', 'contractor': _TEXT, 'geologist': _TEXT, 'block_no': _TEXT,
+		'dh_version': 'float64', 'remarks': _TEXT, 'created_at': _TIMESTAMP, 'updated_at': _TIMESTAMP,
+	},
+	'lithology_logs': {
+		'log_id': 'Int64', 'hole_id': 'category', 'depth_from': 'float64', 'depth_to': 'float64',
+		'rock_code': 'Int64', 'description': _TEXT, 'created_at': _TIMESTAMP,
+	},
+	'sample_analyses': {
+		'sample_id': 'Int64', 'hole_id': 'category', 'depth_from': 'float64', 'depth_to': 'float64',
+		'sample_no': _TEXT, 'im': 'float64', 'tm': 'float64', 'ash': 'float64', 'vm': 'float64',
+		'fc': 'float64', 'sulphur': 'float64', 'gross_cv': 'float64', 'net_cv': 'float64', 'sg': 'float64',
+		'rd': 'float64', 'hgi': 'float64', 'seam_quality_id': 'Int64', 'seam_73_id': 'Int64',
+		'seam_code_quality_original': _TEXT, 'analysis_date': _TIMESTAMP, 'lab_name': _TEXT, 'remarks': _TEXT,
+		'created_at': _TIMESTAMP, 'updated_at': _TIMESTAMP,
+	},
+}
+
+_FLOAT32 = 'float32'
+_SMALL_INT = 'Int16'
+
+COMPACT_DTYPES: Dict[str, Dict[str, str]] = {
+	'seam_codes': {'system_id': 'category', 'system_name': 'category', 'seam_code': _SMALL_INT, 'priority': _SMALL_INT},
+	'rock_types': {'rock_code': _SMALL_INT, 'lithology': 'category'},
+	'collars': {'hole_id': 'category', 'elevation': _FLOAT32, 'total_depth': _FLOAT32},
+	'lithology_logs': {
+		'hole_id': 'category', 'depth_from': _FLOAT32, 'depth_to': _FLOAT32, 'rock_code': _SMALL_INT,
+		'description': 'category',
+	},
+	'sample_analyses': {
+		'hole_id': 'category', 'depth_from': _FLOAT32, 'depth_to': _FLOAT32,
+		**{c: _FLOAT32 for c in ('im', 'tm', 'ash', 'vm', 'fc', 'sulphur', 'gross_cv', 'net_cv', 'sg', 'rd', 'hgi')},
+		'seam_quality_id': _SMALL_INT, 'seam_73_id': _SMALL_INT,
+	},
+}
+
+# Columns compared with each other; they are float32 together or not at all
+_COMPARED_COLUMNS = ('depth_from', 'depth_to')
+
+# Output file stem per table, shared by every format
+TABLE_FILES: Dict[str, str] = {
+	'seam_codes': 'seam_codes_lookup',
+	'rock_types': 'rock_types',
+	'collars': 'collars',
+	'lithology_logs': 'lithology_logs',
+	'sample_analyses': 'sample_analyses',
+}
+
+
+def table_filename(name: str, fmt: str = 'csv') -> str:
+	if fmt not in OUTPUT_FORMATS:
+		raise ValueError(f"unknown output format {fmt!r}; expected one of {OUTPUT_FORMATS}")
+	return f"{TABLE_FILES[name]}.{fmt}"
+
+
+def _significant_scale(values: np.ndarray) -> np.ndarray:
+	# 10**k such that values * 10**k has 6 digits before the decimal point
+	return 10.0 ** (5 - np.floor(np.log10(np.abs(values))))
+
+
+def fits_float32(values: np.ndarray) -> bool:
+	"""True when every finite value has at most 6 significant digits (float32 then round-trips its decimal text)."""
+	v = values[np.isfinite(values) & (values != 0)]
+	if not len(v):
+		return True
+	scale = _significant_scale(v)
+	with np.errstate(over='ignore', invalid='ignore'):
+		return bool((np.round(v * scale) / scale == v).all())
+
+
+def widen_float32(col: pd.Series) -> pd.Series:
+	"""float64 copy of a compact float32 column with each decimal restored (4.45, not 4.449999809)."""
+	if col.dtype != np.float32:
+		return col
+	v = col.to_numpy(dtype=np.float64)
+	nz = np.isfinite(v) & (v != 0)
+	scale = _significant_scale(v[nz])
+	v[nz] = np.round(v[nz] * scale) / scale
+	return pd.Series(v, index=col.index, name=col.name)
+
+
+def _small_int(values: pd.Series) -> pd.Series:
+	# Smallest nullable int holding every value; fractional values are left alone
+	numeric = pd.to_numeric(values, errors='coerce')
+	present = numeric.dropna().to_numpy(dtype=np.float64)
+	if (present != np.trunc(present)).any():
+		return numeric
+	for dtype, info in (('Int16', np.iinfo(np.int16)), ('Int32', np.iinfo(np.int32))):
+		if not len(present) or (present.min() >= info.min and present.max() <= info.max):
+			return numeric.astype(dtype)
+	return numeric.astype('Int64')
+
+
+def compact_table(name: str, df: pd.DataFrame) -> pd.DataFrame:
+	"""Cast a table to COMPACT_DTYPES; columns not in the profile, or absent, are left as they are."""
+	out = df.copy(deep=False)
+	for column, dtype in COMPACT_DTYPES.get(name, {}).items():
+		if column not in out.columns:
+			continue
+		col = out[column]
+		if dtype == 'category':
+			if not isinstance(col.dtype, pd.CategoricalDtype):
+				out[column] = col.astype('category')
+		elif dtype == _FLOAT32:
+			if col.dtype != np.float32:
+				values = pd.to_numeric(col, errors='coerce').astype('float64')
+				out[column] = values.astype(np.float32) if fits_float32(values.to_numpy()) else values
+		else:
+			out[column] = _small_int(col)
+	compared = [c for c in _COMPARED_COLUMNS if c in out.columns]
+	if len({out[c].dtype for c in compared}) > 1:
+		out = out.assign(**{c: widen_float32(out[c]) for c in compared})
+	return out
+
+
+def widen_table(df: pd.DataFrame) -> pd.DataFrame:
+	"""Undo the float32 part of the compact profile, e.g. before concatenating with float64 frames."""
+	columns = [c for c in df.columns if df[c].dtype == np.float32]
+	if not columns:
+		return df
+	out = df.copy(deep=False)
+	for column in columns:
+		out[column] = widen_float32(out[column])
+	return out
+
+
+def align_float32(frames: Iterable[pd.DataFrame], columns: Iterable[str]) -> List[pd.DataFrame]:
+	"""Frames whose shared columns compare exactly: a column that is float64 in any frame is widened in all."""
+	frames = list(frames)
+	for column in columns:
+		compact = [df[column].dtype == np.float32 for df in frames if column in df.columns]
+		if any(compact) and not all(compact):
+			frames = [df.assign(**{column: widen_float32(df[column])}) if column in df.columns else df
+					  for df in frames]
+	return frames
+
+
+def _cast(col: pd.Series, dtype: str) -> pd.Series:
+	if dtype == 'Int64':
+		return pd.to_numeric(col, errors='coerce').astype('Int64')
+	if dtype == 'float64':
+		return pd.to_numeric(widen_float32(col), errors='coerce').astype('float64')
+	if dtype == _TIMESTAMP:
+		return pd.to_datetime(col, errors='coerce').astype(_TIMESTAMP)
+	if dtype == 'category':
+		return col.astype(_TEXT).astype('category')
+	return col.astype(_TEXT)
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+	"""Cast a table to its declared dtypes; columns the table lacks are added as nulls, extra columns kept last."""
+	schema = TABLE_SCHEMAS[name]
+	out = pd.DataFrame(index=df.index)
+	for column, dtype in schema.items():
+		values = df[column] if column in df.columns else pd.Series(None, index=df.index, dtype=object)
+		out[column] = _cast(values, dtype)
+	extra: List[str] = [c for c in df.columns if c not in schema]
+	return pd.concat([out, df[extra]], axis=1) if extra else out
+
+
+def write_table(df: pd.DataFrame, out_dir: str, name: str, fmt: str = 'csv') -> str:
+	"""Write one normalized table; returns the path written."""
+	path = os.path.join(out_dir, table_filename(name, fmt))
+	if fmt == 'parquet':
+		apply_schema(name, df).to_parquet(path, index=False)
+	else:
+		df.to_csv(path, index=False)
+	return path
+
+
+def table_format(data_dir: str, fmt: str = 'auto') -> str:
+	"""Resolve 'auto' to parquet when every table has a Parquet file in data_dir, else csv."""
+	if fmt != 'auto':
+		return fmt
+	has_parquet = all(os.path.exists(os.path.join(data_dir, table_filename(n, 'parquet'))) for n in TABLE_SCHEMAS)
+	return 'parquet' if has_parquet else 'csv'
+
+
+def read_table(data_dir: str, name: str, fmt: str = 'csv') -> pd.DataFrame:
+	"""Read a normalized table; Parquet comes back typed, CSV with the usual null markers."""
+	path = os.path.join(data_dir, table_filename(name, fmt))
+	if fmt == 'parquet':
+		return pd.read_parquet(path)
+	return pd.read_csv(path, keep_default_na=True, na_values=["", " ", "NA", "NaN", "nan"])
+
+
+__all__ = [
+	"OUTPUT_FORMATS", "TABLE_SCHEMAS", "TABLE_FILES", "COMPACT_DTYPES", "table_filename", "apply_schema",
+	"compact_table", "widen_table", "widen_float32", "align_float32", "fits_float32", "write_table", "table_format",
+	"read_table",
+]
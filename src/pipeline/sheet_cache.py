@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of parsed worksheets.
+A WorkbookSession given a SheetCache looks each sheet up by (workbook content
+hash, sheet name) before opening the workbook, so a warm run never touches
+openpyxl. Sheets are stored column by column in an .npz file: per column an int8
+type tag per cell plus one typed array per value type (int64, float64, bool,
+UTF-8 bytes with offsets, datetimes as int64 microseconds). Rows read back are
+the same Python values openpyxl produced, so extractor output does not change.
+When the cache grows past max_bytes the least recently used files are removed.
+"""
+
+import hashlib
+import os
+import zipfile
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .workbook import Row
+
+# Bump when the file layout changes; older files are then ignored
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = 'data/cache/sheets'
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Per-cell type tags
+_ABSENT, _NONE, _BOOL, _INT, _FLOAT, _STR, _DATETIME, _TIME = range(8)
+_EPOCH = datetime(1970, 1, 1)
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class _Missing:
+	"""Padding for rows shorter than the widest row."""
+
+
+_MISSING = _Missing()
+
+
+class _Unsupported(Exception):
+	"""A cell type the cache cannot store exactly; the sheet is then not cached."""
+
+
+def _encode_column(values: List[object]) -> Dict[str, np.ndarray]:
+	tags = np.empty(len(values), dtype=np.int8)
+	ints: List[int] = []
+	floats: List[float] = []
+	bools: List[bool] = []
+	strs: List[bytes] = []
+	stamps: List[int] = []
+	times: List[int] = []
+	for i, v in enumerate(values):
+		t = type(v)
+		if v is _MISSING:
+			tags[i] = _ABSENT
+		elif v is None:
+			tags[i] = _NONE
+		elif t is bool:
+			tags[i] = _BOOL
+			bools.append(v)
+		elif t is int:
+			if not _INT64_MIN <= v <= _INT64_MAX:
+				raise _Unsupported(v)
+			tags[i] = _INT
+			ints.append(v)
+		elif t is float:
+			tags[i] = _FLOAT
+			floats.append(v)
+		elif t is str:
+			tags[i] = _STR
+			strs.append(v.encode('utf-8'))
+		elif t is datetime and v.tzinfo is None:
+			tags[i] = _DATETIME
+			stamps.append((v - _EPOCH) // timedelta(microseconds=1))
+		elif t is time and v.tzinfo is None:
+			tags[i] = _TIME
+			times.append(((v.hour * 60 + v.minute) * 60 + v.second) * 1_000_000 + v.microsecond)
+		else:
+			raise _Unsupported(type(v))
+	offsets = np.zeros(len(strs) + 1, dtype=np.int64)
+	np.cumsum([len(b) for b in strs], out=offsets[1:])
+	return {
+		'tags': tags,
+		'ints': np.array(ints, dtype=np.int64),
+		'floats': np.array(floats, dtype=np.float64),
+		'bools': np.array(bools, dtype=bool),
+		'str_data': np.frombuffer(b''.join(strs), dtype=np.uint8),
+		'str_offsets': offsets,
+		'stamps': np.array(stamps, dtype=np.int64),
+		'times': np.array(times, dtype=np.int64),
+	}
+
+
+def _decode_column(arrays: Dict[str, np.ndarray]) -> List[object]:
+	tags = arrays['tags']
+	out = np.full(len(tags), None, dtype=object)
+	if (tags == _ABSENT).any():
+		out[tags == _ABSENT] = _MISSING
+	for tag, key in ((_BOOL, 'bools'), (_INT, 'ints'), (_FLOAT, 'floats')):
+		mask = tags == tag
+		if mask.any():
+			# tolist() yields Python bool/int/float, as openpyxl does
+			out[mask] = arrays[key].tolist()
+	mask = tags == _STR
+	if mask.any():
+		data = arrays['str_data'].tobytes()
+		offsets = arrays['str_offsets'].tolist()
+		out[mask] = [data[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+	mask = tags == _DATETIME
+	if mask.any():
+		out[mask] = [_EPOCH + timedelta(microseconds=us) for us in arrays['stamps'].tolist()]
+	mask = tags == _TIME
+	if mask.any():
+		out[mask] = [
+			time(us // 3_600_000_000, us // 60_000_000 % 60, us // 1_000_000 % 60, us % 1_000_000)
+			for us in arrays['times'].tolist()
+		]
+	return out.tolist()
+
+
+def encode_rows(rows: List[Row]) -> Dict[str, np.ndarray]:
+	"""Columnar arrays for a list of row tuples; raises _Unsupported for cells that cannot round-trip."""
+	lengths = np.array([len(r) for r in rows], dtype=np.int64)
+	width = int(lengths.max()) if len(rows) else 0
+	padded = [r if len(r) == width else tuple(r) + (_MISSING,) * (width - len(r)) for r in rows]
+	arrays: Dict[str, np.ndarray] = {'row_lengths': lengths}
+	for j, values in enumerate(zip(*padded)):
+		for key, arr in _encode_column(list(values)).items():
+			arrays[f"c{j}_{key}"] = arr
+	return arrays
+
+
+def decode_rows(arrays: Dict[str, np.ndarray]) -> List[Row]:
+	lengths = arrays['row_lengths']
+	width = int(lengths.max()) if len(lengths) else 0
+	columns = [
+		_decode_column({key: arrays[f"c{j}_{key}"] for key in ('tags', 'ints', 'floats', 'bools', 'str_data',
+																 'str_offsets', 'stamps', 'times')})
+		for j in range(width)
+	]
+	rows = list(zip(*columns)) if width else [() for _ in range(len(lengths))]
+	if (lengths != width).any():
+		rows = [row[:n] for row, n in zip(rows, lengths.tolist())]
+	return rows
+
+
+class SheetCache:
+	"""Directory of cached sheets with a total size limit; safe to share between processes."""
+
+	def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+		self.cache_dir = cache_dir
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+
+	def _path(self, workbook_hash: str, sheet: str) -> str:
+		sheet_key = hashlib.sha256(sheet.encode('utf-8')).hexdigest()[:16]
+		return os.path.join(self.cache_dir, f"{workbook_hash}-{sheet_key}-v{CACHE_FORMAT}.npz")
+
+	def load(self, workbook_hash: str, sheet: str) -> Optional[List[Row]]:
+		path = self._path(workbook_hash, sheet)
+		try:
+			with np.load(path, allow_pickle=False) as npz:
+				if str(npz['sheet']) != sheet:
+					self.misses += 1
+					return None
+				rows = decode_rows({k: npz[k] for k in npz.files if k != 'sheet'})
+			os.utime(path)  # recency for LRU eviction
+		except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+			self.misses += 1
+			return None
+		self.hits += 1
+		return rows
+
+	def store(self, workbook_hash: str, sheet: str, rows: List[Row]) -> bool:
+		"""Cache rows of one sheet; returns False when a cell type cannot be stored exactly."""
+		try:
+			arrays = encode_rows(rows)
+		except _Unsupported:
+			return False
+		os.makedirs(self.cache_dir, exist_ok=True)
+		path = self._path(workbook_hash, sheet)
+		tmp = f"{path}.{os.getpid()}.tmp"
+		with open(tmp, 'wb') as fh:
+			np.savez(fh, sheet=np.array(sheet), **arrays)
+		os.replace(tmp, path)
+		self.evict()
+		return True
+
+	def evict(self) -> None:
+		"""Remove least recently used files until the cache fits in max_bytes."""
+		try:
+			entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.npz')]
+		except OSError:
+			return
+		stats = []
+		for e in entries:
+			try:
+				st = e.stat()
+			except OSError:
+				continue
+			stats.append((st.st_mtime, st.st_size, e.path))
+		total = sum(size for _, size, _ in stats)
+		for _, size, path in sorted(stats):
+			if total <= self.max_bytes:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			total -= size
+
+
+__all__ = ["SheetCache", "encode_rows", "decode_rows", "DEFAULT_CACHE_DIR", "DEFAULT_MAX_BYTES", "CACHE_FORMAT"]
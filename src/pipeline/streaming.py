@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming extraction of DAT201 for workbooks too large to hold in memory.
+DAT201 is read once in openpyxl read-only mode and pushed through generator
+stages (rows -> fixed-size chunks -> per-table frames -> CSV append), so peak
+memory is bounded by chunk_size instead of the sheet length.
+Outputs lithology_logs.csv, sample_analyses.csv and collars.csv with the same
+columns as the in-memory extractors, except:
+- lithology_logs keeps sheet order (log_id is not renumbered after a
+  hole_id/depth_from sort); DH70.xlsx is already ordered that way
+"""
+
+import os
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .extract_collars import COLLAR_FIELD_CANDIDATES, HEADER_SCAN_ROWS, build_collars, hole_id_guess_for_row
+from .extract_lithology_logs import LITHOLOGY_COLUMNS, build_lithology_logs
+from .extract_sample_analyses import SAMPLE_COLUMNS, build_sample_analyses
+from .workbook import Row, iter_sheet_rows
+
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def iter_row_chunks(rows: Iterable[Row], width: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Row]]:
+	"""Group rows into lists of at most chunk_size, padded/truncated to width columns."""
+	batch: List[Row] = []
+	for row in rows:
+		if len(row) < width:
+			row = tuple(row) + (None,) * (width - len(row))
+		elif len(row) > width:
+			row = row[:width]
+		batch.append(row)
+		if len(batch) >= chunk_size:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+class ChunkedCsvWriter:
+	"""Writes frames to one CSV file, header on the first chunk and appends afterwards."""
+
+	def __init__(self, path: str, columns: List[str]):
+		self.path = path
+		self.columns = columns
+		self.rows_written = 0
+		self._started = False
+
+	def write(self, df: pd.DataFrame) -> None:
+		df.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+		self._started = True
+		self.rows_written += len(df)
+
+	def close(self) -> None:
+		# Always leave a file with a header, even when no rows were produced
+		if not self._started:
+			self.write(pd.DataFrame(columns=self.columns))
+
+
+class CollarRowReducer:
+	"""Keeps only the DAT201 rows build_collars reads, so collars need no full sheet.
+	Per hole: the first HEADER_SCAN_ROWS rows, plus any later row holding the first
+	non-null value of a candidate collar column; and the first row of every hole-id
+	guess used by the positional B/C/D/G/Z/AA/AG/AH lookup.
+	"""
+
+	def __init__(self, header: Row):
+		self.header = header
+		self._dhid_idx: Optional[int] = header.index('DHID') if 'DHID' in header else None
+		candidates = {c for cols in COLLAR_FIELD_CANDIDATES.values() for c in cols}
+		self._candidate_idx = [i for i, name in enumerate(header) if name in candidates]
+		self._kept: List[Row] = []
+		self._row_counts: Dict[object, int] = {}
+		self._seen_values: Dict[object, set] = {}
+		self._seen_guesses = {hole_id_guess_for_row(header, self._dhid_idx)}
+
+	@staticmethod
+	def _is_null(v) -> bool:
+		return v is None or (isinstance(v, float) and v != v)
+
+	def feed(self, rows: Iterable[Row]) -> None:
+		for row in rows:
+			keep = False
+			guess = hole_id_guess_for_row(row, self._dhid_idx)
+			if guess is not None and guess not in self._seen_guesses:
+				self._seen_guesses.add(guess)
+				keep = True
+			hole = row[self._dhid_idx] if self._dhid_idx is not None else None
+			if not self._is_null(hole):
+				count = self._row_counts.get(hole, 0)
+				self._row_counts[hole] = count + 1
+				seen = self._seen_values.setdefault(hole, set())
+				for i in self._candidate_idx:
+					if i not in seen and not self._is_null(row[i]):
+						seen.add(i)
+						keep = True
+				if count < HEADER_SCAN_ROWS:
+					keep = True
+			if keep:
+				self._kept.append(row)
+
+	def rows(self) -> List[Row]:
+		return [self.header] + self._kept
+
+
+def stream_dat201(excel_path: str, out_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+				  engine: str = 'openpyxl', created_at: Optional[datetime] = None) -> Dict[str, int]:
+	"""Extract collars, lithology_logs and sample_analyses from one read-only pass over DAT201.
+	Returns the number of rows written per table.
+	"""
+	rows = iter_sheet_rows(excel_path, 'DAT201', engine)
+	header = next(rows, None)
+	if header is None:
+		raise ValueError(f"DAT201 in {excel_path} is empty")
+
+	lith_writer = ChunkedCsvWriter(os.path.join(out_dir, 'lithology_logs.csv'), LITHOLOGY_COLUMNS)
+	samples_writer = ChunkedCsvWriter(os.path.join(out_dir, 'sample_analyses.csv'), SAMPLE_COLUMNS)
+	collar_rows = CollarRowReducer(header)
+	run_at = created_at or datetime.now()
+
+	for batch in iter_row_chunks(rows, len(header), chunk_size):
+		chunk = pd.DataFrame(batch, columns=header)
+		lith_writer.write(build_lithology_logs(chunk, start_id=lith_writer.rows_written + 1, created_at=run_at))
+		samples_writer.write(build_sample_analyses(chunk, start_id=samples_writer.rows_written + 1, created_at=run_at))
+		collar_rows.feed(batch)
+	lith_writer.close()
+	samples_writer.close()
+
+	collars_df = build_collars(collar_rows.rows(), created_at=run_at)
+	collars_df.to_csv(os.path.join(out_dir, 'collars.csv'), index=False)
+
+	return {
+		'collars': len(collars_df),
+		'lithology_logs': lith_writer.rows_written,
+		'sample_analyses': samples_writer.rows_written,
+	}
+
+
+__all__ = ["stream_dat201", "iter_row_chunks", "ChunkedCsvWriter", "CollarRowReducer", "DEFAULT_CHUNK_SIZE"]
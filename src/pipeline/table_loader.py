@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel, foreign-key-aware loading of the normalized tables into a LoadBackend.
+LOAD_TABLES lists the target tables with the tables their foreign keys
+reference: the seam and rock lookups and collars have none, lithology logs and
+sample analyses need collars and their lookup. Each table is split into
+row-range partitions, and every partition is one task of pipeline.scheduler
+that depends on all partitions of the tables it references, so a table starts
+loading as soon as the tables it points at are complete and independent tables
+load side by side. Tasks run on threads and take their backend from a bounded
+ConnectionPool, one connection per running task.
+
+A partition that fails is retried on a fresh connection, after a growing
+pause, up to the retry limit; bulk_insert is all-or-nothing, so nothing of the
+failed attempt remains. Progress is printed as partitions finish.
+
+With a LoadCheckpoint every committed partition is logged to the target's
+load_log in its own transaction and then noted in a local JSON progress file.
+A rerun of the same load (same sources, target and partition size) skips the
+partitions either one lists and loads the rest, without re-creating the schema.
+With a row_hasher (delta_loader.row_hasher) the key and hash of every row of a
+table with a natural key go to load_row_hashes in the partition's transaction.
+
+Sources hand out the rows of one range as native Python values (int, float,
+str, datetime, None), converted once on the client by the table's dtypes in
+schema.TABLE_SCHEMAS, and map the target's columns to the source's by name:
+TableSpec.renames names a source column that differs from the target's, target
+columns the source lacks are NULL, and source columns the target lacks are
+dropped. Targets without a timestamp type (LoadBackend.native_timestamps)
+take timestamps as ISO text instead. CsvSource seeks to the byte offset of the range's first record (found
+by one quote-aware scan of the file) and reads the header for the column
+positions; FrameSource slices a typed frame read from Parquet. table_source
+picks one for a table.
+"""
+
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .load_backends import LoadBackend
+from .scheduler import Task, TaskGraphError, run_tasks
+from .schema import TABLE_SCHEMAS, read_table, table_filename
+
+DEFAULT_PARTITION_ROWS = 100_000
+RETRY_SECONDS = 1.0
+PROGRESS_FORMAT = 1
+# CSV records converted together
+_CHUNK_ROWS = 5000
+
+
+@dataclass(frozen=True)
+class TableSpec:
+	table: str
+	# Normalized table name in schema.py, which names the source file
+	source: str
+	columns: Tuple[str, ...]
+	key: str
+	keep_identity: bool
+	# Columns that identify a row across loads, for delta loads (pipeline.delta_loader)
+	natural_key: Tuple[str, ...] = ()
+	# Tables this one's foreign keys reference
+	deps: Tuple[str, ...] = ()
+	# (target column, source column) where the normalized table names a column differently
+	renames: Tuple[Tuple[str, str], ...] = ()
+	# Columns built from the surrogate id, which change with it (sample_no is <DHID>_<sample_id>)
+	derived: Tuple[str, ...] = ()
+
+	def source_column(self, column: str) -> str:
+		return dict(self.renames).get(column, column)
+
+
+LOAD_TABLES: Tuple[TableSpec, ...] = (
+	TableSpec(
+		'seam_codes_lookup', 'seam_codes',
+		('seam_id', 'system_id', 'system_name', 'seam_label', 'seam_code', 'priority', 'description', 'created_at'),
+		'seam_id', True, ('seam_id',),
+	),
+	TableSpec(
+		'rock_types', 'rock_types',
+		('rock_code', 'lithology', 'detail', 'created_at'),
+		'rock_code', False, ('rock_code',),
+	),
+	TableSpec(
+		'collars', 'collars',
+		('collar_id', 'hole_id', 'easting', 'northing', 'elevation', 'final_depth', 'dip', 'drilling_date', 'azimuth',
+		 'contractor', 'remarks', 'created_at', 'updated_at'),
+		'collar_id', True, ('hole_id',),
+		# total_depth is the collar's final depth; year_drilled is only a year, so drilling_date stays NULL
+		renames=(('final_depth', 'total_depth'),),
+	),
+	TableSpec(
+		'lithology_logs', 'lithology_logs',
+		('log_id', 'hole_id', 'depth_from', 'depth_to', 'rock_code', 'description', 'created_at'),
+		'log_id', True, ('hole_id', 'depth_from'), ('collars', 'rock_types'),
+	),
+	TableSpec(
+		'sample_analyses', 'sample_analyses',
+		('sample_id', 'hole_id', 'depth_from', 'depth_to', 'sample_no', 'im', 'tm', 'ash', 'vm', 'fc', 'sulphur',
+		 'gross_cv', 'net_cv', 'sg', 'rd', 'hgi', 'seam_quality_id', 'seam_73_id', 'seam_code_quality_original',
+		 'analysis_date', 'lab_name', 'remarks', 'created_at', 'updated_at'),
+		'sample_id', True, ('hole_id', 'depth_from'), ('collars', 'seam_codes_lookup'),
+		derived=('sample_no',),
+	),
+)
+
+
+def _ranges(n_rows: int, rows_per_part: int) -> List[Tuple[int, int]]:
+	# An empty table still gets one (empty) partition, so it shows up in the progress and results
+	return [(start, min(start + rows_per_part, n_rows)) for start in range(0, n_rows, rows_per_part)] or [(0, 0)]
+
+
+def _to_int(text: str) -> int:
+	try:
+		return int(text)
+	except ValueError:
+		return int(float(text))
+
+
+@lru_cache(maxsize=4096)
+def _to_datetime(text: str) -> datetime:
+	try:
+		return datetime.fromisoformat(text)
+	except ValueError:
+		return pd.Timestamp(text).to_pydatetime()
+
+
+def _converter(dtype: Optional[str]) -> Optional[Callable[[str], object]]:
+	"""Text to native value for a schema dtype; None keeps the text."""
+	if dtype in ('Int64', 'Int16', 'Int32', 'int64'):
+		return _to_int
+	if dtype in ('float64', 'float32'):
+		return float
+	if dtype is not None and dtype.startswith('datetime64'):
+		return _to_datetime
+	return None
+
+
+class CsvSource:
+	"""Rows of a CSV by record range, as the given columns converted by dtypes; empty cells are None."""
+
+	def __init__(self, path: str, columns: Sequence[str], dtypes: Optional[Dict[str, str]] = None,
+				 renames: Sequence[Tuple[str, str]] = (), text_timestamps: bool = False):
+		self.path = path
+		self.columns = list(columns)
+		self.dtypes = dtypes or {}
+		self.renames = dict(renames)
+		# Keep timestamps as the CSV's ISO text, for targets without a native timestamp type
+		self.text_timestamps = text_timestamps
+		self._offsets: Dict[int, int] = {}
+		self._fields: List[Tuple[Optional[int], Optional[Callable[[str], object]]]] = []
+
+	def split(self, rows_per_part: int) -> List[Tuple[int, int]]:
+		"""Record ranges of rows_per_part records; one scan of the file notes where each range starts."""
+		with open(self.path, 'r', encoding='utf-8', newline='') as f:
+			header = next(csv.reader(f), [])
+		position = {name: i for i, name in enumerate(header)}
+		self._fields = []
+		for column in self.columns:
+			name = self.renames.get(column, column)
+			convert = _converter(self.dtypes.get(name))
+			if convert is _to_datetime and self.text_timestamps:
+				convert = None
+			self._fields.append((position.get(name), convert))
+		offset = 0
+		record = -1  # the header
+		in_quotes = False
+		with open(self.path, 'rb') as fh:
+			for line in fh:
+				if not in_quotes:
+					if record >= 0 and record % rows_per_part == 0:
+						self._offsets[record] = offset
+					record += 1
+				# A newline inside a quoted field continues the record; "" escapes keep the count even
+				if line.count(b'"') % 2:
+					in_quotes = not in_quotes
+				offset += len(line)
+		return _ranges(max(record, 0), rows_per_part)
+
+	def rows(self, start: int, stop: int) -> Iterator[tuple]:
+		if start >= stop:
+			return
+		with open(self.path, 'rb') as raw:
+			raw.seek(self._offsets[start])
+			reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+			remaining = stop - start
+			while remaining > 0:
+				chunk = list(islice(reader, min(remaining, _CHUNK_ROWS)))
+				if not chunk:
+					return
+				remaining -= len(chunk)
+				# Column by column: one comprehension per column beats a branch per cell
+				cells = list(zip(*chunk))
+				values = []
+				for pos, convert in self._fields:
+					if pos is None or pos >= len(cells):
+						values.append([None] * len(chunk))
+					elif convert is None:
+						values.append([v or None for v in cells[pos]])
+					else:
+						values.append([convert(v) if v else None for v in cells[pos]])
+				yield from zip(*values)
+
+
+def column_values(col: pd.Series, text_timestamps: bool = False) -> list:
+	"""Cell values of one column as native Python values, None for missing; timestamps as datetime,
+	or as the ISO text the CSVs hold with text_timestamps.
+	"""
+	if pd.api.types.is_datetime64_any_dtype(col.dtype):
+		if text_timestamps:
+			return [None if pd.isna(v) else v.isoformat(sep=' ') for v in col.tolist()]
+		return [None if pd.isna(v) else v.to_pydatetime() for v in col.tolist()]
+	return [None if pd.isna(v) else v for v in col.tolist()]
+
+
+class FrameSource:
+	"""Rows of a typed frame by column name; columns the frame lacks are None."""
+
+	def __init__(self, df: pd.DataFrame, columns: Sequence[str], renames: Sequence[Tuple[str, str]] = (),
+				 text_timestamps: bool = False):
+		self.df = df
+		self.columns = list(columns)
+		self.renames = dict(renames)
+		self.text_timestamps = text_timestamps
+
+	def split(self, rows_per_part: int) -> List[Tuple[int, int]]:
+		return _ranges(len(self.df), rows_per_part)
+
+	def rows(self, start: int, stop: int) -> Iterator[tuple]:
+		part = self.df.iloc[start:stop]
+		names = [self.renames.get(c, c) for c in self.columns]
+		values = [column_values(part[n], self.text_timestamps) if n in part.columns else [None] * len(part)
+				  for n in names]
+		return zip(*values)
+
+
+def table_source(spec: TableSpec, data_dir: str, fmt: str = 'csv', text_timestamps: bool = False):
+	"""The source of spec's normalized table in data_dir: typed Parquet frame or CSV converted by the schema."""
+	if fmt == 'parquet':
+		return FrameSource(read_table(data_dir, spec.source, fmt), spec.columns, spec.renames, text_timestamps)
+	path = os.path.join(data_dir, table_filename(spec.source))
+	return CsvSource(path, spec.columns, TABLE_SCHEMAS.get(spec.source), spec.renames, text_timestamps)
+
+
+class ConnectionPool:
+	"""At most size backends, opened on first use; each is lent to one thread at a time."""
+
+	def __init__(self, factory: Callable[[], LoadBackend], size: int = 1):
+		self._factory = factory
+		self._idle: "queue.LifoQueue[LoadBackend]" = queue.LifoQueue()
+		self._slots = threading.BoundedSemaphore(max(1, size))
+
+	@contextmanager
+	def connection(self) -> Iterator[LoadBackend]:
+		with self._slots:
+			try:
+				backend = self._idle.get_nowait()
+			except queue.Empty:
+				backend = self._factory()
+			try:
+				yield backend
+			except BaseException:
+				# Mid-transaction or broken: never hand it out again
+				try:
+					backend.close()
+				except Exception:
+					pass
+				raise
+			self._idle.put(backend)
+
+	def close(self) -> None:
+		while True:
+			try:
+				self._idle.get_nowait().close()
+			except queue.Empty:
+				return
+
+
+class LoadCheckpoint:
+	"""Partitions one full load has committed, mirrored in a local JSON progress file.
+	fingerprint describes what is loaded where (sources, target, partition size); a load resumes only
+	when it matches. The target's load_log is authoritative: the file is written after each commit.
+	"""
+
+	def __init__(self, path: str, load_id: str, fingerprint: dict, schema_created: bool = False,
+				 complete: bool = False, done: Optional[Dict[Tuple[str, int], Tuple[int, int]]] = None):
+		self.path = path
+		self.load_id = load_id
+		self.fingerprint = fingerprint
+		self.schema_created = schema_created
+		self.complete = complete
+		# (table, part_start) -> (part_stop, rows_loaded)
+		self.done = done or {}
+		self._lock = threading.RLock()
+
+	@classmethod
+	def start(cls, path: str, fingerprint: dict) -> "LoadCheckpoint":
+		checkpoint = cls(path, uuid.uuid4().hex, fingerprint)
+		checkpoint.save()
+		return checkpoint
+
+	@classmethod
+	def resume(cls, path: str, fingerprint: dict) -> "LoadCheckpoint":
+		if not os.path.exists(path):
+			raise FileNotFoundError(f"no load progress file {path}; start a new load instead")
+		with open(path, 'r', encoding='utf-8') as f:
+			state = json.load(f)
+		if state.get('format') != PROGRESS_FORMAT:
+			raise ValueError(f"{path} is not a load progress file this loader can resume")
+		before = state['fingerprint']
+		changed = sorted(k for k in set(before) | set(fingerprint) if before.get(k) != fingerprint.get(k))
+		if changed:
+			raise ValueError(f"cannot resume load {state['load_id']}: {', '.join(changed)} changed since it started")
+		done = {(t, start): (stop, rows) for t, start, stop, rows in state['done']}
+		return cls(path, state['load_id'], fingerprint, state['schema_created'], state['complete'], done)
+
+	def committed(self, table: str, start: int) -> Optional[int]:
+		"""Rows loaded by the partition of table starting at start, None when it is not committed."""
+		with self._lock:
+			entry = self.done.get((table, start))
+			return None if entry is None else entry[1]
+
+	def add_committed(self, entries: Iterable[Tuple[str, int, int, int]]) -> None:
+		"""Record (table, part_start, part_stop, rows_loaded) entries, e.g. the target's load_log."""
+		with self._lock:
+			for table, start, stop, rows in entries:
+				self.done[(table, start)] = (stop, rows)
+			self.save()
+
+	def update(self, **flags: bool) -> None:
+		with self._lock:
+			for name in ('schema_created', 'complete'):
+				if name in flags:
+					setattr(self, name, flags[name])
+			self.save()
+
+	def save(self) -> None:
+		with self._lock:
+			state = {
+				'format': PROGRESS_FORMAT, 'load_id': self.load_id, 'fingerprint': self.fingerprint,
+				'schema_created': self.schema_created, 'complete': self.complete,
+				'done': [[t, start, stop, rows] for (t, start), (stop, rows) in sorted(self.done.items())],
+			}
+			tmp = f"{self.path}.tmp"
+			with open(tmp, 'w', encoding='utf-8') as f:
+				json.dump(state, f, indent=1)
+			os.replace(tmp, self.path)
+
+
+class LoadProgress:
+	"""Rows and partitions done per table, printed as each partition finishes."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._start = time.perf_counter()
+		self.parts: Dict[str, int] = {}
+		self.parts_done: Dict[str, int] = {}
+		self.rows_done: Dict[str, int] = {}
+		self.rows_resumed = 0
+		self.retries = 0
+
+	def add_table(self, table: str, parts: int) -> None:
+		self.parts[table] = parts
+		self.parts_done[table] = 0
+		self.rows_done[table] = 0
+
+	def done(self, table: str, rows: int, resumed: bool = False) -> None:
+		with self._lock:
+			self.parts_done[table] += 1
+			self.rows_done[table] += rows
+			if resumed:
+				self.rows_resumed += rows
+			seconds = time.perf_counter() - self._start
+			loaded = sum(self.rows_done.values()) - self.rows_resumed
+			print(f"{table}: {self.parts_done[table]}/{self.parts[table]} partitions, {self.rows_done[table]:,} rows "
+				  + ("(committed by an earlier run)" if resumed else
+					 f"({loaded:,} loaded, {loaded / seconds if seconds > 0 else 0:,.0f} rows/s)"))
+
+	def retry(self, table: str, start: int, stop: int, attempt: int, error: Exception) -> None:
+		with self._lock:
+			self.retries += 1
+			print(f"{table}: rows {start}-{stop} failed ({type(error).__name__}: {error}); retry {attempt}")
+
+
+def _load_part(pool: ConnectionPool, spec: TableSpec, source, start: int, stop: int, retries: int,
+			   progress: LoadProgress, batch_size: int, checkpoint: Optional[LoadCheckpoint], row_hasher=None,
+			   **_deps) -> int:
+	if checkpoint is not None and checkpoint.committed(spec.table, start) is not None:
+		n = checkpoint.committed(spec.table, start)
+		progress.done(spec.table, n, resumed=True)
+		return n
+	logged = None if checkpoint is None else (checkpoint.load_id, spec.table, start, stop)
+	for attempt in range(retries + 1):
+		try:
+			with pool.connection() as backend:
+				n = None
+				if attempt and checkpoint is not None:
+					# The failed attempt may have committed before its connection broke
+					logged_parts = backend.load_log(checkpoint.load_id)
+					checkpoint.add_committed(e for e in logged_parts if e[:2] == (spec.table, start))
+					n = checkpoint.committed(spec.table, start)
+				if n is None:
+					rows = source.rows(start, stop)
+					hashes = None
+					if row_hasher is not None and spec.natural_key:
+						# Filled while bulk_insert consumes the rows, then written in their transaction
+						hashes = []
+						rows = _hashing(rows, row_hasher(spec), hashes)
+					n = backend.bulk_insert(spec.table, list(spec.columns), rows, keep_identity=spec.keep_identity,
+											batch_size=batch_size, checkpoint=logged, row_hashes=hashes)
+		except Exception as exc:
+			if attempt == retries:
+				raise
+			progress.retry(spec.table, start, stop, attempt + 1, exc)
+			time.sleep(RETRY_SECONDS * 2 ** attempt)
+			continue
+		if checkpoint is not None:
+			checkpoint.add_committed([(spec.table, start, stop, n)])
+		progress.done(spec.table, n)
+		return n
+	raise AssertionError("unreachable")
+
+
+def _hashing(rows: Iterable[tuple], hasher, hashes: list) -> Iterator[tuple]:
+	for row in rows:
+		hashes.append(hasher(row))
+		yield row
+
+
+def load_tables(specs: Sequence[TableSpec], sources: Dict[str, object], pool: ConnectionPool, workers: int = 1,
+				partition_rows: int = DEFAULT_PARTITION_ROWS, retries: int = 2, batch_size: int = 5000,
+				progress: LoadProgress = None, checkpoint: Optional[LoadCheckpoint] = None,
+				row_hasher=None) -> Dict[str, int]:
+	"""Load every spec's source in partitions over the pool, parents before children; rows loaded per table.
+	specs must list referenced tables before the tables that reference them; references to tables not in
+	specs are taken to be loaded already. With a checkpoint, partitions it lists as committed are skipped
+	and every partition loaded is logged to it. row_hasher(spec) gives the function that turns a row into
+	its (row_key, row_hash), stored with the partition for tables with a natural key.
+	"""
+	progress = progress or LoadProgress()
+	tasks: List[Task] = []
+	parts_of: Dict[str, List[str]] = {}
+	loading = {spec.table for spec in specs}
+	for spec in specs:
+		missing = [d for d in spec.deps if d in loading and d not in parts_of]
+		if missing:
+			raise ValueError(f"{spec.table} is listed before the table(s) it references: {missing}")
+		source = sources[spec.table]
+		ranges = source.split(partition_rows)
+		progress.add_table(spec.table, len(ranges))
+		parts_of[spec.table] = [f"{spec.table}[{i}]" for i in range(len(ranges))]
+		deps = tuple(part for d in spec.deps if d in parts_of for part in parts_of[d])
+		for name, (start, stop) in zip(parts_of[spec.table], ranges):
+			args = (pool, spec, source, start, stop, retries, progress, batch_size, checkpoint, row_hasher)
+			tasks.append(Task(name, _load_part, args, deps))
+	results = run_tasks(tasks, workers=workers, executor='thread')
+	if not all(r.ok for r in results):
+		raise TaskGraphError(results)
+	value = {r.name: r.value for r in results}
+	return {table: sum(value[p] for p in parts) for table, parts in parts_of.items()}
+
+
+__all__ = [
+	"TableSpec", "LOAD_TABLES", "CsvSource", "FrameSource", "ConnectionPool", "LoadProgress", "LoadCheckpoint",
+	"load_tables", "table_source", "column_values", "DEFAULT_PARTITION_ROWS",
+]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Task graph of the normalized-table pipeline.
+One dat201 task parses DAT201 once and runs the extractors that read it (and
+their writes) in the same process, so the parsed rows never cross a process
+boundary; the lookup sheets are parsed inside their own extractor tasks.
+Every function here is module-level so the graph can run in a process pool.
+"""
+
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import extract_collars, extract_lithology_logs, extract_rock_types, extract_sample_analyses, extract_seam_codes
+from .profiler import StageMetrics, measure
+from .scheduler import Task, TaskResult, run_tasks
+from .sheet_cache import SheetCache
+from .schema import table_filename, write_table
+from .workbook import WorkbookSession
+
+# (task name, label, extractor, CSV output file, source sheet, extractor version) in output order
+EXTRACTOR_TASKS = [
+	('seam_codes', 'Seam codes', extract_seam_codes.extract_seam_codes, table_filename('seam_codes'), 'Seam Code',
+	 extract_seam_codes.EXTRACTOR_VERSION),
+	('rock_types', 'Rock types', extract_rock_types.extract_rock_types, table_filename('rock_types'), 'Rock Code',
+	 extract_rock_types.EXTRACTOR_VERSION),
+	('collars', 'Collars', extract_collars.extract_collars, table_filename('collars'), 'DAT201',
+	 extract_collars.EXTRACTOR_VERSION),
+	('lithology_logs', 'Lithology logs', extract_lithology_logs.extract_lithology_logs, table_filename('lithology_logs'),
+	 'DAT201', extract_lithology_logs.EXTRACTOR_VERSION),
+	('sample_analyses', 'Sample analyses', extract_sample_analyses.extract_sample_analyses,
+	 table_filename('sample_analyses'), 'DAT201', extract_sample_analyses.EXTRACTOR_VERSION),
+]
+
+
+def load_sheet(excel_path: str, sheet: str, cache: Optional[SheetCache] = None, engine: str = 'openpyxl',
+			   profile_dir: Optional[str] = None) -> WorkbookSession:
+	"""Parse (or fetch from cache) one worksheet in read-only mode and return the session holding its rows.
+	The metrics of the load are kept on the session as load_metrics.
+	"""
+	session = WorkbookSession(excel_path, read_only=True, cache=cache, engine=engine)
+	with measure(sheet.lower().replace(' ', '_'), profile_dir) as metrics:
+		metrics.rows = len(session.rows(sheet))
+		metrics.read_seconds = session.read_seconds
+	session.close()
+	session.load_metrics = metrics
+	return session
+
+
+def extract_to_table(
+	extractor: Callable[..., pd.DataFrame],
+	name: str,
+	excel_path: str,
+	out_dir: str,
+	fmt: str = 'csv',
+	cache: Optional[SheetCache] = None,
+	engine: str = 'openpyxl',
+	profile_dir: Optional[str] = None,
+	created_at: Optional[datetime] = None,
+	dat201: Optional[WorkbookSession] = None,
+) -> List[StageMetrics]:
+	"""Run one extractor (on the shared DAT201 session when given) and write its table.
+	created_at is the run timestamp shared by every table of one run.
+	Returns the metrics of the extract and the write stage; both carry the row count.
+	"""
+	session = dat201 if dat201 is not None else WorkbookSession(excel_path, read_only=True, cache=cache, engine=engine)
+	read_before = session.read_seconds
+	try:
+		with measure(name, profile_dir) as extract:
+			df = extractor(excel_path, session=session, created_at=created_at)
+			extract.rows = len(df)
+			extract.read_seconds = session.read_seconds - read_before
+	finally:
+		if dat201 is None:
+			session.close()
+	with measure(f"{name}.write", profile_dir) as write:
+		write_table(df, out_dir, name, fmt)
+		write.rows = len(df)
+	return [extract, write]
+
+
+def extract_dat201(
+	names: List[str],
+	excel_path: str,
+	out_dir: str,
+	fmt: str = 'csv',
+	cache: Optional[SheetCache] = None,
+	engine: str = 'openpyxl',
+	profile_dir: Optional[str] = None,
+	created_at: Optional[datetime] = None,
+) -> List[TaskResult]:
+	"""Parse DAT201 and run the named extractors on that one session, in this process.
+	Returns a result for the parse (its load metrics) and one per extractor, as run_tasks reports them.
+	"""
+	tasks = [Task('dat201', load_sheet, (excel_path, 'DAT201', cache, engine, profile_dir))]
+	for name, _, extractor, _, _, _ in EXTRACTOR_TASKS:
+		if name in names:
+			args = (extractor, name, excel_path, out_dir, fmt, cache, engine, profile_dir, created_at)
+			tasks.append(Task(name, extract_to_table, args, deps=('dat201',)))
+	results = run_tasks(tasks)
+	# Hand back the metrics, not the session: its rows would be pickled back to the parent process
+	parsed = results[0]
+	results[0] = TaskResult(parsed.name, parsed.ok, [parsed.value.load_metrics] if parsed.ok else None,
+							parsed.error, parsed.seconds)
+	return results
+
+
+def task_results(tasks: List[Task], results: List[TaskResult]) -> List[TaskResult]:
+	"""Results of run_tasks(tasks) with the dat201 task replaced by its parse and extractor results."""
+	out = []
+	for task, res in zip(tasks, results):
+		if res.name != 'dat201':
+			out.append(res)
+		elif res.ok:
+			out.extend(res.value)
+		else:
+			# The task itself failed (e.g. its worker died): so did every output it was to build
+			out.append(res)
+			out.extend(TaskResult(name, False, error=res.error) for name in task.args[0])
+	return out
+
+
+def pipeline_outputs(fmt: str = 'csv') -> Dict[str, dict]:
+	"""Source sheet, extractor version and file per output, as recorded in the build manifest."""
+	return {
+		name: {'sheet': sheet, 'version': version, 'file': table_filename(name, fmt)}
+		for name, _, _, _, sheet, version in EXTRACTOR_TASKS
+	}
+
+
+def pipeline_tasks(
+	excel_path: str,
+	out_dir: str,
+	names: Optional[Iterable[str]] = None,
+	fmt: str = 'csv',
+	cache: Optional[SheetCache] = None,
+	engine: str = 'openpyxl',
+	profile_dir: Optional[str] = None,
+	created_at: Optional[datetime] = None,
+) -> List[Task]:
+	"""Tasks building the named outputs (all by default); DAT201 is only parsed when one of them reads it.
+	Run them with run_tasks and expand the results with task_results.
+	"""
+	wanted = set(names) if names is not None else {t[0] for t in EXTRACTOR_TASKS}
+	tasks = []
+	dat201 = []
+	for name, _, extractor, _, sheet, _ in EXTRACTOR_TASKS:
+		if name not in wanted:
+			continue
+		if sheet == 'DAT201':
+			dat201.append(name)
+			continue
+		tasks.append(Task(
+			name,
+			extract_to_table,
+			(extractor, name, excel_path, out_dir, fmt, cache, engine, profile_dir, created_at),
+		))
+	if dat201:
+		# Largest task first, so the lookup sheets run beside it with workers > 1
+		tasks.insert(0, Task('dat201', extract_dat201,
+							 (dat201, excel_path, out_dir, fmt, cache, engine, profile_dir, created_at)))
+	return tasks
+
+
+__all__ = [
+	"EXTRACTOR_TASKS", "load_sheet", "extract_to_table", "extract_dat201", "task_results", "pipeline_outputs",
+	"pipeline_tasks",
+]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared workbook access for the pipeline extractors.
+A WorkbookSession opens DH70.xlsx once and caches each parsed worksheet, so
+several extractors reading DAT201 share a single parse instead of re-loading
+the workbook and re-materializing the sheet each time. With a SheetCache the
+parsed rows also persist across runs, keyed by the workbook's content hash.
+"""
+
+import hashlib
+import time
+import pandas as pd
+import openpyxl
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+	from .profiler import StageMetrics
+	from .sheet_cache import SheetCache
+
+
+Row = Tuple[object, ...]
+
+# Worksheet readers: openpyxl, or the lighter regex scanner in xlsx_reader
+ENGINES = ('openpyxl', 'xlsx')
+
+
+class WorkbookSession:
+	"""Lazily parses worksheets of one workbook and caches rows and frames per sheet."""
+
+	def __init__(self, excel_path: str = "data/raw/DH70.xlsx", read_only: bool = False,
+				 cache: Optional["SheetCache"] = None, engine: str = 'openpyxl'):
+		if engine not in ENGINES:
+			raise ValueError(f"unknown reader engine {engine!r}")
+		self.excel_path = excel_path
+		self.read_only = read_only
+		self.cache = cache
+		self.engine = engine
+		self._content_hash: Optional[str] = None
+		self._wb = None
+		self._rows: Dict[str, List[Row]] = {}
+		self._frames: Dict[str, pd.DataFrame] = {}
+		# Time spent reading worksheets (parser or sheet cache), for the run report
+		self.read_seconds = 0.0
+		self.load_metrics: Optional["StageMetrics"] = None
+
+	def __getstate__(self) -> dict:
+		# A pickled session keeps its parsed rows; the open workbook and derived frames are rebuilt on use
+		state = self.__dict__.copy()
+		state['_wb'] = None
+		state['_frames'] = {}
+		return state
+
+	def __enter__(self) -> "WorkbookSession":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
+
+	def _workbook(self):
+		if self._wb is None:
+			self._wb = openpyxl.load_workbook(self.excel_path, data_only=True, read_only=self.read_only)
+		return self._wb
+
+	def content_hash(self) -> str:
+		"""sha256 of the workbook file, computed once per session."""
+		if self._content_hash is None:
+			h = hashlib.sha256()
+			with open(self.excel_path, 'rb') as fh:
+				for block in iter(lambda: fh.read(1 << 20), b''):
+					h.update(block)
+			self._content_hash = h.hexdigest()
+		return self._content_hash
+
+	def rows(self, sheet: str) -> List[Row]:
+		"""All rows of a worksheet (row 1 first) as value tuples."""
+		if sheet not in self._rows:
+			start = time.perf_counter()
+			rows = self.cache.load(self.content_hash(), sheet) if self.cache is not None else None
+			if rows is None:
+				rows = self._parse(sheet)
+				if self.cache is not None:
+					self.cache.store(self.content_hash(), sheet, rows)
+			self._rows[sheet] = rows
+			self.read_seconds += time.perf_counter() - start
+		return self._rows[sheet]
+
+	def _parse(self, sheet: str) -> List[Row]:
+		if self.engine == 'xlsx':
+			# Imported here: xlsx_reader builds on this module
+			from .xlsx_reader import iter_xlsx_rows
+			return list(iter_xlsx_rows(self.excel_path, sheet))
+		return list(self._workbook()[sheet].iter_rows(values_only=True))
+
+	def data_rows(self, sheet: str) -> List[Row]:
+		"""Non-empty rows of a worksheet, header row included."""
+		return [row for row in self.rows(sheet) if any(c is not None for c in row)]
+
+	def frame(self, sheet: str) -> pd.DataFrame:
+		"""Worksheet as a DataFrame using the first non-empty row as header.
+		The cached frame is shared between extractors and must not be mutated.
+		"""
+		if sheet not in self._frames:
+			data = self.data_rows(sheet)
+			self._frames[sheet] = pd.DataFrame(data[1:], columns=data[0])
+		return self._frames[sheet]
+
+	def close(self) -> None:
+		if self._wb is not None:
+			self._wb.close()
+			self._wb = None
+
+
+def iter_sheet_rows(excel_path: str, sheet: str, engine: str = 'openpyxl') -> Iterator[Row]:
+	"""Stream non-empty rows of one worksheet in read-only mode without caching them."""
+	if engine == 'xlsx':
+		from .xlsx_reader import iter_xlsx_rows
+		yield from (row for row in iter_xlsx_rows(excel_path, sheet) if any(c is not None for c in row))
+		return
+	wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
+	try:
+		for row in wb[sheet].iter_rows(values_only=True):
+			if any(c is not None for c in row):
+				yield row
+	finally:
+		wb.close()
+
+
+def open_session(excel_path: str, session: Optional[WorkbookSession]) -> Tuple[WorkbookSession, bool]:
+	"""Return (session, owned). owned is True when the caller must close it."""
+	if session is not None:
+		return session, False
+	return WorkbookSession(excel_path), True
+
+
+def cell(row: Row, idx: int):
+	"""Value at 0-based column idx, or None when the row is shorter."""
+	return row[idx] if idx < len(row) else None
+
+
+__all__ = ["ENGINES", "WorkbookSession", "iter_sheet_rows", "open_session", "cell"]
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lightweight xlsx reader: worksheet rows straight from the package XML.
+The sheet XML is decompressed in blocks and scanned with regular expressions
+row by row; shared strings and the date styles are resolved once per workbook.
+No per-cell objects are built, which makes it several times faster than
+openpyxl on wide sheets such as DAT201.
+
+Rows match openpyxl read-only mode with data_only=True and values_only=True:
+cached formula results, numbers as int or float, date-styled numbers as
+datetime/time/timedelta, rows padded to the sheet dimension and missing rows
+filled with empty ones. Use engine='xlsx' on WorkbookSession to select it.
+"""
+
+import html
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+from .workbook import Row
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_DIMENSION = re.compile(rb'<dimension\b[^>]*\bref="([^"]+)"')
+_SHEET_DATA = re.compile(rb'<sheetData\b')
+_ROW = re.compile(rb'<row\b([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_CELL = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+# Fast path for the usual layout, r first: <c r="AB12" s="3" t="s"><v>7</v></c>
+_CELL_R_FIRST = re.compile(rb'<c r="([A-Z]+)\d+"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_CELL_REF = re.compile(rb'\s*\br="([A-Z]+)\d*"')
+_ATTR = re.compile(rb'\b(r|s|t)="([^"]*)"')
+_ROW_NUMBER = re.compile(rb'\br="([^"]*)"')
+_VALUE = re.compile(rb'<v(?:\s[^>]*)?>(.*?)</v>', re.S)
+_TEXT = re.compile(rb'<t(?:\s[^>]*)?>(.*?)</t>', re.S)
+_PHONETIC = re.compile(rb'<rPh\b.*?</rPh>', re.S)
+
+_BLOCK_SIZE = 1 << 22
+
+
+def _part_path(target: str) -> str:
+	# Relationship targets are relative to xl/ unless absolute
+	if target.startswith('/'):
+		return target.lstrip('/')
+	return posixpath.normpath(posixpath.join('xl', target))
+
+
+def package_parts(zf: zipfile.ZipFile) -> Tuple[Dict[str, str], Optional[str], Optional[str]]:
+	"""(sheet name -> worksheet part, shared strings part, styles part) of an open xlsx package."""
+	rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+	targets: Dict[str, str] = {}
+	shared_part = styles_part = None
+	for rel in rels.iter(_NS_PKG_REL + 'Relationship'):
+		path = _part_path(rel.get('Target'))
+		targets[rel.get('Id')] = path
+		kind = rel.get('Type', '')
+		if kind.endswith('/sharedStrings'):
+			shared_part = path
+		elif kind.endswith('/styles'):
+			styles_part = path
+	workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+	sheets = {s.get('name'): targets.get(s.get(_NS_REL + 'id')) for s in workbook.iter(_NS_MAIN + 'sheet')}
+	return sheets, shared_part, styles_part
+
+
+def _epoch(zf: zipfile.ZipFile):
+	workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+	props = workbook.find(_NS_MAIN + 'workbookPr')
+	if props is not None and props.get('date1904', '').lower() in ('1', 'true'):
+		return CALENDAR_MAC_1904
+	return CALENDAR_WINDOWS_1900
+
+
+def _text(raw: bytes) -> str:
+	text = raw.decode('utf-8')
+	return html.unescape(text) if '&' in text else text
+
+
+def _cast_number(raw: bytes):
+	# Same rule as openpyxl: a decimal point or exponent makes a float
+	if b'.' in raw or b'E' in raw or b'e' in raw:
+		return float(raw)
+	return int(raw)
+
+
+class XlsxBook:
+	"""An open xlsx package with its shared strings and date styles resolved once."""
+
+	def __init__(self, excel_path: str):
+		self.excel_path = excel_path
+		self._zf = zipfile.ZipFile(excel_path)
+		self.sheets, shared_part, styles_part = package_parts(self._zf)
+		names = set(self._zf.namelist())
+		self.shared_strings: List[str] = []
+		if shared_part in names:
+			with self._zf.open(shared_part) as fh:
+				self.shared_strings = read_string_table(fh)
+		self.date_styles: FrozenSet[int] = frozenset()
+		self.timedelta_styles: FrozenSet[int] = frozenset()
+		if styles_part in names:
+			stylesheet = Stylesheet.from_tree(ET.fromstring(self._zf.read(styles_part)))
+			self.date_styles = frozenset(stylesheet.date_formats)
+			self.timedelta_styles = frozenset(stylesheet.timedelta_formats)
+		self.epoch = _epoch(self._zf)
+		self._kinds: Dict[bytes, Tuple[bytes, bool, bool]] = {}
+		self._columns: Dict[bytes, int] = {}
+
+	def close(self) -> None:
+		self._zf.close()
+
+	def __enter__(self) -> "XlsxBook":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
+
+	def _kind(self, attrs: bytes) -> Tuple[bytes, bool, bool]:
+		"""(cell type, is date style, is timedelta style) for the attributes after r="..."; memoized."""
+		known = self._kinds.get(attrs)
+		if known is None:
+			found = dict(_ATTR.findall(attrs))
+			style = int(found.get(b's', 0) or 0)
+			known = (found.get(b't', b'n'), style in self.date_styles, style in self.timedelta_styles)
+			self._kinds[attrs] = known
+		return known
+
+	def _value(self, kind: bytes, is_date: bool, is_timedelta: bool, body: bytes):
+		if kind == b'inlineStr':
+			if b'<is' not in body:
+				return None
+			return ''.join(_text(t) for t in _TEXT.findall(_PHONETIC.sub(b'', body)))
+		if body.startswith(b'<v>') and body.endswith(b'</v>') and body.count(b'<') == 2:
+			raw = body[3:-4]
+		else:
+			match = _VALUE.search(body)
+			raw = match.group(1) if match else b''
+		if not raw:
+			return None
+		if kind == b'n':
+			value = _cast_number(raw)
+			if is_date:
+				try:
+					return from_excel(value, self.epoch, timedelta=is_timedelta)
+				except (OverflowError, ValueError):
+					return '#VALUE!'
+			return value
+		if kind == b's':
+			return self.shared_strings[int(raw)]
+		if kind == b'b':
+			return bool(int(raw))
+		if kind == b'd':
+			return from_ISO8601(_text(raw))
+		# 'str' (formula result) and 'e' (error) keep their text
+		return _text(raw)
+
+	def _iter_xml(self, part: str) -> Iterator[bytes]:
+		"""Decompressed sheet XML in pieces that each end on a row boundary."""
+		with self._zf.open(part) as fh:
+			pending = b''
+			while True:
+				block = fh.read(_BLOCK_SIZE)
+				if not block:
+					if pending:
+						yield pending
+					return
+				pending += block
+				cut = pending.rfind(b'</row>')
+				if cut >= 0:
+					cut += len(b'</row>')
+					yield pending[:cut]
+					pending = pending[cut:]
+
+	def iter_rows(self, sheet: str, columns: Optional[Set[int]] = None) -> Iterator[Row]:
+		"""Rows of one worksheet; with columns (0-based indexes), other cells are left None without decoding."""
+		part = self.sheets.get(sheet)
+		if part is None:
+			raise KeyError(f"Worksheet {sheet} does not exist.")
+		max_col: Optional[int] = None
+		max_row: Optional[int] = None
+		empty_row: Row = ()
+		dimension_checked = False
+		counter = 1
+		row_number = 0
+		for piece in self._iter_xml(part):
+			if not dimension_checked:
+				data_at = _SHEET_DATA.search(piece)
+				found = _DIMENSION.search(piece, 0, data_at.start() if data_at else len(piece))
+				if found:
+					_, _, max_col, max_row = range_boundaries(found.group(1).decode('ascii'))
+					empty_row = (None,) * max_col if max_col is not None else ()
+				dimension_checked = True
+			for row_match in _ROW.finditer(piece):
+				number = _ROW_NUMBER.search(row_match.group(1))
+				row_number = int(float(number.group(1))) if number else row_number + 1
+				if max_row is not None and row_number > max_row:
+					# Rows skipped just before the first one past the dimension are still filled in
+					while counter <= max_row:
+						counter += 1
+						yield empty_row
+					return
+				while counter < row_number:
+					counter += 1
+					yield empty_row
+				if counter > row_number:
+					continue
+				counter += 1
+				yield self._row(row_match.group(2), max_col, columns)
+
+	def _column(self, letters: bytes) -> int:
+		col = self._columns.get(letters)
+		if col is None:
+			col = self._columns[letters] = column_index_from_string(letters.decode('ascii'))
+		return col
+
+	def _cells(self, body: bytes) -> List[Tuple[Optional[bytes], bytes, bytes]]:
+		"""(column letters or None, other attributes, inner XML) per cell."""
+		cells = _CELL_R_FIRST.findall(body)
+		if len(cells) == body.count(b'<c ') + body.count(b'<c>') + body.count(b'<c/>'):
+			return cells
+		# Some cell has no r or not as its first attribute: take the general route for this row
+		out = []
+		for attrs, inner in _CELL.findall(body):
+			ref = _CELL_REF.search(attrs)
+			out.append((ref.group(1) if ref else None, _CELL_REF.sub(b'', attrs), inner))
+		return out
+
+	def _row(self, body: Optional[bytes], max_col: Optional[int], columns: Optional[Set[int]]) -> Row:
+		cells = self._cells(body) if body else []
+		if not cells and not max_col:
+			return ()
+		values: List[object] = [None] * max_col if max_col else []
+		col = 0
+		for letters, attrs, inner in cells:
+			col = self._column(letters) if letters else col + 1
+			if max_col is not None and col > max_col:
+				continue
+			if columns is not None and col - 1 not in columns:
+				continue
+			if not inner:
+				continue
+			kind, is_date, is_timedelta = self._kinds.get(attrs) or self._kind(attrs)
+			if kind == b's' and inner.startswith(b'<v>') and inner.endswith(b'</v>'):
+				value = self.shared_strings[int(inner[3:-4])]
+			else:
+				value = self._value(kind, is_date, is_timedelta, inner)
+			if value is None:
+				continue
+			if col > len(values):
+				values.extend([None] * (col - len(values)))
+			values[col - 1] = value
+		if not max_col and len(values) < col:
+			values.extend([None] * (col - len(values)))
+		return tuple(values)
+
+
+def iter_xlsx_rows(excel_path: str, sheet: str, columns: Optional[Set[int]] = None) -> Iterator[Row]:
+	"""Stream all rows of one worksheet (see XlsxBook.iter_rows)."""
+	with XlsxBook(excel_path) as book:
+		yield from book.iter_rows(sheet, columns)
+
+
+__all__ = ["XlsxBook", "iter_xlsx_rows", "package_parts"]
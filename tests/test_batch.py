@@ -0,0 +1,46 @@
+import pytest
+from openpyxl import load_workbook
+
+from generate_dh_workbook import generate
+from pipeline.batch import extract_workbook, merge_workbooks
+
+
+@pytest.fixture(scope='module')
+def overlapping(tmp_path_factory):
+	"""Workbook a and workbook b = a without its first hole, so b's samples are numbered from 1 again."""
+	work = tmp_path_factory.mktemp('batch')
+	a = generate(3000, str(work / 'a.xlsx'), seed=8)[0]
+	wb = load_workbook(a)
+	ws = wb['DAT201']
+	first = ws.cell(2, 1).value
+	n = 0
+	while ws.cell(2 + n, 1).value == first:
+		n += 1
+	ws.delete_rows(2, n)
+	b = str(work / 'b.xlsx')
+	wb.save(b)
+	return (a, extract_workbook(a)), (b, extract_workbook(b))
+
+
+def _numbered_by_id(samples):
+	named = samples['sample_no'].notna()
+	expected = samples['hole_id'][named].astype(str) + '_' + samples['sample_id'][named].astype(str)
+	return (samples['sample_no'][named] == expected).all()
+
+
+def test_shared_holes_at_other_sample_offsets_are_identical(overlapping):
+	a, b = overlapping
+	tables, conflicts, _ = merge_workbooks([a, b])
+	assert len(conflicts) == len(b[1]['collars'])
+	assert (conflicts['kind'] == 'identical').all()
+	assert tables['sample_analyses']['sample_no'].tolist() == a[1]['sample_analyses']['sample_no'].tolist()
+
+
+def test_merge_rebuilds_sample_no_from_renumbered_ids(overlapping):
+	a, b = overlapping
+	tables, conflicts, _ = merge_workbooks([b, a])
+	assert (conflicts['kind'] == 'identical').all()
+	samples = tables['sample_analyses']
+	assert len(samples) == len(a[1]['sample_analyses'])
+	assert samples['sample_id'].tolist() == list(range(1, len(samples) + 1))
+	assert _numbered_by_id(samples)
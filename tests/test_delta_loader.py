@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from pipeline.delta_loader import load_delta, row_hasher
+from pipeline.load_backends import ROW_HASH_TABLE, SqliteBackend
+from pipeline.scheduler import TaskGraphError
+from pipeline.table_loader import LOAD_TABLES, ConnectionPool, FrameSource, LoadCheckpoint, load_tables
+
+HOLES = [f"DH{i:03d}" for i in range(6)]
+
+
+def _frames():
+	litho = [(h, float(d), float(d + 1), 1) for h in HOLES for d in range(4)]
+	samples = [(h, float(d), float(d) + 0.5, 5.0, 30.0, 20.0, 30.0, 20.0) for h in HOLES for d in range(3)]
+	return {
+		'seam_codes_lookup': pd.DataFrame({'seam_id': [1], 'system_id': ['S'], 'system_name': ['Seam'],
+										   'seam_label': ['A'], 'seam_code': [10], 'priority': [0]}),
+		'rock_types': pd.DataFrame({'rock_code': [1], 'lithology': ['Coal'], 'detail': ['coal']}),
+		'collars': pd.DataFrame({'collar_id': range(1, len(HOLES) + 1), 'hole_id': HOLES,
+								 'total_depth': [50.0] * len(HOLES)}),
+		'lithology_logs': pd.DataFrame({
+			'log_id': range(1, len(litho) + 1), 'hole_id': [r[0] for r in litho],
+			'depth_from': [r[1] for r in litho], 'depth_to': [r[2] for r in litho],
+			'rock_code': [r[3] for r in litho]}),
+		'sample_analyses': _numbered(pd.DataFrame(
+			[r + (1,) for r in samples],
+			columns=['hole_id', 'depth_from', 'depth_to', 'im', 'tm', 'ash', 'vm', 'fc', 'seam_quality_id'])),
+	}
+
+
+def _numbered(samples):
+	# As extract_sample_analyses numbers them: sample_id in sheet order, sample_no = <DHID>_<sample_id>
+	samples = samples.reset_index(drop=True).drop(columns=['sample_id', 'sample_no'], errors='ignore')
+	samples.insert(0, 'sample_id', range(1, len(samples) + 1))
+	samples.insert(4, 'sample_no', samples['hole_id'] + '_' + samples['sample_id'].astype(str))
+	return samples
+
+
+def _sources(frames=None):
+	frames = frames or _frames()
+	return {spec.table: FrameSource(frames[spec.table], spec.columns, spec.renames, text_timestamps=True)
+			for spec in LOAD_TABLES}
+
+
+def test_delta_after_failed_full_load_loads_the_missing_rows(tmp_path, monkeypatch):
+	db = str(tmp_path / 'target.sqlite')
+	sources = _sources()
+	pool = ConnectionPool(lambda: SqliteBackend(db), size=1)
+	with pool.connection() as backend:
+		backend.create_schema()
+
+	calls = []
+	bulk_insert = SqliteBackend.bulk_insert
+
+	def failing_bulk_insert(self, table, columns, rows, *args, **kwargs):
+		calls.append(table)
+		if table == 'lithology_logs' and calls.count(table) == 3:
+			# Break off after some rows have gone in, so the partition's transaction rolls back
+			def broken(rows):
+				for i, row in enumerate(rows):
+					if i == 2:
+						raise ConnectionError("link dropped")
+					yield row
+			rows = broken(rows)
+		return bulk_insert(self, table, columns, rows, *args, **kwargs)
+
+	monkeypatch.setattr(SqliteBackend, 'bulk_insert', failing_bulk_insert)
+	checkpoint = LoadCheckpoint.start(str(tmp_path / 'progress.json'), {})
+	with pytest.raises(TaskGraphError):
+		load_tables(LOAD_TABLES, sources, pool, partition_rows=5, retries=0, checkpoint=checkpoint,
+					row_hasher=row_hasher)
+	monkeypatch.setattr(SqliteBackend, 'bulk_insert', bulk_insert)
+
+	with pool.connection() as backend:
+		# Only the hashes of committed rows were stored
+		stored = backend.conn.execute(
+			f"SELECT table_name, COUNT(*) FROM {ROW_HASH_TABLE} GROUP BY table_name").fetchall()
+		for table, n in stored:
+			assert n == backend.count(table)
+		missing = len(sources['lithology_logs'].df) - backend.count('lithology_logs')
+		assert missing == 5
+
+		summaries = {s.table: s for s in load_delta(LOAD_TABLES, sources, backend, partition_rows=5)}
+		for spec in LOAD_TABLES:
+			assert backend.count(spec.table) == len(sources[spec.table].df)
+	pool.close()
+	assert summaries['lithology_logs'].inserted == missing
+	assert summaries['sample_analyses'].unchanged == len(sources['sample_analyses'].df)
+	assert all(s.updated == 0 and s.deleted == 0 for s in summaries.values())
+
+
+@pytest.mark.parametrize('change', ['delete', 'insert'])
+def test_renumbered_samples_are_unchanged(tmp_path, change):
+	backend = SqliteBackend(str(tmp_path / 'target.sqlite'))
+	backend.create_schema()
+	pool = ConnectionPool(lambda: backend, size=1)
+	load_tables(LOAD_TABLES, _sources(), pool, row_hasher=row_hasher)
+
+	# One sample removed or added near the top renumbers sample_id and sample_no of every sample after it
+	frames = _frames()
+	samples = frames['sample_analyses']
+	if change == 'delete':
+		samples = samples.drop(index=1)
+	else:
+		extra = samples.iloc[[0]].assign(depth_from=0.6, depth_to=0.9)
+		samples = pd.concat([samples.iloc[:1], extra, samples.iloc[1:]])
+	frames['sample_analyses'] = _numbered(samples)
+
+	summary = {s.table: s for s in load_delta(LOAD_TABLES, _sources(frames), backend)}['sample_analyses']
+	changed = (summary.inserted, summary.updated, summary.deleted)
+	assert changed == ((0, 0, 1) if change == 'delete' else (1, 0, 0))
+	assert summary.unchanged == len(_frames()['sample_analyses']) - summary.deleted
+	assert backend.count('sample_analyses') == len(frames['sample_analyses'])
+	backend.close()
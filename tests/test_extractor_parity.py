@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from benchmark_extractors import EXTRACTORS, sheet_rows, synthetic_dat201
+
+TIMESTAMP_COLUMNS = ['created_at', 'updated_at']
+
+
+# Text float() reads but pandas.to_numeric does not: digit separators and non-ASCII (Arabic-Indic) digits
+ARABIC_DIGITS = str.maketrans('0123456789', '\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669')
+
+
+@pytest.fixture(scope='module')
+def dat201():
+	df = synthetic_dat201(20_000)
+	return df, sheet_rows(df)
+
+
+@pytest.fixture(scope='module')
+def dat201_odd_numerals():
+	df = synthetic_dat201(2_000)
+	data = {name: df[name].to_numpy(copy=True) for name in df.columns}
+	# Each row gets at most one text number: a row of text only would reach the row-wise reference through
+	# iterrows as a string Series, with None turned into NaN
+	for k, name in enumerate(('From', 'To', 'Rock', 'IM', 'Ash', 'Sulphur')):
+		values = data[name]
+		odd = [i for i, v in enumerate(values) if isinstance(v, (int, float)) and v == v and v >= 0][k::12]
+		for i in odd[::2]:
+			text = str(values[i])
+			values[i] = f"{text[0]}_{text[1:]}" if values[i] >= 10 else f"0_{text}"
+		for i in odd[1::2]:
+			values[i] = str(values[i]).translate(ARABIC_DIGITS)
+	df = pd.DataFrame(data, columns=df.columns, dtype=object)
+	return df, sheet_rows(df)
+
+
+def _as_csv(df: pd.DataFrame) -> str:
+	# Compare the way the outputs end up in CSV: nulls equal, timestamps ignored
+	return df.drop(columns=[c for c in TIMESTAMP_COLUMNS if c in df.columns]).to_csv(index=False)
+
+
+@pytest.mark.parametrize('name', ['collars', 'lithology_logs', 'sample_analyses'])
+def test_column_wise_extractor_matches_row_wise(dat201, name):
+	df, data = dat201
+	reference, current = EXTRACTORS[name]
+	expected, actual = reference(df, data), current(df, data)
+	assert list(actual.columns) == list(expected.columns)
+	assert len(actual) == len(expected)
+	assert _as_csv(actual).splitlines() == _as_csv(expected).splitlines()
+
+
+@pytest.mark.parametrize('name', ['collars', 'lithology_logs', 'sample_analyses'])
+def test_column_wise_extractor_reads_numbers_like_float(dat201_odd_numerals, name):
+	df, data = dat201_odd_numerals
+	reference, current = EXTRACTORS[name]
+	assert _as_csv(current(df, data)).splitlines() == _as_csv(reference(df, data)).splitlines()
@@ -0,0 +1,23 @@
+import pytest
+
+from generate_dh_workbook import generate
+from pipeline.scheduler import run_tasks
+from pipeline.tasks import EXTRACTOR_TASKS, pipeline_tasks, task_results
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_dat201_extractors_run_in_the_parsing_task(tmp_path, workers):
+	excel = generate(2000, str(tmp_path / 'dh.xlsx'), seed=3)[0]
+	(tmp_path / 'out').mkdir()
+	tasks = pipeline_tasks(excel, str(tmp_path / 'out'))
+	assert [t.name for t in tasks] == ['dat201', 'seam_codes', 'rock_types']
+
+	results = task_results(tasks, run_tasks(tasks, workers=workers))
+	assert [r.name for r in results] == ['dat201', 'collars', 'lithology_logs', 'sample_analyses', 'seam_codes',
+										 'rock_types']
+	assert all(r.ok for r in results), [r.error for r in results if not r.ok]
+	# Only stage metrics come back from the DAT201 task, never the parsed rows
+	assert results[0].value[0].stage == 'dat201' and results[0].value[0].rows > 2000
+	for r in results[1:]:
+		assert [s.stage for s in r.value] == [r.name, f"{r.name}.write"]
+		assert (tmp_path / 'out' / dict((t[0], t[3]) for t in EXTRACTOR_TASKS)[r.name]).exists()